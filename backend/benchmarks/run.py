@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+
+"""
+Run timed scenarios of scheduling and API hot paths against a seeded database
+
+Each iteration runs in its own transaction which is rolled back so that all
+iterations (and all runs) see the same data. Results (latency percentiles and
+number of SQL statements) are written as JSON.
+
+./run.py --iterations 50 --output results.json
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import random
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session as OrmSession
+
+from seed import PREFIX
+from zimfarm_backend import logger
+from zimfarm_backend.api.routes.models import ListResponse
+from zimfarm_backend.common import getnow
+from zimfarm_backend.common.enums import TaskStatus
+from zimfarm_backend.common.metrics import track_queries
+from zimfarm_backend.common.schemas.models import calculate_pagination_metadata
+from zimfarm_backend.common.utils import task_event_handler
+from zimfarm_backend.db import Session
+from zimfarm_backend.db.models import Recipe, RequestedTask, Task, Worker
+from zimfarm_backend.db.recipe import get_all_recipes, get_recipes
+from zimfarm_backend.db.requested_task import (
+    find_requested_task_for_worker,
+    get_requested_tasks,
+)
+from zimfarm_backend.db.tasks import get_task_by_id, get_tasks
+from zimfarm_backend.db.worker import create_worker_schema
+from zimfarm_backend.utils.scheduling import request_tasks_using_recipe
+
+Scenario = Callable[[OrmSession, int], Any]
+
+# response classes compared by serialize_* scenarios
+RESPONSE_CLASSES: dict[str, type[JSONResponse]] = {
+    "": ORJSONResponse,
+    "_stdlib": JSONResponse,
+}
+
+
+@dataclass
+class ScenarioResult:
+    durations: list[float] = field(default_factory=list[float])
+    statements: list[int] = field(default_factory=list[int])
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "iterations": len(self.durations),
+            "latency_ms": {
+                "min": round(min(self.durations) * 1000, 3),
+                "p50": round(percentile(self.durations, 50) * 1000, 3),
+                "p95": round(percentile(self.durations, 95) * 1000, 3),
+                "max": round(max(self.durations) * 1000, 3),
+            },
+            "statements": {
+                "min": min(self.statements),
+                "p50": int(percentile(self.statements, 50)),
+                "p95": int(percentile(self.statements, 95)),
+                "max": max(self.statements),
+            },
+        }
+
+
+def percentile(values: list[float] | list[int], rank: int) -> float:
+    """nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(0, -(-rank * len(ordered) // 100) - 1)]
+
+
+class Scenarios:
+    """Hot paths to measure, with inputs picked from the seeded data"""
+
+    def __init__(self, session: OrmSession, seed: int):
+        rng = random.Random(seed)
+        self.worker_names = list(
+            session.scalars(
+                select(Worker.name)
+                .where(Worker.name.startswith(f"{PREFIX}-"))
+                .order_by(Worker.name)
+            )
+        )
+        self.recipe_names = list(
+            session.scalars(
+                select(Recipe.name)
+                .where(Recipe.name.startswith(f"{PREFIX}_"))
+                .order_by(Recipe.name)
+            )
+        )
+        self.running_task_ids = list(
+            session.scalars(
+                select(Task.id)
+                .where(Task.status == TaskStatus.scraper_started)
+                .order_by(Task.id)
+            )
+        )
+        if not self.worker_names or not self.recipe_names:
+            raise ValueError("Database is not seeded, run seed.py first")
+        nb_requested_tasks = session.scalar(
+            select(func.count()).select_from(RequestedTask)
+        )
+        self.dataset = {
+            "workers": len(self.worker_names),
+            "recipes": len(self.recipe_names),
+            "running_tasks": len(self.running_task_ids),
+            "requested_tasks": nb_requested_tasks,
+        }
+        self.completed_task_ids = list(
+            session.scalars(
+                select(Task.id)
+                .where(Task.status == TaskStatus.succeeded)
+                .order_by(Task.id)
+                .limit(1000)
+            )
+        )
+        rng.shuffle(self.worker_names)
+        rng.shuffle(self.recipe_names)
+        rng.shuffle(self.running_task_ids)
+        rng.shuffle(self.completed_task_ids)
+
+    def find_requested_task_for_worker(self, session: OrmSession, iteration: int):
+        worker = session.scalars(
+            select(Worker).where(
+                Worker.name == self.worker_names[iteration % len(self.worker_names)]
+            )
+        ).one()
+        return find_requested_task_for_worker(
+            session,
+            worker=create_worker_schema(worker),
+            avail_cpu=worker.available_cpu,
+            avail_memory=worker.available_memory,
+            avail_disk=worker.available_disk,
+        )
+
+    def request_tasks_using_recipe(self, session: OrmSession, _: int):
+        request_tasks_using_recipe(session)
+
+    def get_tasks(self, session: OrmSession, iteration: int):
+        return get_tasks(session, skip=(iteration % 10) * 20, limit=20)
+
+    def get_tasks_succeeded(self, session: OrmSession, iteration: int):
+        return get_tasks(
+            session,
+            skip=(iteration % 10) * 20,
+            limit=20,
+            status=[TaskStatus.succeeded],
+            sort_criteria="done",
+        )
+
+    def get_tasks_for_recipe(self, session: OrmSession, iteration: int):
+        return get_tasks(
+            session,
+            skip=0,
+            limit=20,
+            recipe_identifier=self.recipe_names[iteration % len(self.recipe_names)],
+        )
+
+    def get_recipes(self, session: OrmSession, iteration: int):
+        return get_recipes(session, skip=(iteration % 10) * 20, limit=20)
+
+    def get_recipes_filtered(self, session: OrmSession, iteration: int):
+        return get_recipes(
+            session,
+            skip=0,
+            limit=20,
+            name=f"_{iteration % 10}",
+            lang=["eng", "fra"],
+            offliners=["mwoffliner", "youtube", "zimit"],
+        )
+
+    def task_event_handler_scraper_running(self, session: OrmSession, iteration: int):
+        return task_event_handler(
+            session,
+            self.running_task_ids[iteration % len(self.running_task_ids)],
+            TaskStatus.scraper_running,
+            {
+                "timestamp": getnow(),
+                "stdout": "x" * 1024,
+                "stderr": "",
+                "progress": {"done": iteration, "total": 1000},
+            },
+        )
+
+    def task_event_handler_scraper_completed(self, session: OrmSession, iteration: int):
+        return task_event_handler(
+            session,
+            self.running_task_ids[iteration % len(self.running_task_ids)],
+            TaskStatus.scraper_completed,
+            {
+                "timestamp": getnow(),
+                "exit_code": 0,
+                "stdout": "x" * 1024,
+                "stderr": "",
+                "log": "log.txt",
+            },
+        )
+
+    def serialize_task_full(
+        self, session: OrmSession, iteration: int, response_class: type[JSONResponse]
+    ):
+        task = get_task_by_id(
+            session, self.completed_task_ids[iteration % len(self.completed_task_ids)]
+        )
+        return response_class(content=task.model_dump(mode="json")).body
+
+    def serialize_recipes_backup(
+        self, session: OrmSession, _: int, response_class: type[JSONResponse]
+    ):
+        results = get_all_recipes(session)
+        return response_class(
+            content=[recipe.model_dump(mode="json") for recipe in results.recipes]
+        ).body
+
+    def serialize_requested_tasks(
+        self, session: OrmSession, _: int, response_class: type[JSONResponse]
+    ):
+        results = get_requested_tasks(session, skip=0, limit=200)
+        response = ListResponse(
+            meta=calculate_pagination_metadata(
+                nb_records=results.nb_records,
+                skip=0,
+                limit=200,
+                page_size=len(results.requested_tasks),
+            ),
+            items=results.requested_tasks,
+        )
+        return response_class(content=response.model_dump(mode="json")).body
+
+    def all(self) -> dict[str, Scenario]:
+        scenarios: dict[str, Scenario] = {
+            "find_requested_task_for_worker": self.find_requested_task_for_worker,
+            "request_tasks_using_recipe": self.request_tasks_using_recipe,
+            "get_tasks": self.get_tasks,
+            "get_tasks_succeeded": self.get_tasks_succeeded,
+            "get_tasks_for_recipe": self.get_tasks_for_recipe,
+            "get_recipes": self.get_recipes,
+            "get_recipes_filtered": self.get_recipes_filtered,
+        }
+        for suffix, response_class in RESPONSE_CLASSES.items():
+            scenarios[f"serialize_recipes_backup{suffix}"] = partial(
+                self.serialize_recipes_backup, response_class=response_class
+            )
+            scenarios[f"serialize_requested_tasks{suffix}"] = partial(
+                self.serialize_requested_tasks, response_class=response_class
+            )
+            if self.completed_task_ids:
+                scenarios[f"serialize_task_full{suffix}"] = partial(
+                    self.serialize_task_full, response_class=response_class
+                )
+        if self.running_task_ids:
+            scenarios["task_event_handler_scraper_running"] = (
+                self.task_event_handler_scraper_running
+            )
+            scenarios["task_event_handler_scraper_completed"] = (
+                self.task_event_handler_scraper_completed
+            )
+        return scenarios
+
+
+def run_scenario(scenario: Scenario, iterations: int, warmup: int) -> ScenarioResult:
+    result = ScenarioResult()
+    for iteration in range(-warmup, iterations):
+        with Session() as session:
+            with track_queries() as stats:
+                started = time.perf_counter()
+                scenario(session, iteration)
+                session.flush()
+                duration = time.perf_counter() - started
+            session.rollback()
+        if iteration >= 0:
+            result.durations.append(duration)
+            result.statements.append(stats.count)
+    return result
+
+
+def run(
+    *, iterations: int, warmup: int, seed: int, only: list[str] | None
+) -> dict[str, Any]:
+    with Session() as session:
+        scenarios = Scenarios(session, seed)
+    selected = {
+        name: scenario
+        for name, scenario in scenarios.all().items()
+        if not only or name in only
+    }
+
+    results: dict[str, Any] = {}
+    for name, scenario in selected.items():
+        logger.info(f"Running {name} ({iterations} iterations)")
+        results[name] = run_scenario(scenario, iterations, warmup).summary()
+        logger.info(
+            f"{name}: p50={results[name]['latency_ms']['p50']}ms "
+            f"p95={results[name]['latency_ms']['p95']}ms "
+            f"statements={results[name]['statements']['p50']}"
+        )
+
+    return {
+        "date": datetime.datetime.now(datetime.UTC).isoformat(),
+        "python": platform.python_version(),
+        "iterations": iterations,
+        "warmup": warmup,
+        "seed": seed,
+        "dataset": scenarios.dataset,
+        "scenarios": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--scenario",
+        dest="scenarios",
+        action="append",
+        help="Only run this scenario (can be repeated)",
+    )
+    parser.add_argument(
+        "--output", help="Path to write JSON results to (defaults to stdout)"
+    )
+    args = parser.parse_args()
+
+    report = run(
+        iterations=args.iterations,
+        warmup=args.warmup,
+        seed=args.seed,
+        only=args.scenarios,
+    )
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+        logger.info(f"Results written to {args.output}")
+    else:
+        json.dump(report, sys.stdout, indent=2)
@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+
+"""
+Seed a (dedicated, migrated) database with a synthetic but realistic dataset
+
+Creates offliners (when missing), recipes spread across all of them, historical
+tasks with full timestamp/event lists, workers with per-recipe durations and
+pending requested tasks. Generation is deterministic for a given --seed.
+
+./seed.py --recipes 2000 --tasks 20000 --workers 50 --requested-tasks 500
+"""
+
+import argparse
+import datetime
+import random
+from ipaddress import IPv4Address
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session as OrmSession
+
+from zimfarm_backend import logger
+from zimfarm_backend.common import getnow
+from zimfarm_backend.common.enums import (
+    Platform,
+    RecipePeriodicity,
+    TaskStatus,
+    WarehousePath,
+)
+from zimfarm_backend.common.roles import RoleEnum
+from zimfarm_backend.common.schemas.models import (
+    DockerImageSchema,
+    LanguageSchema,
+    RecipeConfigSchema,
+    ResourcesSchema,
+)
+from zimfarm_backend.common.schemas.offliners.builder import build_offliner_model
+from zimfarm_backend.common.schemas.offliners.models import OfflinerSpecSchema
+from zimfarm_backend.common.schemas.orms import OfflinerDefinitionSchema, OfflinerSchema
+from zimfarm_backend.db import Session
+from zimfarm_backend.db.account import (
+    create_account,
+    get_account_by_username_or_none,
+)
+from zimfarm_backend.db.models import (
+    Account,
+    Recipe,
+    RecipeDuration,
+    RequestedTask,
+    Task,
+    Worker,
+)
+from zimfarm_backend.db.offliner import create_offliner, get_offliner_by_id_or_none
+from zimfarm_backend.db.offliner_definition import (
+    create_offliner_definition,
+    get_offliner_definition_or_none,
+)
+from zimfarm_backend.db.recipe import create_recipe
+from zimfarm_backend.db.requested_task import request_task
+
+# everything created by this script is prefixed so that the benchmarks can find it
+# and so that it can't be mistaken for real data
+PREFIX = "bench"
+DEFINITION_VERSION = "bench"
+SCHEDULER_USERNAME = "period-scheduler"
+
+OFFLINERS = {
+    "devdocs": Platform.devdocs,
+    "freecodecamp": None,
+    "gutenberg": Platform.gutenberg,
+    "ifixit": Platform.ifixit,
+    "kolibri": None,
+    "maps": Platform.maps,
+    "mindtouch": Platform.libretexts,
+    "mwoffliner": Platform.wikimedia,
+    "nautilus": None,
+    "openedx": None,
+    "phet": Platform.phet,
+    "sotoki": None,
+    "ted": Platform.ted,
+    "youtube": Platform.youtube,
+    "zimit": None,
+}
+LANGUAGES = {
+    "eng": "English",
+    "fra": "French",
+    "spa": "Spanish",
+    "deu": "German",
+    "por": "Portuguese",
+    "ara": "Arabic",
+    "hin": "Hindi",
+    "swa": "Swahili",
+}
+PERIODICITIES = [
+    RecipePeriodicity.manually,
+    RecipePeriodicity.monthly,
+    RecipePeriodicity.monthly,
+    RecipePeriodicity.quarterly,
+    RecipePeriodicity.biannualy,
+    RecipePeriodicity.annually,
+]
+TAGS = ["nopic", "novid", "maxi", "mini", "stackexchange", "wikipedia", "_videos"]
+
+# statuses of the normal life cycle of a task, in order
+SUCCEEDED_LIFECYCLE = [
+    TaskStatus.requested,
+    TaskStatus.reserved,
+    TaskStatus.started,
+    TaskStatus.scraper_started,
+    TaskStatus.scraper_completed,
+    TaskStatus.succeeded,
+]
+SELFISH_WORKERS_RATIO = 0.1
+ENABLED_RECIPES_RATIO = 0.95
+# probability of outcome for historical tasks
+OUTCOMES = {
+    TaskStatus.succeeded: 0.85,
+    TaskStatus.failed: 0.1,
+    TaskStatus.canceled: 0.05,
+}
+
+
+def get_offliner_spec() -> OfflinerSpecSchema:
+    """Minimal definition shared by all synthetic offliners"""
+    return OfflinerSpecSchema.model_validate(
+        {
+            "stdOutput": True,
+            "stdStats": False,
+            "flags": {
+                "name": {
+                    "type": "string",
+                    "required": True,
+                    "title": "Name",
+                    "description": "ZIM name",
+                },
+                "title": {
+                    "type": "string",
+                    "required": False,
+                    "title": "Title",
+                    "description": "ZIM title",
+                },
+                "url": {
+                    "type": "url",
+                    "required": False,
+                    "title": "URL",
+                    "description": "URL of the content to scrape",
+                },
+            },
+            "similarityData": [
+                {"flag": "url", "transformers": [{"name": "hostname"}]},
+            ],
+        }
+    )
+
+
+def get_or_create_account(session: OrmSession, username: str) -> Account:
+    if account := get_account_by_username_or_none(session, username=username):
+        return account
+    return create_account(
+        session, username=username, display_name=username, role=RoleEnum.ADMIN
+    )
+
+
+def get_or_create_offliners(
+    session: OrmSession,
+) -> list[tuple[OfflinerSchema, OfflinerDefinitionSchema]]:
+    offliners: list[tuple[OfflinerSchema, OfflinerDefinitionSchema]] = []
+    for offliner_id in OFFLINERS:
+        offliner = get_offliner_by_id_or_none(session, offliner_id)
+        if offliner is None:
+            offliner = create_offliner(
+                session,
+                offliner_id=offliner_id,
+                base_model="CamelModel" if offliner_id == "zimit" else "DashModel",
+                docker_image_name=f"openzim/{offliner_id}",
+                command_name=offliner_id,
+            )
+        definition = get_offliner_definition_or_none(
+            session, offliner_id, DEFINITION_VERSION
+        ) or create_offliner_definition(
+            session, get_offliner_spec(), offliner_id, DEFINITION_VERSION
+        )
+        offliners.append((offliner, definition))
+    return offliners
+
+
+def create_workers(
+    session: OrmSession, rng: random.Random, account: Account, nb_workers: int
+) -> list[Worker]:
+    workers: list[Worker] = []
+    now = getnow()
+    for index in range(nb_workers):
+        cpu = rng.choice([2, 4, 8, 16, 32])
+        memory = rng.choice([4, 8, 16, 32, 64, 128]) * 2**30
+        disk = rng.choice([50, 100, 200, 500, 1000]) * 2**30
+        worker = Worker(
+            name=f"{PREFIX}-worker-{index:05}",
+            selfish=rng.random() < SELFISH_WORKERS_RATIO,
+            total_cpu=cpu,
+            total_memory=memory,
+            total_disk=disk,
+            available_cpu=cpu,
+            available_memory=memory,
+            available_disk=disk,
+            offliners=rng.sample(
+                list(OFFLINERS), k=rng.randint(len(OFFLINERS) // 2, len(OFFLINERS))
+            ),
+            platforms={platform: rng.choice([1, 2, 5]) for platform in Platform.all()},
+            contexts={},
+            last_seen=now - datetime.timedelta(seconds=rng.randint(0, 120)),
+            last_ip=IPv4Address(f"10.0.{index // 250}.{index % 250 + 1}"),
+        )
+        worker.account_id = account.id
+        session.add(worker)
+        workers.append(worker)
+    session.flush()
+    return workers
+
+
+def create_recipes(
+    session: OrmSession,
+    rng: random.Random,
+    account: Account,
+    offliners: list[tuple[OfflinerSchema, OfflinerDefinitionSchema]],
+    nb_recipes: int,
+) -> list[Recipe]:
+    models = {
+        offliner.id: build_offliner_model(offliner, definition.schema_)
+        for offliner, definition in offliners
+    }
+    recipes: list[Recipe] = []
+    for index in range(nb_recipes):
+        offliner, definition = offliners[index % len(offliners)]
+        language = rng.choice(list(LANGUAGES))
+        name = f"{PREFIX}_{offliner.id}_{language}_{index:06}"
+        recipe = create_recipe(
+            session,
+            author_id=account.id,
+            name=name,
+            language=LanguageSchema(code=language, name=LANGUAGES[language]),
+            config=RecipeConfigSchema(
+                warehouse_path=rng.choice(list(WarehousePath)),
+                image=DockerImageSchema(
+                    name=offliner.docker_image_name, tag=rng.choice(["latest", "dev"])
+                ),
+                resources=ResourcesSchema(
+                    cpu=rng.choice([1, 2, 3, 4]),
+                    memory=rng.choice([1, 2, 4, 8, 16]) * 2**30,
+                    disk=rng.choice([1, 5, 10, 50, 100]) * 2**30,
+                ),
+                offliner=models[offliner.id].model_validate(
+                    {
+                        "offliner_id": offliner.id,
+                        "name": name,
+                        "title": f"{offliner.id} {index}",
+                        "url": f"https://{offliner.id}-{index % 97}.example.org",
+                    }
+                ),
+                platform=OFFLINERS[offliner.id],
+                monitor=False,
+            ),
+            offliner_definition=definition,
+            tags=rng.sample(TAGS, k=rng.randint(0, 3)),
+            enabled=rng.random() < ENABLED_RECIPES_RATIO,
+            notification=None,
+            periodicity=rng.choice(PERIODICITIES),
+        )
+        recipes.append(recipe)
+    return recipes
+
+
+def create_recipe_durations(
+    session: OrmSession,
+    rng: random.Random,
+    recipes: list[Recipe],
+    workers: list[Worker],
+):
+    """Worker-specific durations, as recorded after a successful run"""
+    now = getnow()
+    for recipe in recipes:
+        for worker in rng.sample(workers, k=min(len(workers), rng.randint(0, 3))):
+            duration = RecipeDuration(
+                default=False,
+                value=rng.randint(600, 7 * 86400),
+                on=now - datetime.timedelta(days=rng.randint(0, 365)),
+            )
+            duration.recipe_id = recipe.id
+            duration.worker_id = worker.id
+            session.add(duration)
+    session.flush()
+
+
+def get_lifecycle(
+    rng: random.Random, requested_on: datetime.datetime
+) -> tuple[list[tuple[str, datetime.datetime]], list[dict[str, Any]]]:
+    """timestamp and events lists of a completed task requested on requested_on"""
+    outcome = rng.choices(list(OUTCOMES), weights=list(OUTCOMES.values()))[0]
+    if outcome == TaskStatus.succeeded:
+        statuses = SUCCEEDED_LIFECYCLE
+    elif outcome == TaskStatus.failed:
+        statuses = [*SUCCEEDED_LIFECYCLE[:-1], TaskStatus.failed]
+    else:
+        statuses = [
+            *SUCCEEDED_LIFECYCLE[: rng.randint(1, 4)],
+            TaskStatus.cancel_requested,
+            TaskStatus.canceled,
+        ]
+
+    timestamp: list[tuple[str, datetime.datetime]] = []
+    events: list[dict[str, Any]] = []
+    on = requested_on
+    for status in statuses:
+        timestamp.append((status, on))
+        events.append({"code": status, "timestamp": on})
+        if status == TaskStatus.scraper_started:
+            # scraper pings are silent events, they don't get in timestamp
+            for _ in range(rng.randint(1, 10)):
+                on += datetime.timedelta(seconds=rng.randint(60, 3600))
+                events.append({"code": TaskStatus.scraper_running, "timestamp": on})
+        on += datetime.timedelta(seconds=rng.randint(5, 3600))
+    return timestamp, events
+
+
+def make_task(
+    requested_task: RequestedTask,
+    worker: Worker,
+    timestamp: list[tuple[str, datetime.datetime]],
+    events: list[dict[str, Any]],
+) -> Task:
+    task = Task(
+        updated_at=timestamp[-1][1],
+        events=events,
+        debug={},
+        status=timestamp[-1][0],
+        timestamp=timestamp,
+        container={},
+        priority=requested_task.priority,
+        config=requested_task.config,
+        notification=requested_task.notification,
+        upload=requested_task.upload,
+        original_recipe_name=requested_task.original_recipe_name,
+        context=requested_task.context,
+    )
+    task.requested_by_id = requested_task.requested_by_id
+    task.offliner_definition_id = requested_task.offliner_definition_id
+    task.recipe_id = requested_task.recipe_id
+    task.worker_id = worker.id
+    return task
+
+
+def create_tasks(
+    session: OrmSession,
+    rng: random.Random,
+    account: Account,
+    recipes: list[Recipe],
+    workers: list[Worker],
+    nb_tasks: int,
+    nb_requested_tasks: int,
+    nb_running_tasks: int,
+):
+    """Historical tasks, running tasks and pending requested tasks
+
+    Tasks are copies of a requested task created through the regular code path so
+    that their config is the one the scheduler would have produced.
+    """
+    now = getnow()
+    nb_requested_tasks = min(nb_requested_tasks, len(recipes))
+    nb_created = 0
+    for index, recipe in enumerate(recipes):
+        result = request_task(
+            session,
+            recipe_identifier=recipe.name,
+            requested_by=account.id,
+            priority=rng.choice([0, 0, 0, 0, 1, 5]),
+        )
+        if result.requested_task is None:
+            logger.warning(f"Could not request {recipe.name}: {result.error}")
+            continue
+        requested_task = session.get_one(RequestedTask, result.requested_task.id)
+
+        # spread the remaining historical tasks over the remaining recipes
+        nb_recipe_tasks = (nb_tasks - nb_created) // (len(recipes) - index)
+        requested_on = now - datetime.timedelta(days=rng.randint(1, 3 * 365))
+        task = None
+        for _ in range(nb_recipe_tasks):
+            task = make_task(
+                requested_task, rng.choice(workers), *get_lifecycle(rng, requested_on)
+            )
+            session.add(task)
+            requested_on += datetime.timedelta(days=rng.randint(1, 60))
+        nb_created += nb_recipe_tasks
+
+        # last recipes have a task in progress (they are not the requested ones)
+        if index >= len(recipes) - nb_running_tasks:
+            started_on = now - datetime.timedelta(seconds=rng.randint(60, 86400))
+            timestamp: list[tuple[str, datetime.datetime]] = [
+                (status, started_on) for status in SUCCEEDED_LIFECYCLE[:4]
+            ]
+            task = make_task(
+                requested_task,
+                rng.choice(workers),
+                timestamp,
+                [{"code": status, "timestamp": on} for status, on in timestamp],
+            )
+            session.add(task)
+
+        if task is not None:
+            session.flush()
+            recipe.most_recent_task_id = task.id
+
+        if index >= nb_requested_tasks:
+            session.delete(requested_task)
+
+        if index % 100 == 0:
+            session.flush()
+            logger.info(f"Created tasks for {index}/{len(recipes)} recipes")
+    session.flush()
+
+
+def seed(
+    session: OrmSession,
+    *,
+    nb_recipes: int,
+    nb_tasks: int,
+    nb_workers: int,
+    nb_requested_tasks: int,
+    nb_running_tasks: int,
+    seed: int,
+):
+    if session.scalars(
+        select(Recipe.id).where(Recipe.name.startswith(f"{PREFIX}_")).limit(1)
+    ).first():
+        raise ValueError("Database is already seeded, use a fresh database")
+
+    rng = random.Random(seed)
+    account = get_or_create_account(session, f"{PREFIX}-admin")
+    get_or_create_account(session, SCHEDULER_USERNAME)
+
+    offliners = get_or_create_offliners(session)
+    logger.info(f"Using {len(offliners)} offliners")
+
+    workers = create_workers(session, rng, account, nb_workers)
+    logger.info(f"Created {len(workers)} workers")
+
+    recipes = create_recipes(session, rng, account, offliners, nb_recipes)
+    logger.info(f"Created {len(recipes)} recipes")
+
+    create_recipe_durations(session, rng, recipes, workers)
+    create_tasks(
+        session,
+        rng,
+        account,
+        recipes,
+        workers,
+        nb_tasks,
+        nb_requested_tasks,
+        nb_running_tasks,
+    )
+    logger.info("Created tasks and requested tasks")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--recipes", type=int, default=2000)
+    parser.add_argument("--tasks", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=50)
+    parser.add_argument("--requested-tasks", type=int, default=500)
+    parser.add_argument("--running-tasks", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with Session.begin() as session:
+        seed(
+            session,
+            nb_recipes=args.recipes,
+            nb_tasks=args.tasks,
+            nb_workers=args.workers,
+            nb_requested_tasks=args.requested_tasks,
+            nb_running_tasks=args.running_tasks,
+            seed=args.seed,
+        )
+    logger.info("FINISH!")
@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+
+"""
+Replay scheduling against a snapshot of the database with a virtual clock
+
+Starting from the state of the database (restored from a production dump or seeded
+with seed.py), simulates the farm for --duration: the periodic scheduler requests
+tasks, manual requests seen during the same duration before the snapshot are
+replayed, workers poll for tasks every --tick and tasks complete after their
+expected duration. Task selection uses the real code (request_tasks_using_recipe,
+request_task, find_requested_task_for_worker) with getnow() returning virtual time.
+
+Everything runs in a single transaction which is rolled back: the database is left
+untouched. Results (throughput, queue wait, workers utilisation and per-offliner
+starvation) are written as JSON.
+
+./simulate.py --duration 7d --tick 5m --output simulation.json
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import random
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import UUID
+
+from humanfriendly import parse_timespan
+from sqlalchemy import select
+from sqlalchemy.orm import Session as OrmSession
+
+from run import percentile
+from seed import SCHEDULER_USERNAME
+from zimfarm_backend import logger
+from zimfarm_backend.common import getnow
+from zimfarm_backend.common.enums import TaskStatus
+from zimfarm_backend.common.schemas.models import ResourcesSchema
+from zimfarm_backend.common.utils import (
+    task_reserved_event_handler,
+    task_started_event_handler,
+    task_suceeded_event_handler,
+)
+from zimfarm_backend.db import Session
+from zimfarm_backend.db.models import Account, Task, Worker
+from zimfarm_backend.db.requested_task import (
+    MAX_BIG_INT_VAL,
+    delete_requested_task,
+    find_requested_task_for_worker,
+    get_requested_task_by_id,
+    get_requested_tasks,
+    request_task,
+)
+from zimfarm_backend.db.tasks import create_task, get_currently_running_tasks
+from zimfarm_backend.db.worker import create_worker_schema, update_worker
+from zimfarm_backend.utils.scheduling import request_tasks_using_recipe
+from zimfarm_backend.utils.timestamp import get_timestamp_for_status
+
+sim_logger = logging.getLogger("zimfarm_backend.simulate")
+
+
+class VirtualClock:
+    """Replacement for getnow() returning simulated time"""
+
+    def __init__(self, now: datetime.datetime):
+        self.now = now
+
+    def __call__(self) -> datetime.datetime:
+        return self.now
+
+    def install(self):
+        """make getnow() return simulated time in all loaded backend modules"""
+        for name, module in list(sys.modules.items()):
+            if name.startswith("zimfarm_backend") and (
+                getattr(module, "getnow", None) is getnow
+            ):
+                module.getnow = self  # pyright: ignore[reportAttributeAccessIssue]
+
+
+@dataclass(kw_only=True)
+class SimulatedWorker:
+    name: str
+    total: ResourcesSchema
+    # resources reserved by running tasks, integrated over time (unit x seconds)
+    usage: dict[str, float] = field(
+        default_factory=lambda: {"cpu": 0, "memory": 0, "disk": 0}
+    )
+
+
+@dataclass(kw_only=True)
+class SimulatedTask:
+    id: UUID
+    worker_name: str
+    offliner: str
+    resources: ResourcesSchema
+    ends_on: datetime.datetime
+
+
+@dataclass(kw_only=True)
+class ManualRequest:
+    on: datetime.datetime
+    recipe_name: str
+    requested_by: UUID
+    priority: int
+
+
+class Simulation:
+    def __init__(
+        self,
+        session: OrmSession,
+        *,
+        duration: float,
+        tick: float,
+        scheduler_interval: float,
+        workers_seen_within: float,
+        replay_requests: bool,
+        seed: int,
+    ):
+        self.session = session
+        self.rng = random.Random(seed)
+        self.tick = datetime.timedelta(seconds=tick)
+        self.scheduler_interval = datetime.timedelta(seconds=scheduler_interval)
+        self.start = self.get_snapshot_date()
+        self.end = self.start + datetime.timedelta(seconds=duration)
+        self.clock = VirtualClock(self.start)
+
+        self.workers = {
+            worker.name: SimulatedWorker(
+                name=worker.name,
+                total=ResourcesSchema(
+                    cpu=worker.total_cpu,
+                    memory=worker.total_memory,
+                    disk=worker.total_disk,
+                ),
+            )
+            for worker in session.scalars(
+                select(Worker).where(
+                    Worker.deleted.is_(False),
+                    Worker.admin_disabled.is_(False),
+                    Worker.cordoned.is_(False),
+                    Worker.last_seen
+                    >= self.start - datetime.timedelta(seconds=workers_seen_within),
+                )
+            )
+        }
+        if not self.workers:
+            raise ValueError("No active worker to simulate in the snapshot")
+
+        # tasks running at snapshot time complete when they are expected to
+        self.running: dict[UUID, SimulatedTask] = {
+            task.id: SimulatedTask(
+                id=task.id,
+                worker_name=task.worker_name,
+                offliner=task.config.offliner.offliner_id,  # pyright: ignore[reportAttributeAccessIssue, reportUnknownMemberType, reportUnknownArgumentType]
+                resources=task.config.resources,
+                ends_on=task.eta,
+            )
+            for task in get_currently_running_tasks(session)
+        }
+
+        self.manual_requests = (
+            self.get_manual_requests(self.start - (self.end - self.start))
+            if replay_requests
+            else []
+        )
+
+        self.nb_started = 0
+        self.nb_completed = 0
+        self.waits: list[float] = []
+        self.offliners_waits: dict[str, list[float]] = defaultdict(list)
+
+    def get_snapshot_date(self) -> datetime.datetime:
+        """date of last activity recorded in snapshot"""
+        last_activity = self.session.scalar(
+            select(Task.updated_at).order_by(Task.updated_at.desc()).limit(1)
+        )
+        return last_activity or getnow()
+
+    def get_manual_requests(self, since: datetime.datetime) -> list[ManualRequest]:
+        """non-periodic requests made in the same duration before snapshot, shifted
+        so they are replayed at the same pace during simulation"""
+        shift = self.start - since
+        requests: list[ManualRequest] = []
+        for task, username in self.session.execute(
+            select(Task, Account.username)
+            .join(Account, Task.requested_by_id == Account.id)
+            .where(
+                Task.updated_at >= since,
+                Task.recipe_id.is_not(None),
+                Account.username != SCHEDULER_USERNAME,
+            )
+        ).all():
+            requested_on = get_timestamp_for_status(
+                task.timestamp, TaskStatus.requested
+            )
+            if task.recipe is None or username is None or requested_on < since:
+                continue
+            requests.append(
+                ManualRequest(
+                    on=requested_on + shift,
+                    recipe_name=task.recipe.name,
+                    requested_by=task.requested_by_id,
+                    priority=task.priority,
+                )
+            )
+        return sorted(requests, key=lambda request: request.on)
+
+    def complete_tasks(self):
+        for task in sorted(self.running.values(), key=lambda task: task.ends_on):
+            if task.ends_on > self.clock.now:
+                break
+            task_suceeded_event_handler(
+                self.session, task.id, {"timestamp": task.ends_on}
+            )
+            del self.running[task.id]
+            self.nb_completed += 1
+
+    def replay_manual_requests(self):
+        while self.manual_requests and self.manual_requests[0].on <= self.clock.now:
+            request = self.manual_requests.pop(0)
+            with self.session.begin_nested():
+                request_task(
+                    self.session,
+                    recipe_identifier=request.recipe_name,
+                    requested_by=request.requested_by,
+                    priority=request.priority,
+                )
+
+    def get_reserved(self, worker_name: str) -> ResourcesSchema:
+        tasks = [
+            task for task in self.running.values() if task.worker_name == worker_name
+        ]
+        return ResourcesSchema(
+            cpu=sum(task.resources.cpu for task in tasks),
+            memory=sum(task.resources.memory for task in tasks),
+            disk=sum(task.resources.disk for task in tasks),
+        )
+
+    def poll(self, worker: SimulatedWorker):
+        """what a worker manager does on poll, the way the API handles it"""
+        reserved = self.get_reserved(worker.name)
+        avail_cpu = max(worker.total.cpu - reserved.cpu, 0)
+        avail_memory = max(worker.total.memory - reserved.memory, 0)
+        avail_disk = max(worker.total.disk - reserved.disk, 0)
+        db_worker = update_worker(
+            self.session,
+            worker_name=worker.name,
+            avail_cpu=avail_cpu,
+            avail_memory=avail_memory,
+            avail_disk=avail_disk,
+            total_cpu=worker.total.cpu,
+            total_memory=worker.total.memory,
+            total_disk=worker.total.disk,
+        )
+        candidate = find_requested_task_for_worker(
+            self.session,
+            worker=create_worker_schema(db_worker),
+            avail_cpu=avail_cpu,
+            avail_memory=avail_memory,
+            avail_disk=avail_disk,
+        ).requested_task
+        if candidate is None:
+            return
+
+        requested_task = get_requested_task_by_id(self.session, candidate.id)
+        task = create_task(
+            self.session, requested_task=requested_task, worker_id=db_worker.id
+        )
+        task_reserved_event_handler(self.session, task.id, {"worker": worker.name})
+        delete_requested_task(self.session, requested_task.id)
+        task_started_event_handler(self.session, task.id, {})
+
+        wait = (
+            self.clock.now
+            - get_timestamp_for_status(requested_task.timestamp, TaskStatus.requested)
+        ).total_seconds()
+        offliner = str(
+            requested_task.config.offliner.offliner_id  # pyright: ignore[reportAttributeAccessIssue, reportUnknownMemberType, reportUnknownArgumentType]
+        )
+        self.waits.append(wait)
+        self.offliners_waits[offliner].append(wait)
+        self.nb_started += 1
+        self.running[task.id] = SimulatedTask(
+            id=task.id,
+            worker_name=worker.name,
+            offliner=offliner,
+            resources=requested_task.config.resources,
+            ends_on=self.clock.now
+            + datetime.timedelta(seconds=candidate.duration.value),
+        )
+
+    def account_usage(self):
+        seconds = self.tick.total_seconds()
+        for worker in self.workers.values():
+            reserved = self.get_reserved(worker.name)
+            worker.usage["cpu"] += reserved.cpu * seconds
+            worker.usage["memory"] += reserved.memory * seconds
+            worker.usage["disk"] += reserved.disk * seconds
+
+    def run(self):
+        self.clock.install()
+        next_scheduling = self.clock.now
+        day = 0
+        while self.clock.now < self.end:
+            self.complete_tasks()
+            self.replay_manual_requests()
+            if self.clock.now >= next_scheduling:
+                request_tasks_using_recipe(self.session)
+                next_scheduling = self.clock.now + self.scheduler_interval
+
+            workers = list(self.workers.values())
+            self.rng.shuffle(workers)
+            for worker in workers:
+                self.poll(worker)
+
+            self.account_usage()
+            self.clock.now += self.tick
+            if (self.clock.now - self.start).days > day:
+                day = (self.clock.now - self.start).days
+                sim_logger.info(
+                    f"day {day}: {self.nb_started} started, "
+                    f"{self.nb_completed} completed, {len(self.running)} running"
+                )
+
+    def report(self) -> dict[str, Any]:
+        elapsed = (self.clock.now - self.start).total_seconds()
+
+        queued: dict[str, list[float]] = defaultdict(list)
+        for requested_task in get_requested_tasks(
+            self.session, skip=0, limit=MAX_BIG_INT_VAL
+        ).requested_tasks:
+            queued[requested_task.config.offliner].append(
+                (
+                    self.clock.now
+                    - get_timestamp_for_status(
+                        requested_task.timestamp, TaskStatus.requested
+                    )
+                ).total_seconds()
+            )
+
+        def hours(values: list[float]) -> dict[str, float] | None:
+            if not values:
+                return None
+            return {
+                "p50": round(percentile(values, 50) / 3600, 2),
+                "p95": round(percentile(values, 95) / 3600, 2),
+                "max": round(max(values) / 3600, 2),
+            }
+
+        def utilisation(workers: list[SimulatedWorker]) -> dict[str, float]:
+            return {
+                resource: round(
+                    sum(worker.usage[resource] for worker in workers)
+                    / (sum(getattr(worker.total, resource) for worker in workers) or 1)
+                    / elapsed,
+                    3,
+                )
+                for resource in ("cpu", "memory", "disk")
+            }
+
+        return {
+            "start": self.start.isoformat(),
+            "end": self.clock.now.isoformat(),
+            "tick": self.tick.total_seconds(),
+            "scheduler_interval": self.scheduler_interval.total_seconds(),
+            "throughput": {
+                "started": self.nb_started,
+                "completed": self.nb_completed,
+                "completed_per_day": round(self.nb_completed / elapsed * 86400, 1),
+            },
+            "queue_wait_hours": hours(self.waits),
+            "utilisation": {
+                **utilisation(list(self.workers.values())),
+                "workers": {
+                    worker.name: utilisation([worker])
+                    for worker in self.workers.values()
+                },
+            },
+            "offliners": {
+                offliner: {
+                    "started": len(self.offliners_waits[offliner]),
+                    "wait_hours": hours(self.offliners_waits[offliner]),
+                    "queued_at_end": len(queued[offliner]),
+                    "queued_age_hours": hours(queued[offliner]),
+                }
+                for offliner in sorted({*self.offliners_waits.keys(), *queued.keys()})
+            },
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--duration", default="7d", help="Simulated duration")
+    parser.add_argument(
+        "--tick", default="5m", help="Interval between workers polls (simulated)"
+    )
+    parser.add_argument(
+        "--scheduler-interval",
+        default="10m",
+        help="Interval between periodic scheduler runs (simulated)",
+    )
+    parser.add_argument(
+        "--workers-seen-within",
+        default="7d",
+        help="Only simulate workers seen within this duration before snapshot",
+    )
+    parser.add_argument(
+        "--no-replay-requests",
+        dest="replay_requests",
+        action="store_false",
+        help="Do not replay manual requests from history",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output", help="Path to write JSON results to (defaults to stdout)"
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="Show logs of scheduling code"
+    )
+    args = parser.parse_args()
+
+    sim_logger.setLevel(logging.INFO)
+    if not args.verbose:
+        logger.setLevel(logging.WARNING)
+
+    with Session() as session:
+        simulation = Simulation(
+            session,
+            duration=parse_timespan(args.duration),
+            tick=parse_timespan(args.tick),
+            scheduler_interval=parse_timespan(args.scheduler_interval),
+            workers_seen_within=parse_timespan(args.workers_seen_within),
+            replay_requests=args.replay_requests,
+            seed=args.seed,
+        )
+        sim_logger.info(
+            f"Simulating {len(simulation.workers)} workers from {simulation.start} "
+            f"to {simulation.end}"
+        )
+        simulation.run()
+        report = {
+            "date": datetime.datetime.now(datetime.UTC).isoformat(),
+            "seed": args.seed,
+            **simulation.report(),
+        }
+        session.rollback()
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+        sim_logger.info(f"Results written to {args.output}")
+    else:
+        json.dump(report, sys.stdout, indent=2)
@@ -3,20 +3,25 @@ from collections import defaultdict
 from contextlib import asynccontextmanager
 from http import HTTPStatus
 
-from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi import APIRouter, FastAPI, HTTPException, Response
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from pydantic import ValidationError
 
+from zimfarm_backend.api.last_seen import flusher as last_seen_flusher
+from zimfarm_backend.api.live import broker as live_updates_broker
+from zimfarm_backend.api.metrics import MetricsMiddleware
 from zimfarm_backend.api.routes.accounts.logic import router as accounts_router
 from zimfarm_backend.api.routes.auth.logic import router as auth_router
 from zimfarm_backend.api.routes.blobs.logic import router as blobs_router
 from zimfarm_backend.api.routes.contexts.logic import router as contexts_router
 from zimfarm_backend.api.routes.files.logic import router as files_router
 from zimfarm_backend.api.routes.healthcheck.logic import router as healthcheck_router
-from zimfarm_backend.api.routes.http_errors import BadRequestError
+from zimfarm_backend.api.routes.http_errors import BadRequestError, NotModifiedError
 from zimfarm_backend.api.routes.languages.logic import router as languages_router
+from zimfarm_backend.api.routes.live.logic import router as live_router
+from zimfarm_backend.api.routes.metrics.logic import router as metrics_router
 from zimfarm_backend.api.routes.offliners.logic import router as offliners_router
 from zimfarm_backend.api.routes.platforms.logic import router as platforms_router
 from zimfarm_backend.api.routes.recipes.logic import router as recipes_router
@@ -37,6 +42,7 @@ from zimfarm_backend.db.exceptions import (
     RecordAlreadyExistsError,
     RecordDoesNotExistError,
 )
+from zimfarm_backend.db.language import get_languages_by_code
 from zimfarm_backend.utils.database import (
     check_if_schema_is_up_to_date,
     create_initial_account,
@@ -60,7 +66,12 @@ async def lifespan(_: FastAPI):
     check_if_schema_is_up_to_date()
     create_initial_account()
     load_offliners()
+    # resolve languages upfront rather than on first recipes list
+    get_languages_by_code()
+    last_seen_flusher.start()
     yield
+    await live_updates_broker.stop()
+    await last_seen_flusher.stop()
 
 
 def create_app(*, debug: bool = True):
@@ -71,6 +82,8 @@ def create_app(*, debug: bool = True):
         version="2.0.0",
         description="Zimfarm API for managing tasks, workers, and other resources",
         lifespan=lifespan,
+        # orjson renders large list payloads several times faster than stdlib json
+        default_response_class=ORJSONResponse,
     )
 
     if origins := os.getenv("ALLOWED_ORIGINS", None):
@@ -82,8 +95,11 @@ def create_app(*, debug: bool = True):
             allow_headers=["*"],
         )
 
+    app.add_middleware(MetricsMiddleware)
+
     main_router = APIRouter(prefix="/v2")
     main_router.include_router(router=healthcheck_router)
+    main_router.include_router(router=metrics_router)
     main_router.include_router(router=auth_router)
     main_router.include_router(router=contexts_router)
     main_router.include_router(router=languages_router)
@@ -98,6 +114,7 @@ def create_app(*, debug: bool = True):
     main_router.include_router(router=status_router)
     main_router.include_router(router=recipes_router)
     main_router.include_router(router=files_router)
+    main_router.include_router(router=live_router)
 
     app.include_router(router=main_router)
 
@@ -117,7 +134,7 @@ async def request_validation_error_handler(_, exc: RequestValidationError):
         key = loc[-1] if loc else "root"  # fallback for model level errors
         errors[key].append(err["msg"])
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
         content={
             "success": False,
@@ -136,7 +153,7 @@ async def validation_error_handler(_, exc: ValidationError):
         loc = err["loc"]
         key = loc[-1] if loc else "root"  # fallback for model level errors
         errors[key].append(err["msg"])
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
         content={
             "success": False,
@@ -148,7 +165,7 @@ async def validation_error_handler(_, exc: ValidationError):
 
 @app.exception_handler(ValueError)
 async def value_error_handler(_, exc: ValueError):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=HTTPStatus.BAD_REQUEST,
         content={"success": False, "message": exc.args[0]},
     )
@@ -156,7 +173,7 @@ async def value_error_handler(_, exc: ValueError):
 
 @app.exception_handler(RecordDoesNotExistError)
 async def record_does_not_exist_error_handler(_, exc: RecordDoesNotExistError):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=HTTPStatus.NOT_FOUND,
         content={"success": False, "message": exc.detail},
     )
@@ -164,7 +181,7 @@ async def record_does_not_exist_error_handler(_, exc: RecordDoesNotExistError):
 
 @app.exception_handler(RecordAlreadyExistsError)
 async def record_already_exists_error_handler(_, exc: RecordAlreadyExistsError):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=HTTPStatus.CONFLICT,
         content={"success": False, "message": exc.detail},
     )
@@ -172,22 +189,30 @@ async def record_already_exists_error_handler(_, exc: RecordAlreadyExistsError):
 
 @app.exception_handler(BadRequestError)
 async def bad_request_error_handler(_, exc: BadRequestError):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={"success": False, "message": exc.detail, "errors": exc.errors},
     )
 
 
+@app.exception_handler(NotModifiedError)
+async def not_modified_error_handler(_, exc: NotModifiedError):
+    # a 304 has no body but carries the validators of the cached representation
+    return Response(status_code=exc.status_code, headers=exc.headers)
+
+
 @app.exception_handler(HTTPException)
 async def http_exception_handler(_, exc: HTTPException):
-    return JSONResponse(
-        status_code=exc.status_code, content={"success": False, "message": exc.detail}
+    return ORJSONResponse(
+        status_code=exc.status_code,
+        content={"success": False, "message": exc.detail},
+        headers=exc.headers,
     )
 
 
 @app.exception_handler(Exception)
 async def generic_error_handler(_, __):  # pyright: ignore
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
         content={"success": False, "message": "Internal server error"},
     )
@@ -0,0 +1,51 @@
+import asyncio
+import logging
+
+from zimfarm_backend.common.constants import WORKER_LAST_SEEN_FLUSH_INTERVAL
+from zimfarm_backend.db import Session
+from zimfarm_backend.db.worker import LastSeenBuffer, last_seen_buffer
+
+logger = logging.getLogger(__name__)
+
+
+class LastSeenFlusher:
+    """Periodically writes buffered workers last seen timestamps of this process"""
+
+    def __init__(
+        self,
+        buffer: LastSeenBuffer = last_seen_buffer,
+        interval: float = WORKER_LAST_SEEN_FLUSH_INTERVAL,
+    ):
+        self.buffer = buffer
+        self.interval = interval
+        self.task: asyncio.Task[None] | None = None
+
+    def flush(self) -> int:
+        with Session.begin() as session:
+            return self.buffer.flush(session)
+
+    async def loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception:
+                logger.exception("Failed to write workers last seen, will retry")
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.loop(), name="workers-last-seen")
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        # do not lose timestamps recorded since last flush
+        try:
+            await asyncio.to_thread(self.flush)
+        except Exception:
+            logger.exception("Failed to write workers last seen on shutdown")
+
+
+flusher = LastSeenFlusher()
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+
+import psycopg
+from sqlalchemy import make_url
+
+from zimfarm_backend.common.constants import (
+    LIVE_UPDATES_MAX_SUBSCRIBERS,
+    LIVE_UPDATES_QUEUE_SIZE,
+    POSTGRES_URI,
+)
+from zimfarm_backend.db.live import LIVE_UPDATES_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+# pushed to a subscriber which lagged behind, client has to reload its data
+RESET = None
+
+# delay before listening again after database connection was lost
+RECONNECT_DELAY = 5
+
+
+class TooManySubscribersError(Exception):
+    pass
+
+
+class LiveUpdatesBroker:
+    """Fan out database notifications to all live updates streams of this process
+
+    A single connection LISTENs on the channel whatever the number of streams, it is
+    opened with first subscriber and kept until application shutdown."""
+
+    def __init__(
+        self,
+        max_subscribers: int = LIVE_UPDATES_MAX_SUBSCRIBERS,
+        queue_size: int = LIVE_UPDATES_QUEUE_SIZE,
+    ):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self.subscribers: set[asyncio.Queue[str | None]] = set()
+        self.listener: asyncio.Task[None] | None = None
+
+    def subscribe(self) -> asyncio.Queue[str | None]:
+        if len(self.subscribers) >= self.max_subscribers:
+            raise TooManySubscribersError()
+        queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        if self.listener is None or self.listener.done():
+            self.listener = asyncio.create_task(self.listen(), name="live-updates")
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue[str | None]):
+        self.subscribers.discard(queue)
+
+    def publish(self, payload: str):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                # never block other streams on a slow client: drop its backlog and
+                # tell it to reload instead
+                logger.warning("Live updates subscriber lagging behind, resetting it")
+                self.reset(queue)
+
+    def reset(self, queue: asyncio.Queue[str | None]):
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(RESET)
+
+    async def listen(self) -> None:
+        conninfo = (
+            make_url(POSTGRES_URI)
+            .set(drivername="postgresql")
+            .render_as_string(hide_password=False)
+        )
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    conninfo, autocommit=True
+                ) as conn:
+                    await conn.execute(f"LISTEN {LIVE_UPDATES_CHANNEL}")
+                    async for notify in conn.notifies():
+                        self.publish(notify.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Live updates listener failed, reconnecting")
+            # notifications sent while disconnected are lost
+            for queue in list(self.subscribers):
+                self.reset(queue)
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    async def stop(self):
+        if self.listener is not None:
+            self.listener.cancel()
+            await asyncio.gather(self.listener, return_exceptions=True)
+            self.listener = None
+        self.subscribers.clear()
+
+
+broker = LiveUpdatesBroker()
@@ -0,0 +1,69 @@
+import time
+
+from starlette.routing import BaseRoute, Route
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from zimfarm_backend.common.metrics import (
+    HTTP_REQUEST_DB_DURATION,
+    HTTP_REQUEST_DB_STATEMENTS,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUEST_SIZE,
+    HTTP_RESPONSE_SIZE,
+    track_queries,
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def get_route_label(scope: Scope) -> str:
+    """Template of the route that handled the request (stored by the router)"""
+    route: BaseRoute | None = scope.get("route")
+    return route.path if isinstance(route, Route) else UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Record latency, sizes and SQL statements of HTTP requests per route template
+
+    Route template (e.g /v2/tasks/{task_id}) is used rather than the actual path
+    to keep labels cardinality bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        request_size = response_size = 0
+
+        async def receive_wrapper() -> Message:
+            nonlocal request_size
+            message = await receive()
+            if message["type"] == "http.request":
+                request_size += len(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, response_size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        with track_queries() as stats:
+            try:
+                await self.app(scope, receive_wrapper, send_wrapper)
+            finally:
+                labels = {"method": scope["method"], "route": get_route_label(scope)}
+                HTTP_REQUEST_DURATION.labels(**labels, status=str(status)).observe(
+                    time.perf_counter() - started
+                )
+                HTTP_REQUEST_SIZE.labels(**labels).observe(request_size)
+                HTTP_RESPONSE_SIZE.labels(**labels).observe(response_size)
+                HTTP_REQUEST_DB_STATEMENTS.labels(**labels).observe(stats.count)
+                HTTP_REQUEST_DB_DURATION.labels(**labels).observe(stats.duration)
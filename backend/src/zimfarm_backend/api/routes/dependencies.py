@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session as OrmSession
 
 from zimfarm_backend.api.constants import (
     CREATE_NEW_OAUTH_ACCOUNT,
+    OAUTH_ISSUER,
 )
 from zimfarm_backend.api.routes.http_errors import ForbiddenError, UnauthorizedError
 from zimfarm_backend.api.token import JWTClaims, token_decoder
@@ -16,7 +17,7 @@ from zimfarm_backend.db import gen_dbsession, gen_manual_dbsession
 from zimfarm_backend.db.account import (
     check_account_permission,
     create_account,
-    get_account_by_id_or_none,
+    get_principal_or_none,
     update_account,
 )
 from zimfarm_backend.db.models import Account
@@ -73,18 +74,19 @@ def get_current_account_or_none_with_session(
     ) -> Account | None:
         if claims is None:
             return None
-        account = get_account_by_id_or_none(session, account_id=claims.sub)
+        account = get_principal_or_none(
+            session, subject=claims.sub, is_idp_subject=claims.iss == OAUTH_ISSUER
+        )
         # If this is a kiwix token, we create a new account account
         if account is None and CREATE_NEW_OAUTH_ACCOUNT:
             if not claims.name:
                 raise UnauthorizedError("Token is missing 'profile' scope")
-            create_account(
+            account = create_account(
                 session,
                 display_name=claims.name,
                 role=RoleEnum.VIEWER,
                 idp_sub=claims.sub,
             )
-            account = get_account_by_id_or_none(session, account_id=claims.sub)
 
         # if token contains a "name" attribute and display_name is different, update it
         if account and claims.name and claims.name != account.display_name:
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 from zimfarm_backend.common import getnow
 
@@ -7,5 +7,5 @@ router = APIRouter(prefix="/healthcheck", tags=["healthcheck"])
 
 
 @router.get("")
-def get_languages() -> JSONResponse:
-    return JSONResponse(content={"status": "ok", "timestamp": getnow().isoformat()})
+def get_languages() -> ORJSONResponse:
+    return ORJSONResponse(content={"status": "ok", "timestamp": getnow().isoformat()})
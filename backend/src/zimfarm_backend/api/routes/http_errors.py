@@ -3,6 +3,13 @@ from typing import Any
 from fastapi import HTTPException, status
 
 
+class NotModifiedError(HTTPException):
+    """Client already has the current representation (conditional GET)"""
+
+    def __init__(self, headers: dict[str, str]) -> None:
+        super().__init__(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
 class BadRequestError(HTTPException):
     def __init__(
         self, message: Any = None, errors: dict[str, str] | None = None
@@ -0,0 +1,3 @@
+from zimfarm_backend.api.routes.live.logic import router
+
+__all__ = ["router"]
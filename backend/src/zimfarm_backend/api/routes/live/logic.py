@@ -0,0 +1,59 @@
+import asyncio
+from collections.abc import AsyncGenerator
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from zimfarm_backend.api.live import (
+    RESET,
+    LiveUpdatesBroker,
+    TooManySubscribersError,
+    broker,
+)
+from zimfarm_backend.api.routes.http_errors import ServiceUnavailableError
+from zimfarm_backend.common.constants import LIVE_UPDATES_KEEPALIVE_INTERVAL
+
+router = APIRouter(prefix="/live", tags=["live"])
+
+# delay (ms) after which browsers reconnect a dropped stream
+RECONNECT_DELAY_MS = 5000
+
+
+async def stream_live_updates(
+    broker: LiveUpdatesBroker, queue: asyncio.Queue[str | None]
+) -> AsyncGenerator[str]:
+    """Server-sent events from a subscriber queue, until client disconnects"""
+    try:
+        yield f"retry: {RECONNECT_DELAY_MS}\n\n"
+        while True:
+            try:
+                payload = await asyncio.wait_for(
+                    queue.get(), timeout=LIVE_UPDATES_KEEPALIVE_INTERVAL
+                )
+            except TimeoutError:
+                # comment line keeping proxies from closing an idle connection
+                yield ": keepalive\n\n"
+                continue
+            if payload is RESET:
+                yield "event: reset\ndata: {}\n\n"
+            else:
+                yield f"data: {payload}\n\n"
+    finally:
+        broker.unsubscribe(queue)
+
+
+@router.get("")
+async def get_live_updates() -> StreamingResponse:
+    """Stream of changes on tasks, workers and requested tasks
+
+    Events only hold identifiers and public status information, clients are
+    expected to fetch details they need through regular endpoints."""
+    try:
+        queue = broker.subscribe()
+    except TooManySubscribersError as exc:
+        raise ServiceUnavailableError("Too many live updates clients") from exc
+    return StreamingResponse(
+        stream_live_updates(broker, queue),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
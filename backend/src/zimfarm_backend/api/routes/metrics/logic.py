@@ -0,0 +1,10 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("", include_in_schema=False)
+def get_metrics() -> Response:
+    """Prometheus metrics of this API process"""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -2,7 +2,7 @@ from http import HTTPStatus
 from typing import Annotated
 
 from fastapi import APIRouter, Body, Depends, Path, Query, Response
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session as OrmSession
 from werkzeug.security import check_password_hash, generate_password_hash
 
@@ -129,7 +129,7 @@ def get_offliner(
     offliner_id: Annotated[str, Path()],
     version: Annotated[str, Path()],
     session: Annotated[OrmSession, Depends(gen_dbsession)],
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Get a specific offliner"""
 
     # find the schema class that matches the offliner
@@ -141,7 +141,7 @@ def get_offliner(
 
     flags = schema_to_flags(schema_cls)
 
-    return JSONResponse(
+    return ORJSONResponse(
         content={
             "flags": [flag.model_dump(mode="json", by_alias=True) for flag in flags],
             "help": (  # dynamic + sourced from backend because it might be custom
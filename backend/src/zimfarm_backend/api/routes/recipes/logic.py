@@ -3,9 +3,9 @@ from typing import Annotated, Any, cast
 from uuid import UUID
 
 import requests
-from fastapi import APIRouter, Depends, Path, Query, Response
+from fastapi import APIRouter, Depends, Path, Query, Request, Response
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from pydantic import ValidationError
 from sqlalchemy.orm import Session as OrmSession
 
@@ -34,7 +34,11 @@ from zimfarm_backend.api.routes.recipes.models import (
     RevertRecipeSchema,
     ToggleArchiveStatusSchema,
 )
-from zimfarm_backend.api.routes.utils import get_recipe_image_tags
+from zimfarm_backend.api.routes.utils import (
+    check_not_modified,
+    compute_etag,
+    get_recipe_image_tags,
+)
 from zimfarm_backend.common.enums import (
     DockerImageName,
     RecipePeriodicity,
@@ -56,12 +60,17 @@ from zimfarm_backend.common.schemas.orms import (
     RecipeHistorySchema,
     RecipeLightSchema,
 )
+from zimfarm_backend.db import (
+    gen_readonly_dbsession,
+    get_small_table_version,
+    get_table_version,
+)
 from zimfarm_backend.db.account import check_account_permission
 from zimfarm_backend.db.exceptions import (
     RecordDoesNotExistError,
 )
 from zimfarm_backend.db.language import get_language_from_code
-from zimfarm_backend.db.models import Account
+from zimfarm_backend.db.models import Account, Recipe, RequestedTask
 from zimfarm_backend.db.offliner import get_offliner
 from zimfarm_backend.db.offliner_definition import (
     create_offliner_definition_schema,
@@ -90,6 +99,7 @@ from zimfarm_backend.db.recipe import (
     toggle_archive_status as db_toggle_archive_status,
 )
 from zimfarm_backend.db.recipe import update_recipe as db_update_recipe
+from zimfarm_backend.db.tasks import get_tasks_version
 from zimfarm_backend.utils.offliners import (
     expanded_config,
     get_image_name,
@@ -102,9 +112,11 @@ router = APIRouter(prefix="/recipes", tags=["recipes"])
 
 @router.get("")
 def get_recipes(
+    request: Request,
+    response: Response,
     params: Annotated[RecipesGetSchema, Query()],
     current_account: Account | None = Depends(get_current_account_or_none),
-    session: OrmSession = Depends(gen_dbsession),
+    session: OrmSession = Depends(gen_readonly_dbsession),
 ) -> ListResponse[RecipeLightSchema]:
     if params.archived and not (
         current_account
@@ -114,6 +126,18 @@ def get_recipes(
     ):
         raise ForbiddenError("You are not allowed to view archived recipes.")
 
+    check_not_modified(
+        request,
+        response,
+        compute_etag(
+            request,
+            # most recent task and number of requested tasks of each recipe
+            get_table_version(session, Recipe),
+            get_tasks_version(session),
+            get_small_table_version(session, RequestedTask),
+        ),
+    )
+
     results = db_get_recipes(
         session,
         skip=params.skip,
@@ -123,6 +147,8 @@ def get_recipes(
         name=params.name,
         archived=params.archived,
         offliners=params.offliner,
+        cursor=params.cursor,
+        estimate_count=params.estimate_count,
     )
     return ListResponse(
         meta=calculate_pagination_metadata(
@@ -130,6 +156,8 @@ def get_recipes(
             skip=params.skip,
             limit=params.limit,
             page_size=len(results.recipes),
+            next_cursor=results.next_cursor,
+            estimated_count=results.estimated_count,
         ),
         items=cast(list[RecipeLightSchema], results.recipes),
     )
@@ -142,7 +170,7 @@ def create_recipe(
     request: RecipeCreateSchema,
     session: OrmSession = Depends(gen_dbsession),
     current_account: Account = Depends(get_current_account),
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Create a new recipe"""
     if offliner_id := request.config.get("offliner", {}).get("offliner_id"):
         offliner_definition = get_offliner_definition(
@@ -206,7 +234,7 @@ def create_recipe(
         context=request.context.strip() if request.context else None,
     )
 
-    return JSONResponse(
+    return ORJSONResponse(
         content=RecipeCreateResponseSchema(
             id=db_recipe.id,
         ).model_dump(mode="json")
@@ -215,12 +243,12 @@ def create_recipe(
 
 @router.get("/backup")
 def get_recipes_backup(
-    session: OrmSession = Depends(gen_dbsession),
+    session: OrmSession = Depends(gen_readonly_dbsession),
     current_account: Account | None = Depends(get_current_account_or_none),
     *,
     hide_secrets: Annotated[bool | None, Query()] = True,
     archived: Annotated[bool, Query()] = False,
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Get a list of recipes"""
     if not (
         current_account
@@ -255,7 +283,7 @@ def get_recipes_backup(
             recipe.model_dump(mode="json", context={"show_secrets": show_secrets})
         )
 
-    return JSONResponse(content=content)
+    return ORJSONResponse(content=content)
 
 
 @router.post(
@@ -284,7 +312,7 @@ def get_recipe(
     current_account: Account | None = Depends(get_current_account_or_none),
     *,
     hide_secrets: Annotated[bool | None, Query()] = True,
-) -> JSONResponse:
+) -> ORJSONResponse:
     db_recipe = db_get_recipe(session, recipe_identifier)
 
     if current_account is None and db_recipe.archived:
@@ -335,7 +363,7 @@ def get_recipe(
         show_secrets=show_secrets,
     )
 
-    return JSONResponse(
+    return ORJSONResponse(
         content=recipe.model_dump(mode="json", context={"show_secrets": show_secrets})
     )
 
@@ -377,7 +405,7 @@ def update_recipe(
     request: RecipeUpdateSchema,
     session: OrmSession = Depends(gen_dbsession),
     current_account: Account = Depends(get_current_account),
-) -> JSONResponse:
+) -> ORJSONResponse:
     db_recipe = db_get_recipe(session, recipe_identifier)
     if db_recipe.archived:
         raise BadRequestError("Cannot update an archived recipe")
@@ -579,7 +607,7 @@ def update_recipe(
         offliner_definition=offliner_definition,
         show_secrets=True,
     )
-    return JSONResponse(
+    return ORJSONResponse(
         content=recipe.model_dump(mode="json", context={"show_secrets": True})
     )
 
@@ -713,7 +741,7 @@ def archive_recipe(
     request: ToggleArchiveStatusSchema,
     session: OrmSession = Depends(gen_dbsession),
     current_account: Account = Depends(get_current_account),
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Archive a recipe"""
     db_toggle_archive_status(
         session,
@@ -722,7 +750,7 @@ def archive_recipe(
         actor_id=current_account.id,
         comment=request.comment,
     )
-    return JSONResponse(
+    return ORJSONResponse(
         content={"message": f"Recipe '{recipe_identifier}' has been archived"},
         status_code=HTTPStatus.OK,
     )
@@ -737,7 +765,7 @@ def restore_archived_recipe(
     request: ToggleArchiveStatusSchema,
     session: OrmSession = Depends(gen_dbsession),
     current_account: Account = Depends(get_current_account),
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Restore an archived recipe"""
     db_toggle_archive_status(
         session,
@@ -746,7 +774,7 @@ def restore_archived_recipe(
         actor_id=current_account.id,
         comment=request.comment,
     )
-    return JSONResponse(
+    return ORJSONResponse(
         content={"message": f"Recipe '{recipe_identifier}' has been restored"},
         status_code=HTTPStatus.OK,
     )
@@ -759,7 +787,7 @@ def restore_archived_recipe(
 def validate_recipe(
     recipe_identifier: Annotated[NotEmptyString, Path()],
     session: Annotated[OrmSession, Depends(gen_dbsession)],
-) -> JSONResponse:
+) -> ORJSONResponse:
     recipe = db_get_recipe(session, recipe_identifier)
     offliner = get_offliner(session, recipe.config["offliner"]["offliner_id"])
 
@@ -768,7 +796,7 @@ def validate_recipe(
     except ValidationError as exc:
         raise RequestValidationError(exc.errors()) from exc
 
-    return JSONResponse(content={"message": "Recipe validated with success"})
+    return ORJSONResponse(content={"message": "Recipe validated with success"})
 
 
 @router.get(
@@ -822,7 +850,7 @@ def revert_recipe(
     request: RevertRecipeSchema,
     session: OrmSession = Depends(gen_dbsession),
     current_account: Account = Depends(get_current_account),
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Revert a recipe to a previous history."""
     db_revert_recipe(
         session,
@@ -831,7 +859,7 @@ def revert_recipe(
         author_id=current_account.id,
         comment=request.comment,
     )
-    return JSONResponse(
+    return ORJSONResponse(
         content={"message": f"Recipe '{recipe_identifier}' has been restored"},
         status_code=HTTPStatus.OK,
     )
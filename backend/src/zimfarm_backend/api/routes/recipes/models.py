@@ -31,6 +31,10 @@ class RecipesGetSchema(BaseModel):
     name: NotEmptyString | None = None
     archived: bool = False
     offliner: list[NotEmptyString] | None = None
+    # resume listing after last record of previous page (its meta.next_cursor)
+    cursor: NotEmptyString | None = None
+    # planner estimate of total instead of exact count, on unfiltered lists only
+    estimate_count: bool = False
 
 
 class RecipeCreateSchema(BaseModel):
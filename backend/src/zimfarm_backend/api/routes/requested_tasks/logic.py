@@ -1,9 +1,9 @@
 from typing import Annotated, cast
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Path, Query
+from fastapi import APIRouter, Depends, Path, Query, Response
 from fastapi.requests import Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session as OrmSession
 
 from zimfarm_backend import logger
@@ -25,6 +25,7 @@ from zimfarm_backend.api.routes.requested_tasks.models import (
     RequestedTaskSchema,
     UpdateRequestedTaskSchema,
 )
+from zimfarm_backend.api.routes.utils import check_not_modified, compute_etag
 from zimfarm_backend.api.routes.workers.models import GetRequestedTaskSchema
 from zimfarm_backend.common import WorkersIpChangesCounts, getnow
 from zimfarm_backend.common.constants import (
@@ -42,9 +43,14 @@ from zimfarm_backend.common.schemas.orms import (
     RequestedTaskLightSchema,
 )
 from zimfarm_backend.common.utils import task_event_handler
-from zimfarm_backend.db import gen_dbsession, gen_manual_dbsession
+from zimfarm_backend.db import (
+    gen_dbsession,
+    gen_manual_dbsession,
+    get_small_table_version,
+    get_table_version,
+)
 from zimfarm_backend.db.account import check_account_permission
-from zimfarm_backend.db.models import Account
+from zimfarm_backend.db.models import Account, Recipe, RequestedTask
 from zimfarm_backend.db.recipe import count_enabled_recipes
 from zimfarm_backend.db.requested_task import (
     compute_requested_task_rank,
@@ -68,7 +74,8 @@ from zimfarm_backend.db.requested_task import (
 from zimfarm_backend.db.worker import (
     create_worker_schema,
     get_worker,
-    update_worker,
+    last_seen_buffer,
+    record_worker_poll,
 )
 
 router = APIRouter(prefix="/requested-tasks", tags=["requested-tasks"])
@@ -136,13 +143,27 @@ def create_request_task(
 
 @router.get("")
 def get_requested_tasks(
+    request: Request,
+    response: Response,
     requested_task_schema: Annotated[RequestedTaskSchema, Query()],
     session: Annotated[OrmSession, Depends(gen_dbsession)],
     current_account: Annotated[Account | None, Depends(get_current_account_or_none)],
 ) -> ListResponse[RequestedTaskLightSchema]:
     """Get list of requested tasks for account."""
     if current_account and requested_task_schema.worker:
-        update_worker(session, worker_name=requested_task_schema.worker)
+        # ensures worker exists, last seen is buffered so it survives a 304
+        get_worker(session, worker_name=requested_task_schema.worker)
+        last_seen_buffer.record(requested_task_schema.worker)
+    check_not_modified(
+        request,
+        response,
+        compute_etag(
+            request,
+            get_small_table_version(session, RequestedTask),
+            # recipe and requester names
+            get_table_version(session, Recipe, Account),
+        ),
+    )
 
     skip = requested_task_schema.skip or 0
     limit = requested_task_schema.limit or 20
@@ -162,6 +183,8 @@ def get_requested_tasks(
         cpu=requested_task_schema.matching_cpu,
         memory=requested_task_schema.matching_memory,
         disk=requested_task_schema.matching_disk,
+        cursor=requested_task_schema.cursor,
+        estimate_count=requested_task_schema.estimate_count,
     )
     return ListResponse(
         meta=calculate_pagination_metadata(
@@ -169,6 +192,8 @@ def get_requested_tasks(
             skip=skip,
             limit=limit,
             page_size=len(results.requested_tasks),
+            next_cursor=results.next_cursor,
+            estimated_count=results.estimated_count,
         ),
         items=results.requested_tasks,
     )
@@ -198,9 +223,13 @@ def get_requested_tasks_for_worker(
                 f"{x_forwarded_for}"
             )
 
-        worker = update_worker(
+        # commit explicitly since we are not using an automatic transaction,
+        # and do it before calling Wasabi so that changes are propagated quickly
+        # and transaction is not blocking; nothing to commit when only last seen
+        # changed as it is written in bulk later on
+        if record_worker_poll(
             session,
-            worker_name=query.worker_name,
+            worker=worker,
             ip_address=x_forwarded_for if ip_changed else None,
             avail_disk=query.avail_disk,
             avail_memory=query.avail_memory,
@@ -208,12 +237,8 @@ def get_requested_tasks_for_worker(
             total_disk=query.total_disk,
             total_memory=query.total_memory,
             total_cpu=query.total_cpu,
-        )
-
-        # commit explicitly since we are not using an automatic transaction,
-        # and do it before calling Wasabi so that changes are propagated quickly
-        # and transaction is not blocking
-        session.commit()
+        ):
+            session.commit()
 
         if ip_changed and USES_WORKERS_IPS_WHITELIST:
             try:
@@ -261,6 +286,7 @@ def get_requested_tasks_for_worker(
                             str,
                             task.config.offliner.offliner_id,  # pyright: ignore[reportUnknownMemberType, reportAttributeAccessIssue]
                         ),
+                        image=task.config.image,
                         resources=ConfigResourcesSchema(
                             cpu=task.config.resources.cpu,
                             memory=task.config.resources.memory,
@@ -290,7 +316,7 @@ def get_requested_task(
     current_account: Annotated[Account | None, Depends(get_current_account_or_none)],
     *,
     hide_secrets: Annotated[bool | None, Query()] = True,
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Get a requested task by ID."""
     requested_task = get_requested_task_by_id(session, requested_task_id)
 
@@ -322,7 +348,7 @@ def get_requested_task(
     else:
         show_secrets = not hide_secrets
 
-    return JSONResponse(
+    return ORJSONResponse(
         content=requested_task.model_dump(
             context={"show_secrets": show_secrets}, mode="json"
         )
@@ -356,10 +382,10 @@ def update_requested_task_priority(
 def delete_requested_task(
     requested_task_id: Annotated[UUID, Path()],
     session: Annotated[OrmSession, Depends(gen_dbsession)],
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Delete a requested task by ID."""
     db_delete_requested_task(session, requested_task_id)
-    return JSONResponse(content={"deleted": 1})
+    return ORJSONResponse(content={"deleted": 1})
 
 
 @router.get(
@@ -29,6 +29,11 @@ class RequestedTaskSchema(BaseModel):
     matching_disk: ZIMDisk | None = None
     matching_offliners: list[str] | None = None
 
+    # resume listing after last record of previous page (its meta.next_cursor)
+    cursor: NotEmptyString | None = None
+    # planner estimate of total instead of exact count, on unfiltered lists only
+    estimate_count: bool = False
+
 
 class NewRequestedTaskSchema(BaseModel):
     recipe_names: list[NotEmptyString] = Field(default_factory=list)
@@ -5,10 +5,10 @@ from fastapi import APIRouter, Depends, Path, Query
 from fastapi.responses import Response
 from sqlalchemy.orm import Session as OrmSession
 
-from zimfarm_backend.api.routes.dependencies import gen_dbsession
 from zimfarm_backend.api.routes.status.models import StatusMonitorName
 from zimfarm_backend.common import getnow
 from zimfarm_backend.common.enums import TaskStatus
+from zimfarm_backend.db import gen_readonly_dbsession
 from zimfarm_backend.db.tasks import get_oldest_task_timestamp
 
 router = APIRouter(prefix="/status", tags=["status"])
@@ -19,7 +19,7 @@ def get_status(
     monitor_name: Annotated[StatusMonitorName, Path(..., description="Monitor name")],
     threshold_secs: Annotated[int, Query(..., description="Threshold in seconds")],
     status: Annotated[TaskStatus, Query(..., description=" Task status")],
-    session: Annotated[OrmSession, Depends(gen_dbsession)],
+    session: Annotated[OrmSession, Depends(gen_readonly_dbsession)],
 ):
     """
     Get the Zimfarm status for a given monitor
@@ -2,8 +2,8 @@ from http import HTTPStatus
 from typing import Annotated, cast
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Path, Query, Response
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Path, Query, Request, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 
 from zimfarm_backend.api.routes.dependencies import (
@@ -21,6 +21,7 @@ from zimfarm_backend.api.routes.tasks.models import (
     TasksGetSchema,
     TaskUpdateSchema,
 )
+from zimfarm_backend.api.routes.utils import check_not_modified, compute_etag
 from zimfarm_backend.common.constants import ENABLED_SCHEDULER, INFORM_CMS
 from zimfarm_backend.common.enums import TaskStatus
 from zimfarm_backend.common.schemas.models import (
@@ -30,8 +31,9 @@ from zimfarm_backend.common.schemas.models import (
 from zimfarm_backend.common.schemas.orms import TaskFullSchema, TaskLightSchema
 from zimfarm_backend.common.upload import build_task_upload_uris, populate_zim_urls
 from zimfarm_backend.common.utils import task_event_handler
+from zimfarm_backend.db import gen_readonly_dbsession, get_table_version
 from zimfarm_backend.db.account import check_account_permission
-from zimfarm_backend.db.models import Account
+from zimfarm_backend.db.models import Account, Recipe
 from zimfarm_backend.db.offliner import get_offliner as db_get_offliner
 from zimfarm_backend.db.offliner_definition import (
     get_offliner_definition_by_id as db_get_offliner_definition_by_id,
@@ -45,6 +47,7 @@ from zimfarm_backend.db.requested_task import (
 from zimfarm_backend.db.tasks import create_task as db_create_task
 from zimfarm_backend.db.tasks import get_task_by_id as db_get_task
 from zimfarm_backend.db.tasks import get_tasks as db_get_tasks
+from zimfarm_backend.db.tasks import get_tasks_version
 from zimfarm_backend.db.worker import get_worker as db_get_worker
 from zimfarm_backend.utils.offliners import expanded_config
 
@@ -53,10 +56,22 @@ router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 @router.get("")
 def get_tasks(
-    db_session: Annotated[Session, Depends(gen_dbsession)],
+    request: Request,
+    response: Response,
+    db_session: Annotated[Session, Depends(gen_readonly_dbsession)],
     params: Annotated[TasksGetSchema, Query()],
 ) -> ListResponse[TaskLightSchema]:
     """Get a list of tasks"""
+    check_not_modified(
+        request,
+        response,
+        compute_etag(
+            request,
+            get_tasks_version(db_session),
+            # recipe and requester names
+            get_table_version(db_session, Recipe, Account),
+        ),
+    )
     results = db_get_tasks(
         db_session,
         skip=params.skip,
@@ -66,6 +81,8 @@ def get_tasks(
         sort_criteria=params.sort_criteria,
         offliner=params.offliner,
         fetch_most_recent_tasks=params.fetch_most_recent_tasks,
+        cursor=params.cursor,
+        estimate_count=params.estimate_count,
     )
     return ListResponse(
         meta=calculate_pagination_metadata(
@@ -73,6 +90,8 @@ def get_tasks(
             skip=params.skip,
             limit=params.limit,
             page_size=len(results.tasks),
+            next_cursor=results.next_cursor,
+            estimated_count=results.estimated_count,
         ),
         items=results.tasks,
     )
@@ -85,7 +104,7 @@ def get_task(
     current_account: Annotated[Account | None, Depends(get_current_account_or_none)],
     *,
     hide_secrets: Annotated[bool, Query()] = False,
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Get a task by ID"""
     task = db_get_task(db_session, task_id)
     if not (
@@ -114,7 +133,7 @@ def get_task(
     )
     if INFORM_CMS:
         populate_zim_urls(cast(TaskFullSchema, task))
-    return JSONResponse(
+    return ORJSONResponse(
         content=task.model_dump(mode="json", context={"show_secrets": show_secrets})
     )
 
@@ -128,7 +147,7 @@ def create_task(
 ):
     """Create a task from a requested task"""
     if not ENABLED_SCHEDULER:
-        return JSONResponse(
+        return ORJSONResponse(
             content={"message": "Scheduler is disabled"},
             status_code=HTTPStatus.NO_CONTENT,
         )
@@ -153,7 +172,7 @@ def create_task(
 
     db_delete_requested_task(db_session, requested_task_id)
 
-    return JSONResponse(
+    return ORJSONResponse(
         content=task.model_dump(mode="json", context={"show_secrets": True}),
         status_code=HTTPStatus.CREATED,
     )
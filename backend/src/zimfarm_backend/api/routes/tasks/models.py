@@ -21,6 +21,10 @@ class TasksGetSchema(BaseModel):
     sort_criteria: Literal["done", "doing", "failed", "updated_at"] = "updated_at"
     offliner: NotEmptyString | None = None
     fetch_most_recent_tasks: bool = False
+    # resume listing after last record of previous page (its meta.next_cursor)
+    cursor: NotEmptyString | None = None
+    # planner estimate of total instead of exact count, on unfiltered lists only
+    estimate_count: bool = False
 
 
 class TaskCreateSchema(BaseModel):
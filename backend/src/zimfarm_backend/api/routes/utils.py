@@ -1,7 +1,11 @@
 import base64
+import hashlib
+from typing import Any
 
 import requests
+from fastapi import Request, Response
 
+from zimfarm_backend.api.routes.http_errors import NotModifiedError
 from zimfarm_backend.common.constants import REQ_TIMEOUT_GHCR
 
 
@@ -17,3 +21,31 @@ def get_recipe_image_tags(hub_name: str) -> list[str]:
     )
     response.raise_for_status()
     return response.json()["tags"]
+
+
+def compute_etag(request: Request, *versions: Any) -> str:
+    """Weak ETag of the response to request given versions of the data it relies on
+
+    Versions must include anything else the response depends on (e.g permissions
+    of the requester).
+    """
+    digest = hashlib.sha256(
+        repr(
+            (request.url.path, sorted(request.query_params.multi_items()), versions)
+        ).encode()
+    ).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def check_not_modified(request: Request, response: Response, etag: str) -> None:
+    """Raise a 304 if request's If-None-Match matches etag, set validators otherwise
+
+    Meant to be called before running the (expensive) query of the response.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Authorization"}
+    if_none_match = request.headers.get("If-None-Match", "")
+    # weak comparison, as mandated for If-None-Match
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if "*" in candidates or etag.removeprefix("W/") in candidates:
+        raise NotModifiedError(headers)
+    response.headers.update(headers)
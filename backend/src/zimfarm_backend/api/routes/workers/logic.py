@@ -1,7 +1,7 @@
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Path, Query
+from fastapi import APIRouter, Depends, Path, Query, Request
 from fastapi.responses import Response
 from sqlalchemy.orm import Session as OrmSession
 
@@ -17,6 +17,7 @@ from zimfarm_backend.api.routes.http_errors import (
     UnauthorizedError,
 )
 from zimfarm_backend.api.routes.models import ListResponse
+from zimfarm_backend.api.routes.utils import check_not_modified, compute_etag
 from zimfarm_backend.api.routes.workers.models import (
     KeySchema,
     WorkerCheckInResponse,
@@ -40,8 +41,9 @@ from zimfarm_backend.common.schemas.orms import (
     WorkerLightSchema,
     WorkerMetricsSchema,
 )
+from zimfarm_backend.db import gen_readonly_dbsession, get_table_version
 from zimfarm_backend.db.account import check_account_permission
-from zimfarm_backend.db.models import Account
+from zimfarm_backend.db.models import Account, Sshkey
 from zimfarm_backend.db.ssh_key import (
     create_ssh_key,
     create_ssh_key_read_schema,
@@ -58,6 +60,7 @@ from zimfarm_backend.db.worker import (
 )
 from zimfarm_backend.db.worker import get_worker_metrics as db_get_worker_metrics
 from zimfarm_backend.db.worker import get_workers as db_get_workers
+from zimfarm_backend.db.worker import get_workers_version
 from zimfarm_backend.db.worker import update_worker as db_update_worker
 from zimfarm_backend.utils.github_registry import (
     WorkerManagerVersion,
@@ -92,23 +95,40 @@ def require_permission_if_not_worker_itself(namespace: str, name: str):
 
 @router.get("")
 def get_workers(
-    session: Annotated[OrmSession, Depends(gen_dbsession)],
+    request: Request,
+    response: Response,
+    session: Annotated[OrmSession, Depends(gen_readonly_dbsession)],
     current_account: Annotated[Account | None, Depends(get_current_account_or_none)],
     skip: Annotated[SkipField, Query()] = 0,
     limit: Annotated[LimitFieldMax200, Query()] = 20,
+    cursor: Annotated[NotEmptyString | None, Query()] = None,
     *,
     hide_offlines: Annotated[bool, Query()] = False,
+    estimate_count: Annotated[bool, Query()] = False,
 ) -> ListResponse[WorkerLightSchema]:
     """Get a list of workers."""
+    show_secrets = current_account is not None and check_account_permission(
+        current_account, namespace="workers", name="secrets"
+    )
+    check_not_modified(
+        request,
+        response,
+        compute_etag(
+            request,
+            show_secrets,
+            get_workers_version(session),
+            # owners names and deletion status
+            get_table_version(session, Account),
+        ),
+    )
     results = db_get_workers(
         session,
         skip=skip,
         limit=limit,
         hide_offlines=hide_offlines,
-        show_secrets=current_account is not None
-        and check_account_permission(
-            current_account, namespace="workers", name="secrets"
-        ),
+        show_secrets=show_secrets,
+        cursor=cursor,
+        estimate_count=estimate_count,
     )
     return ListResponse(
         meta=calculate_pagination_metadata(
@@ -116,6 +136,8 @@ def get_workers(
             skip=skip,
             limit=limit,
             page_size=len(results.workers),
+            next_cursor=results.next_cursor,
+            estimated_count=results.estimated_count,
         ),
         items=results.workers,
     )
@@ -275,11 +297,18 @@ def create_worker_key(
     dependencies=[Depends(require_permission(namespace="workers", name="ssh_keys"))],
 )
 def get_worker_keys(
+    request: Request,
+    response: Response,
     worker_name: Annotated[NotEmptyString, Path()],
     db_session: Annotated[OrmSession, Depends(gen_dbsession)],
 ) -> ListResponse[SshKeyRead]:
     """Get a list of SSH keys for a worker"""
     worker = db_get_worker(db_session, worker_name=worker_name)
+    check_not_modified(
+        request,
+        response,
+        compute_etag(request, worker.id, get_table_version(db_session, Sshkey)),
+    )
     results = db_get_ssh_keys(db_session, worker_id=worker.id)
     page_size = len(results.ssh_keys)
     return ListResponse(
@@ -0,0 +1,29 @@
+from sqlalchemy.orm import Session as OrmSession
+
+from zimfarm_backend.background_tasks import logger
+from zimfarm_backend.background_tasks.constants import (
+    TASK_ARCHIVING_AGE,
+    TASK_ARCHIVING_BATCH_SIZE,
+)
+from zimfarm_backend.common import getnow
+from zimfarm_backend.db.tasks import archive_tasks
+
+
+def archive_old_tasks(session: OrmSession):
+    """moves complete tasks which have not been updated recently to the archive
+
+    Uses TASK_ARCHIVING_AGE, at most TASK_ARCHIVING_BATCH_SIZE tasks are archived
+    on each run.
+    """
+
+    threshold = getnow() - TASK_ARCHIVING_AGE
+    logger.info(
+        ":: archiving tasks not updated since "
+        f"{threshold.isoformat(timespec='seconds')}"
+    )
+
+    task_ids = archive_tasks(
+        session, updated_before=threshold, limit=TASK_ARCHIVING_BATCH_SIZE
+    )
+
+    logger.info(f"::: archived {len(task_ids)} tasks")
@@ -1,13 +1,16 @@
 import datetime
+from typing import Any
+from uuid import UUID
 
 import sqlalchemy as sa
-from sqlalchemy.dialects.postgresql import JSONPATH
+from sqlalchemy.dialects.postgresql import JSONB, JSONPATH
 from sqlalchemy.orm import Session as OrmSession
 
 from zimfarm_backend.background_tasks import logger
 from zimfarm_backend.background_tasks.constants import (
     OLD_TASK_DELETION_ENABLED,
     OLD_TASK_DELETION_THRESHOLD,
+    PERIODIC_TASK_GONE_NAME,
     PERIODIC_TASK_NAME,
     STALLED_CANCELREQ_TIMEOUT,
     STALLED_COMPLETED_TIMEOUT,
@@ -17,9 +20,37 @@ from zimfarm_backend.background_tasks.constants import (
 )
 from zimfarm_backend.common import getnow
 from zimfarm_backend.common.enums import TaskStatus
-from zimfarm_backend.common.utils import task_cancel_requested_event_handler
-from zimfarm_backend.db.account import get_account_by_username
-from zimfarm_backend.db.models import Task, Worker
+from zimfarm_backend.common.notifications import handle_notification
+from zimfarm_backend.db.account import (
+    get_account_by_username,
+    get_account_by_username_or_none,
+)
+from zimfarm_backend.db.exceptions import RecordDoesNotExistError
+from zimfarm_backend.db.live import publish_task_update
+from zimfarm_backend.db.models import ArchivedTask, Task, Worker
+
+
+def stale_tasks_with_status_clause(
+    status: TaskStatus, ago: datetime.datetime
+) -> sa.ColumnElement[bool]:
+    """Filter on tasks with a given status that have not been updated recently"""
+    return sa.and_(
+        Task.status == status,
+        sa.func.to_timestamp(
+            sa.cast(
+                sa.func.jsonb_path_query_first(
+                    Task.timestamp,
+                    sa.cast(
+                        f'strict $[*] ? (@[0] == "{status}")[1]."$date"',
+                        JSONPATH,
+                    ),
+                ),
+                sa.BigInteger,
+            )
+            / 1000
+        )
+        <= ago,
+    )
 
 
 def get_stale_tasks_with_status(
@@ -27,26 +58,56 @@ def get_stale_tasks_with_status(
 ) -> sa.ScalarResult[Task]:
     """Get tasks with a given status that have not been updated recently"""
     return session.execute(
-        sa.select(Task).where(
-            Task.status == status,
-            sa.func.to_timestamp(
-                sa.cast(
-                    sa.func.jsonb_path_query_first(
-                        Task.timestamp,
-                        sa.cast(
-                            f'strict $[*] ? (@[0] == "{status}")[1]."$date"',
-                            JSONPATH,
-                        ),
-                    ),
-                    sa.BigInteger,
-                )
-                / 1000
-            )
-            <= ago,
-        )
+        sa.select(Task).where(stale_tasks_with_status_clause(status, ago))
     ).scalars()
 
 
+def status_change_values(status: TaskStatus, now: datetime.datetime) -> dict[str, Any]:
+    """Values for a bulk UPDATE moving tasks to status at now.
+
+    Status timestamp and event are appended to the task's JSONB lists in SQL so
+    that a whole batch of tasks is updated without loading them.
+    """
+    return {
+        "status": status,
+        "updated_at": now,
+        "timestamp": Task.timestamp.op("||")(sa.literal([(status, now)], type_=JSONB)),
+        "events": Task.events.op("||")(
+            sa.literal([{"code": status, "timestamp": now}], type_=JSONB)
+        ),
+    }
+
+
+def bulk_update_tasks(
+    session: OrmSession,
+    where: sa.ColumnElement[bool],
+    values: dict[str, Any],
+) -> list[UUID]:
+    """Update all tasks matching where with a single statement, returning their ids"""
+    return list(
+        session.scalars(
+            sa.update(Task)
+            .where(where)
+            .values(**values)
+            .returning(Task.id)
+            .execution_options(synchronize_session="fetch")
+        ).all()
+    )
+
+
+def notify_tasks(session: OrmSession, task_ids: list[UUID], event: str):
+    """Fire notifications for event on all tasks updated by a bulk statement"""
+    for task_id in task_ids:
+        publish_task_update(session, task_id, event)
+        try:
+            # savepoint so that a failing notification does not abort the transaction
+            # (and the bulk update) for the following tasks
+            with session.begin_nested():
+                handle_notification(task_id, event, session)
+        except Exception:
+            logger.exception(f"Failed to send {event} notification for task {task_id}")
+
+
 def cancel_incomplete_tasks(session: OrmSession):
     """Cancel incomplete tasks that have not been updated recently"""
     logger.info(
@@ -55,34 +116,38 @@ def cancel_incomplete_tasks(session: OrmSession):
     now = getnow()
     ago = now - datetime.timedelta(seconds=STALLED_GONE_TIMEOUT)
 
-    tasks = session.execute(
-        sa.select(Task)
-        .join(Worker, Worker.id == Task.worker_id)
-        .where(
-            Task.status.not_in(
-                [
-                    *TaskStatus.complete(),
-                    TaskStatus.scraper_completed,
-                    TaskStatus.cancel_requested,
-                ]
-            ),
-            Task.updated_at <= ago,
-            Worker.last_seen > ago,
-        )
-    ).scalars()
-
-    nb_gone_tasks = 0
-    for task in tasks:
-        # Prepare payload for cancel request
-        payload = {
-            "canceled_by": "periodic-task-gone",
-            "timestamp": now,
-        }
-
-        task_cancel_requested_event_handler(session, task.id, payload)
-        nb_gone_tasks += 1
+    gone_tasks = sa.and_(
+        Task.status.not_in(
+            [
+                *TaskStatus.complete(),
+                TaskStatus.scraper_completed,
+                TaskStatus.cancel_requested,
+            ]
+        ),
+        Task.updated_at <= ago,
+        Task.worker_id.in_(sa.select(Worker.id).where(Worker.last_seen > ago)),
+    )
+    account = get_account_by_username_or_none(session, username=PERIODIC_TASK_GONE_NAME)
+    if account is None:
+        # only needed if there are tasks to cancel, fail as loudly as the per-task
+        # event handler used to
+        if session.scalar(sa.select(sa.exists().where(gone_tasks))):
+            raise RecordDoesNotExistError(
+                f"Account with username {PERIODIC_TASK_GONE_NAME} does not exist"
+            )
+        logger.info("::: requested cancellation of 0 gone tasks")
+        return
+    task_ids = bulk_update_tasks(
+        session,
+        gone_tasks,
+        {
+            **status_change_values(TaskStatus.cancel_requested, now),
+            "canceled_by_id": account.id,
+        },
+    )
+    notify_tasks(session, task_ids, TaskStatus.cancel_requested)
 
-    logger.info(f"::: requested cancellation of {nb_gone_tasks} gone tasks")
+    logger.info(f"::: requested cancellation of {len(task_ids)} gone tasks")
 
 
 def cancel_stale_tasks_with_status(
@@ -93,26 +158,19 @@ def cancel_stale_tasks_with_status(
     """
     logger.info(f":: canceling tasks with status `{status}` for more than {timeout}s")
     ago = now - datetime.timedelta(seconds=timeout)
-    tasks = get_stale_tasks_with_status(session, status, ago)
 
-    nb_canceled_tasks = 0
     account = get_account_by_username(session, username=PERIODIC_TASK_NAME)
-    for task in tasks:
-        task.status = TaskStatus.canceled
-        task.canceled_by_id = account.id
-        task.timestamp.append((TaskStatus.canceled, now))
-        task.events.append(
-            {
-                "code": TaskStatus.canceled,
-                "timestamp": now,
-            }
-        )
-        task.updated_at = now
-        nb_canceled_tasks += 1
-        session.add(task)
-    session.flush()
+    task_ids = bulk_update_tasks(
+        session,
+        stale_tasks_with_status_clause(status, ago),
+        {
+            **status_change_values(TaskStatus.canceled, now),
+            "canceled_by_id": account.id,
+        },
+    )
+    notify_tasks(session, task_ids, TaskStatus.canceled)
 
-    logger.info(f"::: canceled {nb_canceled_tasks} tasks")
+    logger.info(f"::: canceled {len(task_ids)} tasks")
 
 
 def close_scraper_completed_tasks(session: OrmSession, now: datetime.datetime):
@@ -124,22 +182,25 @@ def close_scraper_completed_tasks(session: OrmSession, now: datetime.datetime):
     )
     now = getnow()
     ago = now - datetime.timedelta(seconds=STALLED_COMPLETED_TIMEOUT)
-    tasks = get_stale_tasks_with_status(session, status, ago)
-    nb_suceeded_tasks = 0
-    nb_failed_tasks = 0
-    for task in tasks:
-        if "exit_code" in task.container and int(task.container["exit_code"]) == 0:
-            task.status = TaskStatus.succeeded
-            task.timestamp.append((TaskStatus.succeeded, now))
-            nb_suceeded_tasks += 1
-        else:
-            task.status = TaskStatus.failed
-            task.timestamp.append((TaskStatus.failed, now))
-            nb_failed_tasks += 1
-        session.add(task)
-    session.flush()
-    logger.info(f"::: succeeded {nb_suceeded_tasks} tasks")
-    logger.info(f"::: failed {nb_failed_tasks} tasks")
+    stale_clause = stale_tasks_with_status_clause(status, ago)
+    succeeded_clause = sa.cast(Task.container["exit_code"].astext, sa.Integer) == 0
+
+    # tasks with a zero exit code succeeded, all remaining ones (non-zero or
+    # missing exit code) failed. Once the first statement has run, succeeded
+    # tasks are no longer in scraper_completed status.
+    succeeded_ids = bulk_update_tasks(
+        session,
+        sa.and_(stale_clause, succeeded_clause),
+        status_change_values(TaskStatus.succeeded, now),
+    )
+    failed_ids = bulk_update_tasks(
+        session, stale_clause, status_change_values(TaskStatus.failed, now)
+    )
+    notify_tasks(session, succeeded_ids, TaskStatus.succeeded)
+    notify_tasks(session, failed_ids, TaskStatus.failed)
+
+    logger.info(f"::: succeeded {len(succeeded_ids)} tasks")
+    logger.info(f"::: failed {len(failed_ids)} tasks")
 
 
 def cancel_stale_tasks(session: OrmSession):
@@ -228,3 +289,9 @@ def remove_old_tasks(session: OrmSession):
     )
 
     logger.info(f"::: deleted {result.rowcount} tasks.")
+
+    result = session.execute(
+        sa.delete(ArchivedTask).where(ArchivedTask.updated_at < threshold)
+    )
+
+    logger.info(f"::: deleted {result.rowcount} archived tasks.")
@@ -39,13 +39,26 @@ OLD_TASK_DELETION_ENABLED = parse_bool(
     getenv("SHOULD_REMOVE_OLD_TASKS", default="false")
 )
 
+# Task archiving
+# complete tasks not updated for this long are moved to the archive table
+TASK_ARCHIVING_AGE = datetime.timedelta(
+    seconds=parse_timespan(getenv("TASK_ARCHIVING_AGE", default="30d"))
+)
+# maximum number of tasks archived on each run
+TASK_ARCHIVING_BATCH_SIZE = int(getenv("TASK_ARCHIVING_BATCH_SIZE", default=1000))
+
 # Periodic task names
 PERIODIC_TASK_NAME = "periodic-tasks"
+PERIODIC_TASK_GONE_NAME = "periodic-task-gone"
 
 # Background task execution intervals (can be overridden via environment variables)
 BACKGROUND_TASKS_SLEEP_DURATION = parse_timespan(
     getenv("BACKGROUND_TASKS_SLEEP_DURATION", default="1m")
 )
+# Port to expose Prometheus metrics of background tasks on (0 to disable)
+BACKGROUND_TASKS_METRICS_PORT = int(
+    getenv("BACKGROUND_TASKS_METRICS_PORT", default="0")
+)
 
 # Task-specific intervals
 REMOVE_OLD_TASKS_INTERVAL = datetime.timedelta(
@@ -60,6 +73,9 @@ CANCEL_STALE_TASKS_INTERVAL = datetime.timedelta(
 HISTORY_CLEANUP_INTERVAL = datetime.timedelta(
     seconds=parse_timespan(getenv("HISTORY_CLEANUP_INTERVAL", default="10m"))
 )
+ARCHIVE_OLD_TASKS_INTERVAL = datetime.timedelta(
+    seconds=parse_timespan(getenv("ARCHIVE_OLD_TASKS_INTERVAL", default="10m"))
+)
 REQUEST_TASKS_INTERVAL = datetime.timedelta(
     seconds=parse_timespan(getenv("REQUEST_TASKS_INTERVAL", default="1h"))
 )
@@ -86,3 +102,7 @@ CMS_TOKEN_RENEWAL_WINDOW = datetime.timedelta(
 CMS_MAXIMUM_RETRY_INTERVAL = parse_timespan(
     getenv("CMS_MAXIMUM_RETRY_INTERVAL", default="24h")
 )
+# Maximum number of files to notify CMS about on each run
+CMS_NOTIFICATIONS_BATCH_SIZE = int(getenv("CMS_NOTIFICATIONS_BATCH_SIZE", default=200))
+# Maximum number of concurrent requests to CMS
+CMS_NOTIFICATIONS_CONCURRENCY = int(getenv("CMS_NOTIFICATIONS_CONCURRENCY", default=8))
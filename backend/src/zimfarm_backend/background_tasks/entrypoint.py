@@ -2,14 +2,19 @@ import argparse
 import logging
 from time import sleep
 
+from prometheus_client import start_http_server
+
 from zimfarm_backend.__about__ import __version__
 from zimfarm_backend.background_tasks import logger
+from zimfarm_backend.background_tasks.archive_tasks import archive_old_tasks
 from zimfarm_backend.background_tasks.cancel_tasks import (
     cancel_incomplete_tasks,
     cancel_stale_tasks,
     remove_old_tasks,
 )
 from zimfarm_backend.background_tasks.constants import (
+    ARCHIVE_OLD_TASKS_INTERVAL,
+    BACKGROUND_TASKS_METRICS_PORT,
     BACKGROUND_TASKS_SLEEP_DURATION,
     CANCEL_INCOMPLETE_TASKS_INTERVAL,
     CANCEL_STALE_TASKS_INTERVAL,
@@ -55,6 +60,10 @@ tasks: list[TaskConfig] = [
         func=history_cleanup,
         interval=HISTORY_CLEANUP_INTERVAL,
     ),
+    TaskConfig(
+        func=archive_old_tasks,
+        interval=ARCHIVE_OLD_TASKS_INTERVAL,
+    ),
     TaskConfig(
         func=request_tasks,
         interval=REQUEST_TASKS_INTERVAL,
@@ -93,6 +102,9 @@ def main():
         upgrade_db_schema()
     check_if_schema_is_up_to_date()
     create_initial_account()
+    if BACKGROUND_TASKS_METRICS_PORT:
+        logger.info(f"Exposing metrics on port {BACKGROUND_TASKS_METRICS_PORT}")
+        start_http_server(BACKGROUND_TASKS_METRICS_PORT)
     while True:
         now = getnow()
         for task_config in tasks:
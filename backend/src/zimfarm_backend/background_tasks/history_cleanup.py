@@ -1,15 +1,15 @@
-from sqlalchemy import func, select
+from sqlalchemy import delete, func, select
 from sqlalchemy.orm import Session as OrmSession
 
 from zimfarm_backend.background_tasks import logger
 from zimfarm_backend.background_tasks.constants import HISTORY_TASK_PER_RECIPE
-from zimfarm_backend.db.models import Recipe, Task
+from zimfarm_backend.db.models import ArchivedTask, Recipe, Task
 
 
 def history_cleanup(session: OrmSession):
     """removes tasks for which the recipe has been run multiple times.
 
-    Uses HISTORY_TASK_PER_RECIPE
+    Uses HISTORY_TASK_PER_RECIPE, archived tasks count towards it
     """
 
     logger.info(f":: removing tasks history (>{HISTORY_TASK_PER_RECIPE})")
@@ -34,3 +34,36 @@ def history_cleanup(session: OrmSession):
             session.delete(task)
             nb_deleted_tasks += 1
     logger.info(f"::: deleted {nb_deleted_tasks} tasks")
+
+    # archived tasks are older than the ones in the task table, a recipe keeps the
+    # most recent ones remaining after those
+    nb_tasks = (
+        select(Task.recipe_id, func.count(Task.id).label("nb_tasks"))
+        .group_by(Task.recipe_id)
+        .subquery()
+    )
+    ranked_archived_tasks = (
+        select(
+            ArchivedTask.id,
+            (
+                func.row_number().over(
+                    partition_by=ArchivedTask.recipe_id,
+                    order_by=ArchivedTask.updated_at.desc(),
+                )
+                + func.coalesce(nb_tasks.c.nb_tasks, 0)
+            ).label("rank"),
+        )
+        .join(nb_tasks, nb_tasks.c.recipe_id == ArchivedTask.recipe_id, isouter=True)
+        .where(ArchivedTask.recipe_id.is_not(None))
+        .subquery()
+    )
+    nb_deleted_archived_tasks = session.execute(
+        delete(ArchivedTask).where(
+            ArchivedTask.id.in_(
+                select(ranked_archived_tasks.c.id).where(
+                    ranked_archived_tasks.c.rank > HISTORY_TASK_PER_RECIPE
+                )
+            )
+        )
+    ).rowcount
+    logger.info(f"::: deleted {nb_deleted_archived_tasks} archived tasks")
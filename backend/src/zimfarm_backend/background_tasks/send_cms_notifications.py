@@ -1,9 +1,11 @@
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
 from typing import Any, cast
 from uuid import UUID
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 from sqlalchemy.orm import Session as OrmSession
 
@@ -11,6 +13,8 @@ from zimfarm_backend.background_tasks import logger
 from zimfarm_backend.background_tasks.constants import (
     CMS_AUTH_MODE,
     CMS_MAXIMUM_RETRY_INTERVAL,
+    CMS_NOTIFICATIONS_BATCH_SIZE,
+    CMS_NOTIFICATIONS_CONCURRENCY,
     CMS_OAUTH_AUDIENCE_ID,
     CMS_OAUTH_CLIENT_ID,
     CMS_OAUTH_CLIENT_SECRET,
@@ -115,30 +119,78 @@ class CMSClientTokenProvider:
 cms_client_token_provider = CMSClientTokenProvider()
 
 
-def advertise_book_to_cms(session: OrmSession, task: TaskFullSchema, file_name: str):
-    """inform openZIM CMS (or compatible) of a created ZIM in the farm
+class CMSNotifier:
+    """Post book notifications to CMS over a pooled HTTP session
 
-    Safe to re-run as successful requests are skipped
+    Requests are sent concurrently, at most `concurrency` at a time, reusing
+    connections from the session's pool.
     """
 
-    file_data = task.files[file_name]
+    def __init__(self, concurrency: int):
+        self.concurrency = max(1, concurrency)
+        self.http_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.http_session.mount("http://", adapter)
+        self.http_session.mount("https://", adapter)
 
-    if file_data.cms_notified:
-        logger.warning(f"Book {file_data.name} already advertised to CMS")
-        return
-    try:
-        access_token = cms_client_token_provider.get_access_token()
-    except Exception:
-        logger.exception("Unable to generate access token to authenticate with CMS")
-        return
+    def post_book(self, payload: dict[str, Any], access_token: str) -> bool:
+        """Post a single book payload, returning whether CMS acknowledged it"""
+        url = f"{CMS_BASE_URL}/zimfarm-notifications"
+        try:
+            resp = self.http_session.post(
+                url,
+                json=payload,
+                timeout=REQ_TIMEOUT_CMS,
+                headers={"Authorization": f"Bearer {access_token}"},
+            )
+        except Exception:
+            logger.exception(f"Unable to advertise book to CMS at {url}")
+            return False
 
-    file_data.cms_on = getnow()
-    file_data.cms_notified = False
-    url = f"{CMS_BASE_URL}/zimfarm-notifications"
-    try:
-        resp = requests.post(
-            url,
-            json=get_openzimcms_payload(
+        status_code = HTTPStatus(resp.status_code)
+        if not status_code.is_success:
+            logger.error(
+                f"CMS returned an error {resp.status_code} for book {payload['id']}"
+            )
+        return status_code.is_success
+
+    def post_books(
+        self, payloads: list[dict[str, Any]], access_token: str
+    ) -> list[bool]:
+        """Post book payloads concurrently, returning results in the same order"""
+        if len(payloads) <= 1:
+            return [self.post_book(payload, access_token) for payload in payloads]
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            return list(
+                executor.map(self.post_book, payloads, [access_token] * len(payloads))
+            )
+
+
+cms_notifier = CMSNotifier(concurrency=CMS_NOTIFICATIONS_CONCURRENCY)
+
+
+def advertise_books_to_cms(
+    session: OrmSession, books: list[tuple[TaskFullSchema, str]]
+) -> int:
+    """inform openZIM CMS (or compatible) of created ZIMs in the farm
+
+    `books` is a list of (task, file name) tuples. Safe to re-run as books
+    already acknowledged by CMS are skipped. Delivery result of each book is
+    recorded on its file so that only failed ones are retried.
+
+    Returns the number of books acknowledged by CMS.
+    """
+
+    pending: list[tuple[TaskFullSchema, TaskFileSchema, dict[str, Any]]] = []
+    invalid: list[tuple[TaskFullSchema, TaskFileSchema]] = []
+    for task, file_name in books:
+        file_data = task.files[file_name]
+        if file_data.cms_notified:
+            logger.warning(f"Book {file_data.name} already advertised to CMS")
+            continue
+        # a single bad book must not prevent the others from being advertised
+        try:
+            payload = get_openzimcms_payload(
                 file=file_data,
                 warehouse_path=task.config.warehouse_path,
                 zimcheck_base_url=(
@@ -146,32 +198,62 @@ def advertise_book_to_cms(session: OrmSession, task: TaskFullSchema, file_name:
                 ),
                 recipe_id=task.recipe_id,
                 recipe_name=task.recipe_name or task.original_recipe_name,
+            )
+        except Exception:
+            logger.exception(
+                f"Unable to build CMS payload for book {file_data.name} "
+                f"of task {task.id}"
+            )
+            invalid.append((task, file_data))
+            continue
+        pending.append((task, file_data, payload))
+
+    if not pending and not invalid:
+        return 0
+
+    # invalid books are recorded as failed so that they are retried later
+    outcomes = [(task, file_data, False) for task, file_data in invalid]
+    if pending:
+        try:
+            access_token = cms_client_token_provider.get_access_token()
+        except Exception:
+            # pending books are left untouched, invalid ones are still recorded
+            logger.exception("Unable to generate access token to authenticate with CMS")
+        else:
+            results = cms_notifier.post_books(
+                [payload for _, _, payload in pending], access_token
+            )
+            outcomes += [
+                (task, file_data, cms_notified)
+                for (task, file_data, _), cms_notified in zip(
+                    pending, results, strict=True
+                )
+            ]
+
+    # record requests results
+    cms_on = getnow()
+    for task, file_data, cms_notified in outcomes:
+        file_data.cms_on = cms_on
+        file_data.cms_notified = cms_notified
+        create_or_update_task_file(
+            session,
+            FileCreateUpdateSchema(
+                task_id=task.id,
+                name=file_data.name,
+                status=file_data.status,
+                cms_on=file_data.cms_on,
+                cms_notified=file_data.cms_notified,
             ),
-            timeout=REQ_TIMEOUT_CMS,
-            headers={"Authorization": f"Bearer {access_token}"},
         )
-    except Exception:
-        logger.exception(f"Unable to advertise book to CMS at {url}")
-    else:
-        status_code = HTTPStatus(resp.status_code)
-        file_data.cms_notified = status_code.is_success
-        if not status_code.is_success:
-            logger.error(
-                f"CMS returned an error {resp.status_code} for book"
-                f"{file_data.info['id']}"
-            )
+    return sum(cms_notified for _, _, cms_notified in outcomes)
 
-    # record request result
-    create_or_update_task_file(
-        session,
-        FileCreateUpdateSchema(
-            task_id=task.id,
-            name=file_name,
-            status=file_data.status,
-            cms_on=file_data.cms_on,
-            cms_notified=file_data.cms_notified,
-        ),
-    )
+
+def advertise_book_to_cms(session: OrmSession, task: TaskFullSchema, file_name: str):
+    """inform openZIM CMS (or compatible) of a created ZIM in the farm
+
+    Safe to re-run as successful requests are skipped
+    """
+    advertise_books_to_cms(session, [(task, file_name)])
 
 
 def get_openzimcms_payload(
@@ -215,7 +297,11 @@ def notify_cms_for_checked_files(session: OrmSession):
 
     logger.info(":: checking for files needing CMS notification")
 
-    results = get_files_to_notify(session, retry_interval=CMS_MAXIMUM_RETRY_INTERVAL)
+    results = get_files_to_notify(
+        session,
+        limit=CMS_NOTIFICATIONS_BATCH_SIZE,
+        retry_interval=CMS_MAXIMUM_RETRY_INTERVAL,
+    )
 
     if results.nb_records == 0:
         logger.info("::: no files need CMS notification")
@@ -223,20 +309,23 @@ def notify_cms_for_checked_files(session: OrmSession):
 
     logger.info(f"::: found {len(results.files)} file(s) needing CMS notification")
 
-    nb_notified = 0
+    tasks: dict[UUID, TaskFullSchema] = {}
+    books: list[tuple[TaskFullSchema, str]] = []
+    for file in results.files:
+        if file.task_id not in tasks:
+            try:
+                tasks[file.task_id] = get_task_by_id(session, file.task_id)
+            except Exception:
+                logger.exception(f"Unable to load task {file.task_id}, skipping")
+                continue
+        books.append((tasks[file.task_id], file.filename))
 
     try:
-        for file in results.files:
-            task_full = get_task_by_id(session, file.task_id)
-            advertise_book_to_cms(session, task_full, file.filename)
-            nb_notified += 1
-
-            logger.debug(
-                f"Notified CMS for file {file.filename} from task {file.task_id}"
-            )
+        nb_notified = advertise_books_to_cms(session, books)
     except Exception:
-        logger.exception(
-            f"Failed to send CMS notification, sent {nb_notified} notifications to CMS"
-        )
+        logger.exception("Failed to send CMS notifications")
     else:
-        logger.info(f"::: Sent {nb_notified} notifications to CMS")
+        logger.info(
+            f"::: Sent {nb_notified} of {len(books)} notifications to CMS "
+            f"({results.nb_records} pending)"
+        )
@@ -5,6 +5,7 @@ from dataclasses import dataclass, field
 from sqlalchemy.orm import Session as OrmSession
 
 from zimfarm_backend.common import getnow
+from zimfarm_backend.common.metrics import observe_background_job
 
 
 @dataclass
@@ -31,5 +32,6 @@ class TaskConfig:
 
     def execute(self, session: OrmSession) -> None:
         """Execute the task and update the last run timestamp."""
-        self.func(session)
+        with observe_background_job(self.task_name):
+            self.func(session)
         self._last_run = getnow()
@@ -160,15 +160,68 @@ GITHUB_PACKAGE_REGISTRY_CACHE_DURATION = datetime.timedelta(
     )
 )
 
+# how long an authenticated account is reused across requests (per API process)
+# before being reloaded from the DB. Changes through update/delete are immediate.
+PRINCIPAL_CACHE_DURATION = datetime.timedelta(
+    seconds=parse_timespan(getenv("PRINCIPAL_CACHE_DURATION", default="30s"))
+)
+
+# how often offliners and offliner definitions cached by each process are checked
+# for changes made by other processes. Changes through this process are immediate.
+OFFLINERS_CACHE_CHECK_INTERVAL = parse_timespan(
+    getenv("OFFLINERS_CACHE_CHECK_INTERVAL", default="10s")
+)
 
 REQUESTS_TIMEOUT = parse_timespan(getenv("REQUESTS_TIMEOUT_DURATION", default="30s"))
 
 
 POSTGRES_URI = getenv("POSTGRES_URI", mandatory=True)
+POSTGRES_POOL_SIZE = int(getenv("POSTGRES_POOL_SIZE", default="5"))
+POSTGRES_MAX_OVERFLOW = int(getenv("POSTGRES_MAX_OVERFLOW", default="10"))
+# comma-separated URIs of read replicas used by read-only endpoints
+POSTGRES_REPLICA_URIS = [
+    uri.strip()
+    for uri in getenv("POSTGRES_REPLICA_URIS", default="").split(",")
+    if uri.strip()
+]
+POSTGRES_REPLICA_POOL_SIZE = int(getenv("POSTGRES_REPLICA_POOL_SIZE", default="5"))
+POSTGRES_REPLICA_MAX_OVERFLOW = int(
+    getenv("POSTGRES_REPLICA_MAX_OVERFLOW", default="10")
+)
+# replicas lagging more than this behind primary are not used
+POSTGRES_REPLICA_MAX_LAG = parse_timespan(
+    getenv("POSTGRES_REPLICA_MAX_LAG", default="30s")
+)
+# how often replication lag of each replica is checked
+POSTGRES_REPLICA_CHECK_INTERVAL = parse_timespan(
+    getenv("POSTGRES_REPLICA_CHECK_INTERVAL", default="10s")
+)
 
 WORKER_OFFLINE_DELAY_DURATION = parse_timespan(
     getenv("WORKER_OFFLINE_DELAY_DURATION", default="20m")
 )
+# interval at which last seen timestamps of polling workers are written in bulk;
+# must remain well below WORKER_OFFLINE_DELAY_DURATION
+WORKER_LAST_SEEN_FLUSH_INTERVAL = parse_timespan(
+    getenv("WORKER_LAST_SEEN_FLUSH_INTERVAL", default="30s")
+)
+
+# number of candidate tasks considered together when filling a worker's resources
+# while its top-priority task waits for resources to free up
+SCHEDULING_LOOKAHEAD = int(getenv("SCHEDULING_LOOKAHEAD", default="10"))
+
+# live updates (task events, worker check-ins, queue changes) streamed to clients
+# interval of keep-alive comments sent on idle streams
+LIVE_UPDATES_KEEPALIVE_INTERVAL = parse_timespan(
+    getenv("LIVE_UPDATES_KEEPALIVE_INTERVAL", default="15s")
+)
+# maximum number of streams per API process, additional clients keep polling
+LIVE_UPDATES_MAX_SUBSCRIBERS = int(
+    getenv("LIVE_UPDATES_MAX_SUBSCRIBERS", default="500")
+)
+# updates buffered per stream; a client lagging behind has its backlog dropped and
+# is told to reload its data
+LIVE_UPDATES_QUEUE_SIZE = int(getenv("LIVE_UPDATES_QUEUE_SIZE", default="100"))
 
 ALEMBIC_UPGRADE_HEAD_ON_START = parse_bool(
     getenv("ALEMBIC_UPGRADE_HEAD_ON_START", default="false")
@@ -0,0 +1,189 @@
+"""Prometheus metrics shared by the API and the background tasks
+
+SQL statements are accounted to the unit of work (HTTP request or background
+job) that issued them through a context variable so that N+1 patterns show
+up as a high number of statements per request.
+"""
+
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExceptionContext
+from sqlalchemy.pool import PoolProxiedConnection, QueuePool
+
+SIZE_BUCKETS = (2**6, 2**8, 2**10, 2**12, 2**14, 2**16, 2**18, 2**20, 2**22, 2**24)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500, 1000)
+JOB_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "zimfarm_http_request_duration_seconds",
+    "Duration of HTTP requests",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_SIZE = Histogram(
+    "zimfarm_http_request_size_bytes",
+    "Size of HTTP request bodies",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "zimfarm_http_response_size_bytes",
+    "Size of HTTP response bodies",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+)
+HTTP_REQUEST_DB_STATEMENTS = Histogram(
+    "zimfarm_http_request_db_statements",
+    "Number of SQL statements executed per HTTP request",
+    ["method", "route"],
+    buckets=COUNT_BUCKETS,
+)
+HTTP_REQUEST_DB_DURATION = Histogram(
+    "zimfarm_http_request_db_duration_seconds",
+    "Time spent executing SQL statements per HTTP request",
+    ["method", "route"],
+)
+DB_STATEMENT_DURATION = Histogram(
+    "zimfarm_db_statement_duration_seconds",
+    "Duration of individual SQL statements",
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "zimfarm_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "zimfarm_db_pool_checked_out_connections",
+    "Number of connections currently checked out from the pool",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "zimfarm_db_pool_overflow_connections",
+    "Number of connections opened above the pool size",
+)
+DB_REPLICA_LAG = Gauge(
+    "zimfarm_db_replica_lag_seconds",
+    "Replication lag of read replicas, as of last check",
+    ["replica"],
+)
+BACKGROUND_JOB_DURATION = Histogram(
+    "zimfarm_background_job_duration_seconds",
+    "Duration of background jobs",
+    ["job", "status"],
+    buckets=JOB_BUCKETS,
+)
+BACKGROUND_JOB_DB_STATEMENTS = Histogram(
+    "zimfarm_background_job_db_statements",
+    "Number of SQL statements executed per background job run",
+    ["job"],
+    buckets=COUNT_BUCKETS,
+)
+NOTIFICATIONS = Counter(
+    "zimfarm_notifications_total",
+    "Number of notifications dispatched",
+    ["method", "result"],
+)
+NOTIFICATION_DURATION = Histogram(
+    "zimfarm_notification_duration_seconds",
+    "Duration of notification dispatch",
+    ["method"],
+)
+
+
+@dataclass
+class QueryStats:
+    """SQL statements executed within a unit of work"""
+
+    count: int = 0
+    duration: float = 0.0
+
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Generator[QueryStats]:
+    """Account SQL statements executed within this context to the yielded stats"""
+    stats = QueryStats()
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool measuring how long callers wait for a connection"""
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+
+def _before_cursor_execute(conn: Connection, *_: Any) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn: Connection, *_: Any) -> None:
+    duration = time.perf_counter() - conn.info["query_started"].pop()
+    DB_STATEMENT_DURATION.observe(duration)
+    if (stats := _query_stats.get()) is not None:
+        stats.count += 1
+        stats.duration += duration
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    if context.connection is not None and (
+        started := context.connection.info.get("query_started")
+    ):
+        started.pop()
+
+
+def instrument_engine(engine: Engine, *, pool_gauges: bool = True) -> None:
+    """Record SQL statements duration and pool usage of engine
+
+    Pool gauges can only track one engine (the primary one).
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+    if pool_gauges and isinstance(engine.pool, QueuePool):
+        pool = engine.pool
+        DB_POOL_CHECKED_OUT.set_function(pool.checkedout)
+        DB_POOL_OVERFLOW.set_function(lambda: max(pool.overflow(), 0))
+
+
+@contextmanager
+def observe_background_job(job: str) -> Generator[None]:
+    """Record duration, outcome and SQL statements of a background job run"""
+    started = time.perf_counter()
+    status = "failure"
+    with track_queries() as stats:
+        try:
+            yield
+            status = "success"
+        finally:
+            BACKGROUND_JOB_DURATION.labels(job=job, status=status).observe(
+                time.perf_counter() - started
+            )
+            BACKGROUND_JOB_DB_STATEMENTS.labels(job=job).observe(stats.count)
+
+
+def record_notification(method: str, *, success: bool, duration: float) -> None:
+    NOTIFICATIONS.labels(
+        method=method, result="success" if success else "failure"
+    ).inc()
+    NOTIFICATION_DURATION.labels(method=method).observe(duration)
+
+
+def record_skipped_notifications(method: str, count: int) -> None:
+    """notifications not dispatched because method is not configured"""
+    NOTIFICATIONS.labels(method=method, result="skipped").inc(count)
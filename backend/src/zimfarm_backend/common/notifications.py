@@ -4,6 +4,7 @@
 import json
 import logging
 import os
+import time
 from typing import Any, ClassVar
 from uuid import UUID
 
@@ -15,6 +16,8 @@ from pydantic import ValidationError
 
 from zimfarm_backend.common.constants import (
     BASE_DIR,
+    MAILGUN_API_KEY,
+    MAILGUN_API_URL,
     PUBLIC_URL,
     REQ_TIMEOUT_NOTIFICATIONS,
     SLACK_EMOJI,
@@ -25,6 +28,10 @@ from zimfarm_backend.common.constants import (
 )
 from zimfarm_backend.common.emailing import send_email_via_mailgun
 from zimfarm_backend.common.enums import TaskStatus
+from zimfarm_backend.common.metrics import (
+    record_notification,
+    record_skipped_notifications,
+)
 from zimfarm_backend.common.schemas.models import (
     EventNotificationSchema,
     RecipeNotificationSchema,
@@ -89,15 +96,25 @@ def get_context(task: dict[str, Any]) -> dict[str, Any]:
 
 
 def handle_mailgun_notification(task: dict[str, Any], recipients: list[str]):
+    # return early if mailgun is not configured
+    if not MAILGUN_API_URL or not MAILGUN_API_KEY:
+        record_skipped_notifications("mailgun", len(recipients))
+        return
+
     context = get_context(task)
     subject = jinja_env.get_template("email_subject.txt").render(**context)
     body = jinja_env.get_template("email_body.html").render(**context)
     for recipient in recipients:
-        send_email_via_mailgun(recipient, subject, body)
+        started = time.perf_counter()
+        sent = send_email_via_mailgun(recipient, subject, body)
+        record_notification(
+            "mailgun", success=sent is not None, duration=time.perf_counter() - started
+        )
 
 
 def handle_webhook_notification(task: dict[str, Any], urls: list[str]):
     for url in urls:
+        started = time.perf_counter()
         try:
             resp = requests.post(
                 url,
@@ -109,15 +126,23 @@ def handle_webhook_notification(task: dict[str, Any], urls: list[str]):
         except Exception as exc:
             logger.error(f"Webhook failed with: {exc}")
             logger.exception(exc)
+            success = False
+        else:
+            success = True
+        record_notification(
+            "webhook", success=success, duration=time.perf_counter() - started
+        )
 
 
 def handle_slack_notification(task: dict[str, Any], channels: list[str]):
     # return early if slack is not configured
     if not SLACK_URL:
+        record_skipped_notifications("slack", len(channels))
         return
 
     context = get_context(task)
     for channel in channels:
+        started = time.perf_counter()
         try:
             requests.post(
                 SLACK_URL,
@@ -157,6 +182,12 @@ def handle_slack_notification(task: dict[str, Any], channels: list[str]):
         except Exception as exc:
             logger.error(f"Failed to submit slack notification: {exc}")
             logger.exception(exc)
+            success = False
+        else:
+            success = True
+        record_notification(
+            "slack", success=success, duration=time.perf_counter() - started
+        )
 
 
 def handle_notification(task_id: UUID, event: str, session: so.Session):
@@ -7,6 +7,7 @@ from uuid import UUID
 
 from pydantic import (
     BaseModel,
+    ConfigDict,
     EmailStr,
     Field,
     HttpUrl,
@@ -32,6 +33,9 @@ from zimfarm_backend.common.schemas.fields import (
 
 
 class LanguageSchema(BaseModel):
+    # resolved once and shared by all recipes of a language
+    model_config = ConfigDict(frozen=True)
+
     code: ZIMLangCode
     name: NotEmptyString
 
@@ -108,6 +112,11 @@ class Paginator(BaseModel):
     limit: int
     page_size: int
     page: int
+    # cursor to pass to get the page following this one, if any
+    next_cursor: str | None = None
+    # whether nb_records is an estimate rather than an exact count (always the case
+    # for pages requested with a cursor)
+    estimated_count: bool = False
 
 
 def calculate_pagination_metadata(
@@ -116,6 +125,8 @@ def calculate_pagination_metadata(
     skip: int,
     limit: int,
     page_size: int,
+    next_cursor: str | None = None,
+    estimated_count: bool = False,
 ) -> Paginator:
     page = math.floor(skip / limit) + 1 if limit > 0 else 1
     if nb_records == 0:
@@ -125,13 +136,17 @@ def calculate_pagination_metadata(
             limit=limit,
             page_size=0,
             page=page,
+            next_cursor=next_cursor,
+            estimated_count=estimated_count,
         )
     return Paginator(
         nb_records=nb_records,
         skip=skip,
         limit=limit,
-        page_size=min(page_size, nb_records),
+        page_size=page_size if estimated_count else min(page_size, nb_records),
         page=page,
+        next_cursor=next_cursor,
+        estimated_count=estimated_count,
     )
 
 
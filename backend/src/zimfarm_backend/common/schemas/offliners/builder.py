@@ -207,24 +207,29 @@ def generate_similarity_data(
     flags: dict[str, Any], offliner: OfflinerSchema, spec: OfflinerSpecSchema
 ) -> list[str]:
     """Generate the similarity list of flags data."""
-    schema_cls = build_offliner_model(offliner, spec)
+    # resolve aliases the way the offliner model would, without building the model
+    alias_generator = get_base_model_cls(offliner.base_model).model_config.get(
+        "alias_generator"
+    )
     result: list[list[str]] = []
     for similarity_data in spec.similarity_data:
-        # find the pydantic field info from the schema class
-        field_info = schema_cls.model_fields[similarity_data.flag]
+        flag = spec.flags[similarity_data.flag]
+        alias = flag.alias or (
+            alias_generator(similarity_data.flag) if callable(alias_generator) else None
+        )
         # find the value of the flag in the data. This is typically at the alias of the
         # field given we always dump with aliases. Sometimes, it turns out to be at the
         # name of the python identifier because we originally dumped without aliases.
         value: Any | None = None
-        if field_info.alias:
-            value = flags.get(field_info.alias, flags.get(similarity_data.flag))
+        if alias:
+            value = flags.get(alias, flags.get(similarity_data.flag))
         else:
             value = flags.get(similarity_data.flag)
 
         if value is None:
             logger.warning(
                 f"Could not find value in data that matched the keys: "
-                f"'{field_info.alias}', '{similarity_data.flag}'"
+                f"'{alias}', '{similarity_data.flag}'"
             )
             continue
         result.append(transform_data([value], similarity_data.transformers))
@@ -5,7 +5,14 @@ from typing import Annotated, Any, Literal
 from uuid import UUID
 
 import pytz
-from pydantic import AfterValidator, AnyUrl, Field, computed_field, field_serializer
+from pydantic import (
+    AfterValidator,
+    AnyUrl,
+    ConfigDict,
+    Field,
+    computed_field,
+    field_serializer,
+)
 
 from zimfarm_backend.common import getnow
 from zimfarm_backend.common.constants import (
@@ -18,6 +25,7 @@ from zimfarm_backend.common.schemas.fields import ZIMCPU, ZIMDisk, ZIMMemory
 from zimfarm_backend.common.schemas.models import (
     DockerImageVersionSchema,
     ExpandedRecipeConfigSchema,
+    ExpandedRecipeDockerImageSchema,
     LanguageSchema,
     RecipeConfigSchema,
     RecipeNotificationSchema,
@@ -62,6 +70,8 @@ class ConfigWithOnlyOfflinerAndResourcesSchema(ConfigWithOnlyResourcesSchema):
     """
 
     offliner: str
+    # scraper image, used by workers to pull likely upcoming images in advance
+    image: ExpandedRecipeDockerImageSchema | None = None
 
 
 class MostRecentTaskSchema(BaseModel):
@@ -465,6 +475,9 @@ class OfflinerDefinitionSchema(BaseModel):
     Schema for reading a offliner definition model
     """
 
+    # shared by all callers through the offliners cache
+    model_config = ConfigDict(frozen=True)
+
     id: UUID = Field(exclude=True)
     offliner: str
     version: str
@@ -478,6 +491,9 @@ class OfflinerSchema(BaseModel):
     Schema for reading a offliner model
     """
 
+    # shared by all callers through the offliners cache
+    model_config = ConfigDict(frozen=True)
+
     id: str
     base_model: str
     docker_image_name: DockerImageName
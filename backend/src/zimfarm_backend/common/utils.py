@@ -16,6 +16,7 @@ from zimfarm_backend.common.notifications import handle_notification
 from zimfarm_backend.common.schemas.models import FileCreateUpdateSchema
 from zimfarm_backend.db.account import get_account_by_identifier
 from zimfarm_backend.db.exceptions import RecordDoesNotExistError
+from zimfarm_backend.db.live import publish_task_update
 from zimfarm_backend.db.models import Task
 from zimfarm_backend.db.recipe import update_recipe_duration
 from zimfarm_backend.db.tasks import create_or_update_task_file
@@ -65,6 +66,8 @@ def task_event_handler(
     # we need event to be saved in DB before running notifications
     session.flush()
 
+    publish_task_update(session, task_id, event)
+
     # fire notifications after event has been handled
     handle_notification(task_id, event, session)
 
@@ -1,46 +1,122 @@
-from collections.abc import Callable, Generator
+import base64
+import json
+from collections.abc import Callable, Generator, Sequence
 from typing import Any
+from typing import cast as cast_type
 
-from bson.json_util import LEGACY_JSON_OPTIONS, dumps, loads
-from sqlalchemy import SelectBase, create_engine, func, select
+import orjson
+from bson.json_util import LEGACY_JSON_OPTIONS, default, loads
+from sqlalchemy import (
+    BigInteger,
+    ClauseElement,
+    ColumnElement,
+    Engine,
+    Executable,
+    Float,
+    SelectBase,
+    Table,
+    Text,
+    UnaryExpression,
+    and_,
+    cast,
+    column,
+    create_engine,
+    func,
+    literal_column,
+    or_,
+    select,
+    table,
+    tuple_,
+)
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import DeclarativeBase, InstrumentedAttribute, sessionmaker
 from sqlalchemy.orm import Session as OrmSession
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql.compiler import SQLCompiler
 
-from zimfarm_backend.common.constants import POSTGRES_URI
+from zimfarm_backend.common.constants import (
+    POSTGRES_MAX_OVERFLOW,
+    POSTGRES_POOL_SIZE,
+    POSTGRES_REPLICA_CHECK_INTERVAL,
+    POSTGRES_REPLICA_MAX_LAG,
+    POSTGRES_REPLICA_MAX_OVERFLOW,
+    POSTGRES_REPLICA_POOL_SIZE,
+    POSTGRES_REPLICA_URIS,
+    POSTGRES_URI,
+)
+from zimfarm_backend.common.metrics import InstrumentedQueuePool, instrument_engine
+from zimfarm_backend.db.models import TableVersion
+from zimfarm_backend.db.replica import ReplicaRouter
 
+# bson extended JSON options for JSON columns: datetimes are stored as
+# {"$date": <milliseconds>} and read back as naive (UTC) datetimes
+ZIMFARM_JSON_OPTIONS = LEGACY_JSON_OPTIONS.with_options(tz_aware=False, tzinfo=None)
+
+
+# custom deserializer of JSON columns, equivalent to bson loads with naive datetimes
+# (otherwise the deserialization produces aware datetimes based on local TZ); most
+# documents hold no bson marker at all and are parsed by orjson instead
+def zimfarm_loads(s: str | bytes) -> Any:
+    # psycopg passes raw column values as bytes
+    has_markers = b'"$' in s if isinstance(s, bytes) else '"$' in s
+    if has_markers:
+        return loads(s, json_options=ZIMFARM_JSON_OPTIONS)
+    return orjson.loads(s)
 
-# custom overload of bson deserializer to make naive datetime
-# this is needed to have objects from the DB with naive datetime properties
-# (otherwise the deserialization produces aware datetimes based on local TZ)
-def zimfarm_loads(s: str, *args: Any, **kwargs: Any) -> Any:
-    return loads(
-        s,
-        *args,
-        json_options=LEGACY_JSON_OPTIONS.with_options(tz_aware=False, tzinfo=None),
-        **kwargs,
-    )
 
+def _bson_default(obj: Any) -> Any:
+    return default(obj, ZIMFARM_JSON_OPTIONS)
 
-# custom overload of bson serializer to convert datetime objects to milliseconds
-# This is needed as the Pymongo version has changed since the codebase was upgraded
-# and the DEFAULT_JSON_OPTIONS converts datetime objects to isoformat which breaks
-# the format stored in the database.
-def zimfarm_dumps(obj: Any, *args: Any, **kwargs: Any):
-    return dumps(obj, *args, json_options=LEGACY_JSON_OPTIONS, **kwargs)
+
+# custom serializer of JSON columns, equivalent to bson dumps with LEGACY options
+# so that datetime objects are converted to milliseconds, the format stored in the
+# database (DEFAULT_JSON_OPTIONS converts them to isoformat), but rendered by orjson
+def zimfarm_dumps(obj: Any) -> str:
+    return orjson.dumps(
+        obj,
+        default=_bson_default,
+        option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+    ).decode()
+
+
+def create_zimfarm_engine(uri: str, **kwargs: Any) -> Engine:
+    return create_engine(
+        uri,
+        echo=False,
+        json_serializer=zimfarm_dumps,
+        json_deserializer=zimfarm_loads,
+        poolclass=InstrumentedQueuePool,
+        **kwargs,
+    )
 
 
 if (
     POSTGRES_URI == "nodb"
 ):  # this is a hack for cases where we do not need the DB, e.g. unit tests
     Session = None
+    replica_router = None
 else:
-    Session = sessionmaker(
-        bind=create_engine(
-            POSTGRES_URI,
-            echo=False,
-            json_serializer=zimfarm_dumps,
-            json_deserializer=zimfarm_loads,
+    engine = create_zimfarm_engine(
+        POSTGRES_URI, pool_size=POSTGRES_POOL_SIZE, max_overflow=POSTGRES_MAX_OVERFLOW
+    )
+    instrument_engine(engine)
+    Session = sessionmaker(bind=engine)
+
+    replica_engines = [
+        create_zimfarm_engine(
+            uri,
+            pool_size=POSTGRES_REPLICA_POOL_SIZE,
+            max_overflow=POSTGRES_REPLICA_MAX_OVERFLOW,
+            # do not hold requests for long on a replica that is down
+            connect_args={"connect_timeout": 5},
         )
+        for uri in POSTGRES_REPLICA_URIS
+    ]
+    for replica_engine in replica_engines:
+        instrument_engine(replica_engine, pool_gauges=False)
+    replica_router = ReplicaRouter(
+        replica_engines,
+        max_lag=POSTGRES_REPLICA_MAX_LAG,
+        check_interval=POSTGRES_REPLICA_CHECK_INTERVAL,
     )
 
 
@@ -69,6 +145,19 @@ def gen_manual_dbsession() -> Generator[OrmSession]:
         yield session
 
 
+def gen_readonly_dbsession() -> Generator[OrmSession]:
+    """FastAPI's Depends() compatible helper to provide a read-only DB Session.
+
+    Session is bound to a read replica if one is configured and not lagging too
+    much behind, to the primary otherwise. Nothing is ever committed.
+    """
+    if Session is None or replica_router is None:
+        raise RuntimeError("DB is disabled")
+
+    with (replica_router.get_sessionmaker() or Session)() as session:
+        yield session
+
+
 def dbsession(
     func: Callable[..., Any],
 ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
@@ -115,3 +204,156 @@ def count_from_stmt(session: OrmSession, stmt: SelectBase) -> int:
     return session.execute(
         select(func.count()).select_from(stmt.subquery())
     ).scalar_one()
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN of a statement: it is only planned, not run"""
+
+    inherit_cache = False
+
+    def __init__(self, statement: SelectBase):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def compile_explain(element: Explain, compiler: SQLCompiler, **kw: Any) -> str:
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}"
+
+
+def estimate_count_from_stmt(session: OrmSession, stmt: SelectBase) -> int:
+    """Number of records returned by statement, as estimated by the query planner
+
+    Instant whatever the number of records as the statement is not run.
+    """
+    plan = session.execute(Explain(stmt)).scalar_one()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def get_estimated_count(session: OrmSession, model: type[DeclarativeBase]) -> int:
+    """Number of rows of model's table, as estimated by the query planner
+
+    Read from table statistics kept up to date by autovacuum, hence instant whatever
+    the size of the table. Falls back to an exact count on tables never analyzed.
+    """
+    pg_class = table("pg_class", column("oid"), column("reltuples", Float))
+    reltuples = session.execute(
+        select(pg_class.c.reltuples).where(
+            pg_class.c.oid == func.to_regclass(cast_type(Table, model.__table__).name)
+        )
+    ).scalar_one_or_none()
+    if reltuples is None or reltuples <= 0:
+        return session.execute(select(func.count()).select_from(model)).scalar_one()
+    return int(reltuples)
+
+
+# sort keys of a listing: expression and whether it is sorted in descending order
+type SortKeys = Sequence[tuple[ColumnElement[Any] | InstrumentedAttribute[Any], bool]]
+
+
+def order_by_keys(keys: SortKeys) -> list[UnaryExpression[Any]]:
+    """ORDER BY clauses sorting on keys"""
+    return [expr.desc() if descending else expr.asc() for expr, descending in keys]
+
+
+def after_cursor(keys: SortKeys, values: Sequence[Any]) -> ColumnElement[bool]:
+    """Condition on rows sorted strictly after the row whose keys have values
+
+    This is keyset pagination: unlike OFFSET, rows before the cursor don't have to be
+    read and discarded so deep pages are as fast as first ones. Keys must end with a
+    unique column (typically id) so that the order is total.
+
+    Keys sorted in the same direction are compared as a row, e.g.
+    (updated_at, id) < (:updated_at, :id), which an index on those keys seeks to.
+    """
+    exprs = [expr for expr, _ in keys]
+    if all(descending for _, descending in keys):
+        return tuple_(*exprs) < tuple(values)
+    if not any(descending for _, descending in keys):
+        return tuple_(*exprs) > tuple(values)
+
+    # mixed directions can't be compared as a row
+    clauses: list[ColumnElement[bool]] = []
+    for index, (expr, descending) in enumerate(keys):
+        value = values[index]
+        clauses.append(
+            and_(
+                *[
+                    previous_expr == previous_value
+                    for previous_expr, previous_value in zip(
+                        exprs[:index], values[:index], strict=True
+                    )
+                ],
+                expr < value if descending else expr > value,
+            )
+        )
+    # redundant bound on first key, for the planner to restrict the scan to it
+    first_expr, first_descending = keys[0]
+    return and_(
+        first_expr <= values[0] if first_descending else first_expr >= values[0],
+        or_(*clauses),
+    )
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor from sort keys values of the last row of a page"""
+    return (
+        base64.urlsafe_b64encode(json.dumps(list(values), default=str).encode())
+        .decode()
+        .rstrip("=")
+    )
+
+
+def decode_cursor(cursor: str, *converters: Callable[[Any], Any]) -> list[Any]:
+    """Sort keys values from a cursor, each converted back to its type"""
+    try:
+        values = json.loads(
+            base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        )
+        if not isinstance(values, list) or len(values) != len(converters):  # pyright: ignore[reportUnknownArgumentType]
+            raise ValueError("Unexpected number of values")
+        return [
+            convert(value)
+            for convert, value in zip(converters, values, strict=True)  # pyright: ignore[reportUnknownArgumentType, reportUnknownVariableType]
+        ]
+    except (ValueError, TypeError, AttributeError) as exc:
+        raise ValueError("Invalid pagination cursor") from exc
+
+
+def get_table_version(
+    session: OrmSession, *models: type[DeclarativeBase]
+) -> tuple[int, ...]:
+    """Tokens which change whenever a row of models' tables is inserted/updated/deleted
+
+    Versions are bumped by triggers on each table (see TableVersion) so that every
+    committed write is captured, whichever code path did it. This is a primary key
+    lookup, whatever the size of the tables. Only tables listed in VERSIONED_TABLES
+    have a version.
+    """
+    names = [cast_type(str, model.__tablename__) for model in models]
+    versions = dict(
+        session.execute(
+            select(TableVersion.name, TableVersion.version).where(
+                TableVersion.name.in_(names)
+            )
+        ).tuples()
+    )
+    return tuple(versions.get(name, 0) for name in names)
+
+
+def get_small_table_version(
+    session: OrmSession, model: type[DeclarativeBase]
+) -> tuple[int, int]:
+    """Token which changes whenever a row of model's table is inserted/updated/deleted
+
+    Based on the xmin system column (id of the transaction which wrote each row
+    version) so that every committed write is captured without any write overhead.
+    This scans the whole table: only use it on small, frequently written, tables.
+    """
+    xmin = literal_column("xmin", Text)
+    count, xmin_sum = session.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(cast(cast(xmin, Text), BigInteger)), 0),
+        ).select_from(model)
+    ).one()
+    return count, int(xmin_sum)
@@ -1,12 +1,16 @@
+import datetime
+import threading
+from dataclasses import dataclass
 from typing import Any
 from uuid import UUID
 
-from sqlalchemy import func, select, update
+from sqlalchemy import ColumnElement, event, func, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session as OrmSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import make_transient_to_detached, selectinload
 
-from zimfarm_backend.common import is_valid_uuid
+from zimfarm_backend.common import getnow, is_valid_uuid
+from zimfarm_backend.common.constants import PRINCIPAL_CACHE_DURATION
 from zimfarm_backend.common.roles import ROLES, RoleEnum, merge_scopes
 from zimfarm_backend.common.schemas import BaseModel
 from zimfarm_backend.common.schemas.models import AccountUpdateSchema
@@ -43,13 +47,10 @@ def get_account_by_username(
     return account
 
 
-def get_account_by_id_or_none(
-    session: OrmSession, *, account_id: UUID, fetch_ssh_keys: bool = False
+def _get_account_where_or_none(
+    session: OrmSession, where: ColumnElement[bool], *, fetch_ssh_keys: bool = False
 ) -> Account | None:
-    """Get an account by id or return None if the account does not exist"""
-    stmt = select(Account).where(
-        (Account.id == account_id) | (Account.idp_sub == account_id)
-    )
+    stmt = select(Account).where(where)
     if fetch_ssh_keys:
         stmt = stmt.options(
             selectinload(Account.workers), selectinload(Worker.ssh_keys)
@@ -57,6 +58,34 @@ def get_account_by_id_or_none(
     return session.scalars(stmt).one_or_none()
 
 
+def get_account_by_idp_sub_or_none(
+    session: OrmSession, *, idp_sub: UUID, fetch_ssh_keys: bool = False
+) -> Account | None:
+    """Get an account by IdP subject or return None if the account does not exist"""
+    return _get_account_where_or_none(
+        session, Account.idp_sub == idp_sub, fetch_ssh_keys=fetch_ssh_keys
+    )
+
+
+def get_account_by_id_or_none(
+    session: OrmSession, *, account_id: UUID, fetch_ssh_keys: bool = False
+) -> Account | None:
+    """Get an account by id (or IdP subject) or return None if it does not exist
+
+    Looks up the primary key first and only then the IdP subject so that each
+    query uses its own index.
+    """
+    if (
+        account := _get_account_where_or_none(
+            session, Account.id == account_id, fetch_ssh_keys=fetch_ssh_keys
+        )
+    ) is not None:
+        return account
+    return get_account_by_idp_sub_or_none(
+        session, idp_sub=account_id, fetch_ssh_keys=fetch_ssh_keys
+    )
+
+
 def get_account_by_id(
     session: OrmSession, *, account_id: UUID, fetch_ssh_keys: bool = False
 ) -> Account:
@@ -70,6 +99,115 @@ def get_account_by_id(
     return account
 
 
+@dataclass
+class PrincipalCacheEntry:
+    account: Account  # detached snapshot, never bound to a session
+    expires_on: datetime.datetime
+
+
+class PrincipalCache:
+    """Short-lived cache of authenticated accounts keyed by token subject
+
+    Spares the account lookup on every authenticated request. Entries are
+    dropped as soon as the account is updated or deleted in this process;
+    other API processes pick up changes once duration expires.
+    """
+
+    def __init__(self, duration: datetime.timedelta):
+        self.duration = duration
+        self._entries: dict[UUID, PrincipalCacheEntry] = {}
+        self._lock = threading.Lock()
+
+    def get(self, session: OrmSession, subject: UUID) -> Account | None:
+        """Account for subject, attached to session, or None if not cached"""
+        entry = self._entries.get(subject)
+        if entry is None or entry.expires_on <= getnow():
+            return None
+        # already loaded in this session: don't overwrite it with our snapshot
+        if (
+            account := session.identity_map.get(
+                session.identity_key(Account, entry.account.id)
+            )
+        ) is not None:
+            return account
+        # attach a copy of the snapshot without querying the DB
+        return session.merge(entry.account, load=False)
+
+    def set(self, subject: UUID, account: Account) -> None:
+        if not self.duration:
+            return
+        snapshot = Account(
+            username=account.username,
+            display_name=account.display_name,
+            password_hash=account.password_hash,
+            scope=account.scope,
+            role=account.role,
+            deleted=account.deleted,
+            idp_sub=account.idp_sub,
+        )
+        snapshot.id = account.id
+        make_transient_to_detached(snapshot)
+        now = getnow()
+        with self._lock:
+            for key in [
+                key for key, entry in self._entries.items() if entry.expires_on <= now
+            ]:
+                del self._entries[key]
+            self._entries[subject] = PrincipalCacheEntry(
+                account=snapshot, expires_on=now + self.duration
+            )
+
+    def invalidate(self, account_id: UUID) -> None:
+        """Drop entries for account (whichever subject it was cached under)"""
+        with self._lock:
+            for key in [
+                key
+                for key, entry in self._entries.items()
+                if entry.account.id == account_id
+            ]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache(duration=PRINCIPAL_CACHE_DURATION)
+
+
+def invalidate_principal(session: OrmSession, account_id: UUID) -> None:
+    """Drop cached account now and once the transaction is committed
+
+    Second invalidation prevents a concurrent request from caching the old
+    values again before our changes are visible.
+    """
+
+    def _invalidate(_: OrmSession) -> None:
+        principal_cache.invalidate(account_id)
+
+    _invalidate(session)
+    event.listen(session, "after_commit", _invalidate, once=True)
+
+
+def get_principal_or_none(
+    session: OrmSession, *, subject: UUID, is_idp_subject: bool
+) -> Account | None:
+    """Get the account a token subject authenticates, using the principal cache
+
+    Subject is an IdP subject for OAuth tokens and an account id otherwise.
+    The expected column is looked up first, the other one only on miss.
+    """
+    if (account := principal_cache.get(session, subject)) is not None:
+        return account
+
+    by_id, by_idp_sub = Account.id == subject, Account.idp_sub == subject
+    for where in [by_idp_sub, by_id] if is_idp_subject else [by_id, by_idp_sub]:
+        if (account := _get_account_where_or_none(session, where)) is not None:
+            principal_cache.set(subject, account)
+            return account
+    return None
+
+
 def check_account_permission(
     account: Account,
     *,
@@ -91,6 +229,7 @@ def update_account_password(
     password_hash: str | None,
 ) -> None:
     """Update an account's password"""
+    invalidate_principal(session, account_id)
     session.execute(
         update(Account)
         .where(Account.id == account_id)
@@ -216,6 +355,7 @@ def update_account(
     if not values:
         return
 
+    invalidate_principal(session, account.id)
     session.execute(update(Account).where(Account.id == account.id).values(**values))
 
 
@@ -225,6 +365,7 @@ def delete_account(
     account_id: UUID,
 ) -> None:
     """Delete an account"""
+    invalidate_principal(session, account_id)
     session.execute(
         update(Account).where(Account.id == account_id).values(deleted=True)
     )
@@ -1,3 +1,7 @@
+import functools
+from collections.abc import Iterable
+from typing import Any, cast
+
 import pycountry
 from sqlalchemy import select
 from sqlalchemy.orm import Session as OrmSession
@@ -16,19 +20,31 @@ class LanguageListResult(BaseModel):
     languages: list[LanguageSchema]
 
 
+@functools.cache
+def get_languages_by_code() -> dict[str, LanguageSchema]:
+    """All ISO-639-3 languages by code, resolved once from pycountry
+
+    Recipe lists need the language of every row: building (and validating) a new
+    schema each time is costly, so they are all built once and shared.
+    """
+    return {
+        language.alpha_3: LanguageSchema.model_construct(
+            code=language.alpha_3, name=language.name
+        )
+        for language in cast(Iterable[Any], pycountry.languages)
+    }
+
+
 def get_language_from_code(language_code: str) -> LanguageSchema:
     """Get language information from a language code."""
-    language = pycountry.languages.get(alpha_3=language_code)
+    language = get_languages_by_code().get(language_code.lower())
 
     if not language:
         raise RecordDoesNotExistError(
             f"Language code '{language_code}' not found",
         )
 
-    return LanguageSchema(
-        code=language.alpha_3,
-        name=language.name,
-    )
+    return language
 
 
 def get_languages(
@@ -0,0 +1,38 @@
+import json
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session as OrmSession
+
+from zimfarm_backend.db.models import Task
+
+# postgres channel on which live updates are published
+LIVE_UPDATES_CHANNEL = "zimfarm_live_updates"
+
+
+def publish_live_update(session: OrmSession, kind: str, **data: Any) -> None:
+    """Publish a compact change notification to live updates subscribers
+
+    Notification is sent with NOTIFY so that it is delivered to every API process
+    only once (and if) the transaction commits. Payload must remain small (postgres
+    limits it to 8000 bytes) and must not contain secrets as streams are public.
+    """
+    payload = json.dumps({"type": kind, **data}, default=str)
+    session.execute(select(func.pg_notify(LIVE_UPDATES_CHANNEL, payload)))
+
+
+def publish_task_update(session: OrmSession, task_id: UUID, event: str) -> None:
+    """Publish the new status of a task after it received an event"""
+    task = session.get(Task, task_id)
+    if task is None:
+        return
+    publish_live_update(
+        session,
+        "task",
+        id=task.id,
+        event=event,
+        status=task.status,
+        recipe_name=task.original_recipe_name,
+        updated_at=task.updated_at,
+    )
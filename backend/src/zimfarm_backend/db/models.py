@@ -4,12 +4,14 @@ from typing import Any, Optional
 from uuid import UUID
 
 from sqlalchemy import (
+    DDL,
     BigInteger,
     DateTime,
     ForeignKey,
     Index,
     String,
     UniqueConstraint,
+    event,
     false,
     text,
     true,
@@ -25,6 +27,9 @@ from sqlalchemy.orm import (
 )
 from sqlalchemy.sql.schema import MetaData
 
+from zimfarm_backend.common.enums import TaskStatus
+from zimfarm_backend.utils.timestamp import get_status_sort_key_expr
+
 
 class Base(MappedAsDataclass, DeclarativeBase):
     # This map details the specific transformation of types between Python and
@@ -218,6 +223,22 @@ class Task(Base):
         init=False, foreign_keys=[canceled_by_id]
     )
 
+    # keyset pagination of tasks lists, see get_tasks
+    __table_args__ = (Index("ix_task_updated_at_id", "updated_at", "id"),)
+
+
+# keyset pagination of tasks lists sorted on when they succeeded / were reserved
+Index(
+    "ix_task_succeeded_on_id",
+    get_status_sort_key_expr(Task.timestamp, TaskStatus.succeeded),
+    Task.id,
+)
+Index(
+    "ix_task_reserved_on_id",
+    get_status_sort_key_expr(Task.timestamp, TaskStatus.reserved),
+    Task.id,
+)
+
 
 class File(Base):
     __tablename__ = "file"
@@ -254,6 +275,22 @@ class File(Base):
     __table_args__ = (UniqueConstraint("task_id", "name"),)
 
 
+class ArchivedTask(Base):
+    __tablename__ = "archived_task"
+    # complete tasks moved out of the task table once old enough; the whole task,
+    # files included, is kept as a compressed document in payload and only the
+    # columns needed to find and expire it are stored as is
+    id: Mapped[UUID] = mapped_column(primary_key=True)
+    recipe_id: Mapped[UUID | None] = mapped_column(
+        ForeignKey("recipe.id", ondelete="SET NULL"), index=True
+    )
+    original_recipe_name: Mapped[str]
+    status: Mapped[str]
+    updated_at: Mapped[datetime] = mapped_column(index=True)
+    archived_at: Mapped[datetime]
+    payload: Mapped[bytes]
+
+
 class Recipe(Base):
     __tablename__ = "recipe"
     id: Mapped[UUID] = mapped_column(
@@ -272,7 +309,7 @@ class Recipe(Base):
     context: Mapped[str] = mapped_column(default="", server_default="", index=True)
     archived: Mapped[bool] = mapped_column(default=False, server_default=false())
     similarity_data: Mapped[list[str]] = mapped_column(
-        default_factory=list, server_default="{}", index=True
+        default_factory=list, server_default="{}"
     )
 
     # use_alter is mandatory for alembic to break the dependency cycle
@@ -323,6 +360,11 @@ class Recipe(Base):
         default_factory=list,
     )
 
+    # GIN index so that array overlap (&&) lookups of similar recipes use the index
+    __table_args__ = (
+        Index("ix_recipe_similarity_data", "similarity_data", postgresql_using="gin"),
+    )
+
 
 class RecipeHistory(Base):
     __tablename__ = "recipe_history"
@@ -460,3 +502,75 @@ class Blob(Base):
     recipe: Mapped["Recipe | None"] = relationship(init=False, back_populates="blobs")
 
     __table_args__ = (UniqueConstraint("recipe_id", "flag_name", "checksum"),)
+
+
+class TableVersion(Base):
+    """Version of a table, bumped by triggers on every write to it
+
+    Cheap token to detect changes of (possibly big) tables, e.g. for ETags.
+    """
+
+    __tablename__ = "table_version"
+
+    name: Mapped[str] = mapped_column(primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger)
+
+
+# tables whose version is maintained in table_version. Bumping locks the version row
+# until the writing transaction commits (so that a version is never visible before
+# the data it stands for), which serializes writers: only rarely written tables are
+# versioned this way, frequently written ones (task, requested_task, worker) are
+# versioned from reads (see get_tasks_version and get_small_table_version)
+VERSIONED_TABLES = [
+    "account",
+    "offliner",
+    "offliner_definition",
+    "recipe",
+    "sshkey",
+]
+
+# statement-level so that bulk writes bump the version once ; statements which did
+# not change any row (empty transition table) leave it alone
+BUMP_TABLE_VERSION_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+BEGIN
+    -- separate statement: there is no transition table on TRUNCATE
+    IF TG_OP <> 'TRUNCATE' THEN
+        IF NOT EXISTS (SELECT FROM changed_rows) THEN
+            RETURN NULL;
+        END IF;
+    END IF;
+    INSERT INTO table_version (name, version) VALUES (TG_TABLE_NAME, 1)
+    ON CONFLICT (name) DO UPDATE SET version = table_version.version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# transition tables can only be declared on single-event triggers
+BUMP_TABLE_VERSION_TRIGGERS = {
+    "insert": "INSERT REFERENCING NEW TABLE AS changed_rows",
+    "update": "UPDATE REFERENCING NEW TABLE AS changed_rows",
+    "delete": "DELETE REFERENCING OLD TABLE AS changed_rows",
+    "truncate": "TRUNCATE",
+}
+
+BUMP_TABLE_VERSION_TRIGGER = """
+CREATE OR REPLACE TRIGGER bump_{table}_version_on_{operation}
+AFTER {event} ON {table}
+FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()
+"""
+
+# migrations create those as well, this is for metadata.create_all (tests)
+event.listen(Base.metadata, "after_create", DDL(BUMP_TABLE_VERSION_FUNCTION))
+for versioned_table in VERSIONED_TABLES:
+    for operation, trigger_event in BUMP_TABLE_VERSION_TRIGGERS.items():
+        event.listen(
+            Base.metadata,
+            "after_create",
+            DDL(
+                BUMP_TABLE_VERSION_TRIGGER.format(
+                    table=versioned_table, operation=operation, event=trigger_event
+                )
+            ),
+        )
@@ -1,18 +1,22 @@
-from sqlalchemy import select
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from uuid import UUID
+
+from sqlalchemy import event, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from zimfarm_backend.common.constants import OFFLINERS_CACHE_CHECK_INTERVAL
 from zimfarm_backend.common.schemas.models import DockerImageName
-from zimfarm_backend.common.schemas.orms import OfflinerSchema
+from zimfarm_backend.common.schemas.offliners.models import OfflinerSpecSchema
+from zimfarm_backend.common.schemas.orms import OfflinerDefinitionSchema, OfflinerSchema
+from zimfarm_backend.db import get_table_version
 from zimfarm_backend.db.exceptions import (
     RecordAlreadyExistsError,
     RecordDoesNotExistError,
 )
-from zimfarm_backend.db.models import Offliner
-
-# map to cache calls to get offliners since they should be immutable and are used a
-# lot across the application
-_cache_map: dict[str, OfflinerSchema] = {}
+from zimfarm_backend.db.models import Offliner, OfflinerDefinition
 
 
 def create_offliner_schema(
@@ -28,6 +32,119 @@ def create_offliner_schema(
     )
 
 
+def create_offliner_definition_schema(
+    offliner_definition: OfflinerDefinition,
+) -> OfflinerDefinitionSchema:
+    """Create the offliner definition schema"""
+    return OfflinerDefinitionSchema(
+        id=offliner_definition.id,
+        offliner=offliner_definition.offliner,
+        version=offliner_definition.version,
+        created_at=offliner_definition.created_at,
+        schema_=OfflinerSpecSchema.model_validate(offliner_definition.schema),
+    )
+
+
+@dataclass(frozen=True)
+class OfflinersSnapshot:
+    """Offliners and definitions as of a given version of their tables"""
+
+    version: tuple[int, ...] | None = None
+    offliners: dict[str, OfflinerSchema] = field(
+        default_factory=dict[str, OfflinerSchema]
+    )
+    definitions: dict[UUID, OfflinerDefinitionSchema] = field(
+        default_factory=dict[UUID, OfflinerDefinitionSchema]
+    )
+    definitions_by_version: dict[tuple[str, str], OfflinerDefinitionSchema] = field(
+        default_factory=dict[tuple[str, str], OfflinerDefinitionSchema]
+    )
+
+
+class OfflinersCache:
+    """In-process cache of offliners and their definitions
+
+    They change a few times a month but are read for nearly every recipe or task
+    serialization. Both tables are loaded at once and reloaded whenever their
+    version changes, which is checked at most every check_interval seconds so that
+    changes made by other processes are picked up. Changes made by this process
+    invalidate the cache right away.
+
+    Cached schemas are shared by all callers and must not be modified.
+    """
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        # replaced as a whole so that readers always see a consistent state
+        self.snapshot = OfflinersSnapshot()
+        self.checked_on: float | None = None
+
+    def refresh(self, session: Session, *, force: bool = False) -> OfflinersSnapshot:
+        """Current snapshot, reloaded first if tables changed since it was loaded"""
+        snapshot, now = self.snapshot, time.monotonic()
+        if (
+            not force
+            and snapshot.version is not None
+            and self.checked_on is not None
+            and now - self.checked_on < self.check_interval
+        ):
+            return snapshot
+        version = get_table_version(session, Offliner, OfflinerDefinition)
+        if version != snapshot.version:
+            definitions = {
+                definition.id: create_offliner_definition_schema(definition)
+                for definition in session.scalars(select(OfflinerDefinition))
+            }
+            snapshot = OfflinersSnapshot(
+                version=version,
+                offliners={
+                    offliner.id: create_offliner_schema(offliner)
+                    for offliner in session.scalars(select(Offliner))
+                },
+                definitions=definitions,
+                definitions_by_version={
+                    (definition.offliner, definition.version): definition
+                    for definition in definitions.values()
+                },
+            )
+            self.snapshot = snapshot
+        self.checked_on = now
+        return snapshot
+
+    def lookup[T](
+        self, session: Session, getter: Callable[[OfflinersSnapshot], T | None]
+    ) -> T | None:
+        """Cached value, checking the database again if it is missing
+
+        Value might have been created by another process since last check.
+        """
+        if (value := getter(self.refresh(session))) is not None:
+            return value
+        return getter(self.refresh(session, force=True))
+
+    def invalidate(self) -> None:
+        self.snapshot = OfflinersSnapshot()
+
+
+offliners_cache = OfflinersCache(check_interval=OFFLINERS_CACHE_CHECK_INTERVAL)
+
+
+def invalidate_offliners_cache(session: Session) -> None:
+    """Drop cached offliners now and once the transaction is over
+
+    Second invalidation prevents a concurrent request from caching the old
+    values again before our changes are visible, or this transaction's changes
+    from staying cached should it be rolled back.
+    """
+
+    def _invalidate(_: Session) -> None:
+        offliners_cache.invalidate()
+
+    _invalidate(session)
+    event.listen(session, "after_commit", _invalidate, once=True)
+    event.listen(session, "after_rollback", _invalidate, once=True)
+
+
 def create_offliner(
     session: Session,
     offliner_id: str,
@@ -49,6 +166,7 @@ def create_offliner(
         session.flush()
     except IntegrityError as exc:
         raise RecordAlreadyExistsError(f"Offliner '{offliner}' already exists") from exc
+    invalidate_offliners_cache(session)
     return create_offliner_schema(offliner)
 
 
@@ -56,12 +174,9 @@ def get_offliner_by_id_or_none(
     session: Session, offliner_id: str
 ) -> OfflinerSchema | None:
     """Get an offliner model by id"""
-    offliner = session.scalars(
-        select(Offliner).where(Offliner.id == offliner_id)
-    ).one_or_none()
-    if offliner is not None:
-        return create_offliner_schema(offliner)
-    return None
+    return offliners_cache.lookup(
+        session, lambda snapshot: snapshot.offliners.get(offliner_id)
+    )
 
 
 def get_offliner(
@@ -69,11 +184,7 @@ def get_offliner(
     offliner_id: str,
 ) -> OfflinerSchema:
     """Get an offliner model by id"""
-    if offliner := _cache_map.get(offliner_id):
-        return offliner
-
     if offliner := get_offliner_by_id_or_none(session, offliner_id):
-        _cache_map[offliner_id] = offliner
         return offliner
 
     raise RecordDoesNotExistError(f"Offliner with id {offliner_id} does not exist")
@@ -81,9 +192,4 @@ def get_offliner(
 
 def get_all_offliners(session: Session) -> list[OfflinerSchema]:
     """Get a list of all the available offliners."""
-    offliners: list[OfflinerSchema] = []
-    for offliner in session.scalars(select(Offliner)).all():
-        offliner_schema = create_offliner_schema(offliner)
-        _cache_map[offliner_schema.id] = offliner_schema
-        offliners.append(offliner_schema)
-    return offliners
+    return list(offliners_cache.refresh(session).offliners.values())
@@ -14,6 +14,11 @@ from zimfarm_backend.common.schemas.offliners.models import OfflinerSpecSchema
 from zimfarm_backend.common.schemas.orms import OfflinerDefinitionSchema, OfflinerSchema
 from zimfarm_backend.db.exceptions import RecordDoesNotExistError
 from zimfarm_backend.db.models import OfflinerDefinition
+from zimfarm_backend.db.offliner import (
+    create_offliner_definition_schema,
+    invalidate_offliners_cache,
+    offliners_cache,
+)
 
 
 class OfflinerVersionsListResult(BaseModel):
@@ -23,17 +28,24 @@ class OfflinerVersionsListResult(BaseModel):
     versions: list[str]
 
 
-def create_offliner_definition_schema(
-    offliner_definition: OfflinerDefinition,
+def _select_offliner_definition(
+    session: Session,
+    offliner_id: str,
+    version: str,
 ) -> OfflinerDefinitionSchema:
-    """Create the offliner definition schema"""
-    return OfflinerDefinitionSchema(
-        id=offliner_definition.id,
-        offliner=offliner_definition.offliner,
-        version=offliner_definition.version,
-        created_at=offliner_definition.created_at,
-        schema_=OfflinerSpecSchema.model_validate(offliner_definition.schema),
-    )
+    """Get the offliner definition from the database, bypassing the cache"""
+    definition = session.scalars(
+        select(OfflinerDefinition).where(
+            OfflinerDefinition.offliner == offliner_id,
+            OfflinerDefinition.version == version,
+        )
+    ).one_or_none()
+    if definition is None:
+        raise RecordDoesNotExistError(
+            f"Offliner definition for offliner {offliner_id} with version "
+            f"{version} does not exist"
+        )
+    return create_offliner_definition_schema(definition)
 
 
 def create_offliner_definition(
@@ -56,7 +68,8 @@ def create_offliner_definition(
         },
     )
     session.execute(insert_stmt)
-    return get_offliner_definition(session, offliner, version)
+    invalidate_offliners_cache(session)
+    return _select_offliner_definition(session, offliner, version)
 
 
 def create_offliner_instance(
@@ -69,7 +82,10 @@ def create_offliner_instance(
 ) -> BaseModel:
     """Create the offliner instance from the offliner definition and data"""
     if isinstance(offliner_definition, OfflinerDefinition):
-        offliner_definition = create_offliner_definition_schema(offliner_definition)
+        # spare validating the spec again when definition is already cached
+        offliner_definition = offliners_cache.snapshot.definitions.get(
+            offliner_definition.id
+        ) or create_offliner_definition_schema(offliner_definition)
     model = build_offliner_model(offliner, offliner_definition.schema_, extra=extra)
     return model.build_model(data, skip_validation=skip_validation)
 
@@ -80,14 +96,10 @@ def get_offliner_definition_or_none(
     version: str,
 ) -> OfflinerDefinitionSchema | None:
     """Get the offliner definition or None using the offliner and version"""
-    definition = session.scalars(
-        select(OfflinerDefinition).where(
-            OfflinerDefinition.offliner == offliner_id,
-            OfflinerDefinition.version == version,
-        )
-    ).one_or_none()
-    if definition is not None:
-        return create_offliner_definition_schema(definition)
+    return offliners_cache.lookup(
+        session,
+        lambda snapshot: snapshot.definitions_by_version.get((offliner_id, version)),
+    )
 
 
 def get_offliner_definition(
@@ -113,14 +125,9 @@ def get_offliner_definition_by_id_or_none(
     offliner_definition_id: UUID,
 ) -> OfflinerDefinitionSchema | None:
     """Get the offliner definition or None using the offliner definition id"""
-    definition = session.scalars(
-        select(OfflinerDefinition).where(
-            OfflinerDefinition.id == offliner_definition_id
-        )
-    ).one_or_none()
-    if definition is not None:
-        return create_offliner_definition_schema(definition)
-    return None
+    return offliners_cache.lookup(
+        session, lambda snapshot: snapshot.definitions.get(offliner_definition_id)
+    )
 
 
 def get_offliner_definition_by_id(
@@ -231,4 +238,5 @@ def update_offliner_definition(
             f"Offliner definition for offliner {offliner_id} with version "
             f"{version} does not exist"
         )
-    return get_offliner_definition(session, offliner_id, version)
+    invalidate_offliners_cache(session)
+    return _select_offliner_definition(session, offliner_id, version)
@@ -2,7 +2,7 @@ from typing import Any
 from uuid import UUID
 
 from psycopg.errors import UniqueViolation
-from sqlalchemy import Integer, func, select
+from sqlalchemy import Integer, func, literal, select
 from sqlalchemy import cast as sql_cast
 from sqlalchemy.dialects.postgresql import JSONPATH, insert
 from sqlalchemy.exc import IntegrityError
@@ -32,7 +32,16 @@ from zimfarm_backend.common.schemas.orms import (
     RecipeHistorySchema,
     RecipeLightSchema,
 )
-from zimfarm_backend.db import count_from_stmt
+from zimfarm_backend.db import (
+    SortKeys,
+    after_cursor,
+    count_from_stmt,
+    decode_cursor,
+    encode_cursor,
+    estimate_count_from_stmt,
+    get_estimated_count,
+    order_by_keys,
+)
 from zimfarm_backend.db.exceptions import (
     RecordAlreadyExistsError,
     RecordDoesNotExistError,
@@ -67,6 +76,8 @@ DEFAULT_RECIPE_DURATION = RecipeDurationSchema(
 class RecipeListResult(BaseModel):
     nb_records: int
     recipes: list[RecipeLightSchema | RecipeFullSchema]
+    next_cursor: str | None = None
+    estimated_count: bool = False
 
 
 class RecipeHistoryListResult(BaseModel):
@@ -233,8 +244,21 @@ def get_recipes(
     omit_names: list[str] | None = None,
     similarity_data: list[str] | None = None,
     offliners: list[str] | None = None,
+    cursor: str | None = None,
+    estimate_count: bool = False,
 ) -> RecipeListResult:
-    """Get a list of recipes"""
+    """Get a list of recipes
+
+    With similarity_data, recipes sharing most values with it are returned first
+    """
+    if cursor is not None and similarity_data is not None:
+        raise ValueError("Cursor pagination is not supported with similarity_data")
+    sort_keys: SortKeys = [(Recipe.name, False)]
+    estimated_count = estimate_count and all(
+        arg is None
+        for arg in (name, lang, tags, archived, omit_names, similarity_data, offliners)
+    )
+    count_in_query = cursor is None and not estimated_count
     subquery = (
         select(
             func.count(RequestedTask.id).label("nb_requested_tasks"),
@@ -246,7 +270,9 @@ def get_recipes(
 
     stmt = (
         select(
-            func.count().over().label("total_records"),
+            (func.count().over() if count_in_query else literal(0)).label(
+                "total_records"
+            ),
             Recipe.id.label("recipe_id"),
             Recipe.name.label("recipe_name"),
             Recipe.enabled,
@@ -263,7 +289,6 @@ def get_recipes(
         .join(OfflinerDefinition, Recipe.offliner_definition)
         .join(Task, Recipe.most_recent_task, isouter=True)
         .join(subquery, subquery.c.recipe_id == Recipe.id, isouter=True)
-        .order_by(Recipe.name)
         .where(
             # If a client provides an argument i.e it is not None,
             # we compare the corresponding model field against the argument,
@@ -284,9 +309,25 @@ def get_recipes(
             (Recipe.config["offliner"]["offliner_id"].astext.in_(offliners or []))
             | (offliners is None),
         )
-        .offset(skip)
-        .limit(limit)
     )
+    filtered_stmt = stmt
+    if cursor is not None:
+        stmt = stmt.where(after_cursor(sort_keys, decode_cursor(cursor, str)))
+    stmt = stmt.order_by(*order_by_keys(sort_keys)).offset(skip).limit(limit)
+
+    if similarity_data is not None:
+        # most similar recipes first: rank by number of shared similarity values
+        similarity_value = (
+            func.unnest(Recipe.similarity_data).table_valued("value").render_derived()
+        )
+        nb_shared_values = (
+            select(func.count())
+            .select_from(similarity_value)
+            .where(similarity_value.c.value.in_(similarity_data))
+            .correlate(Recipe)
+            .scalar_subquery()
+        )
+        stmt = stmt.order_by(None).order_by(nb_shared_values.desc(), Recipe.name)
 
     results = RecipeListResult(nb_records=0, recipes=[])
 
@@ -341,6 +382,15 @@ def get_recipes(
             )
         )
 
+    if estimated_count:
+        results.nb_records = get_estimated_count(session, Recipe)
+        results.estimated_count = True
+    elif cursor is not None:
+        # following pages, exact count was returned with the first one
+        results.nb_records = estimate_count_from_stmt(session, filtered_stmt)
+        results.estimated_count = True
+    if len(results.recipes) == limit and similarity_data is None:
+        results.next_cursor = encode_cursor([results.recipes[-1].name])
     return results
 
 
@@ -0,0 +1,78 @@
+import itertools
+import math
+import time
+
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.orm import sessionmaker
+
+from zimfarm_backend import logger
+from zimfarm_backend.common.metrics import DB_REPLICA_LAG
+
+# seconds since last replayed transaction, 0 when replica has replayed everything
+# it received (an idle primary produces no transaction to replay). A replica whose
+# WAL receiver is not streaming from the primary is infinitely late as it cannot
+# tell what it has not received yet. status is only visible to pg_read_all_stats
+# members, others only see the receiver row, hence the COALESCE.
+REPLICATION_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (
+            SELECT 1 FROM pg_stat_wal_receiver
+            WHERE COALESCE(status, 'streaming') = 'streaming'
+        ) THEN 'Infinity'::float
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())::float,
+            'Infinity'::float
+        )
+    END
+    """
+)
+
+
+class ReplicaRouter:
+    """Round-robin across read replicas whose replication lag is acceptable
+
+    Replication lag of each replica is checked at most every `check_interval`
+    seconds; unreachable replicas are considered infinitely late until next check.
+    """
+
+    def __init__(self, engines: list[Engine], *, max_lag: float, check_interval: float):
+        self.engines = engines
+        self.sessionmakers = [sessionmaker(bind=engine) for engine in engines]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._lags: dict[int, tuple[float, float]] = {}
+        self._counter = itertools.count()
+
+    def check_lag(self, index: int) -> float:
+        """Replication lag of replica, in seconds"""
+        try:
+            with self.engines[index].connect() as connection:
+                lag = float(connection.execute(REPLICATION_LAG_QUERY).scalar_one())
+        except SQLAlchemyError:
+            logger.warning(f"Unable to check replication lag of replica #{index}")
+            lag = math.inf
+        DB_REPLICA_LAG.labels(replica=str(index)).set(lag)
+        return lag
+
+    def get_lag(self, index: int) -> float:
+        """Replication lag of replica, from cache if checked recently enough"""
+        now = time.monotonic()
+        checked_on, lag = self._lags.get(index, (-math.inf, math.inf))
+        if now - checked_on >= self.check_interval:
+            lag = self.check_lag(index)
+            self._lags[index] = (now, lag)
+        return lag
+
+    def get_sessionmaker(self) -> sessionmaker[OrmSession] | None:
+        """sessionmaker of next up-to-date replica or None if none is"""
+        start = next(self._counter)
+        for offset in range(len(self.engines)):
+            index = (start + offset) % len(self.engines)
+            if self.get_lag(index) <= self.max_lag:
+                return self.sessionmakers[index]
+        return None
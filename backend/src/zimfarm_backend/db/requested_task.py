@@ -3,7 +3,7 @@ from typing import cast
 from uuid import UUID
 
 from humanfriendly import format_size, format_timespan
-from sqlalchemy import BigInteger, delete, func, or_, select, update
+from sqlalchemy import BigInteger, delete, func, literal, or_, select, update
 from sqlalchemy.orm import Session as OrmSession
 from sqlalchemy.orm import selectinload
 
@@ -15,6 +15,7 @@ from zimfarm_backend.common.constants import (
     DISABLE_WAREHOUSE_PATH,
     LOGS_EXPIRATION,
     LOGS_UPLOAD_URI,
+    SCHEDULING_LOOKAHEAD,
     ZIM_EXPIRATION,
     ZIM_UPLOAD_URI,
     ZIMCHECK_OPTION,
@@ -41,8 +42,18 @@ from zimfarm_backend.common.schemas.orms import (
     TaskUploadSchema,
     WorkerLightSchema,
 )
-from zimfarm_backend.db import count_from_stmt
+from zimfarm_backend.db import (
+    SortKeys,
+    after_cursor,
+    count_from_stmt,
+    decode_cursor,
+    encode_cursor,
+    estimate_count_from_stmt,
+    get_estimated_count,
+    order_by_keys,
+)
 from zimfarm_backend.db.exceptions import RecordDoesNotExistError
+from zimfarm_backend.db.live import publish_live_update
 from zimfarm_backend.db.models import Account, Recipe, RequestedTask, Worker
 from zimfarm_backend.db.offliner import get_offliner
 from zimfarm_backend.db.offliner_definition import (
@@ -71,6 +82,8 @@ RecipeOrTask = Recipe | RequestedTask
 class RequestedTaskListResult(BaseModel):
     nb_records: int
     requested_tasks: list[RequestedTaskLightSchema]
+    next_cursor: str | None = None
+    estimated_count: bool = False
 
 
 class RequestedTaskWithDuration(BaseRequestedTaskSchema):
@@ -192,6 +205,13 @@ def _create_new_requested_task(
 
     session.add(requested_task)
     session.flush()
+    publish_live_update(
+        session,
+        "requested_task",
+        id=requested_task.id,
+        action="created",
+        recipe_name=requested_task.original_recipe_name,
+    )
     return requested_task
 
 
@@ -363,12 +383,36 @@ def get_requested_tasks(
     cpu: int | None = None,
     memory: int | None = None,
     disk: int | None = None,
+    cursor: str | None = None,
+    estimate_count: bool = False,
 ) -> RequestedTaskListResult:
     """Get a paginated list of requested tasks filtered by various criteria.
 
     Tasks are sorted by priority (descending), reserved timestamp, and
     requested timestamp.
     """
+    requested_on = get_status_timestamp_expr(
+        RequestedTask.timestamp, TaskStatus.requested
+    )
+    sort_keys: SortKeys = [
+        (RequestedTask.priority, True),
+        (requested_on, True),
+        (RequestedTask.id, True),
+    ]
+    estimated_count = estimate_count and all(
+        arg is None
+        for arg in (
+            worker_name,
+            matching_offliners,
+            recipe_name,
+            priority,
+            cpu,
+            memory,
+            disk,
+        )
+    )
+    count_in_query = cursor is None and not estimated_count
+
     # Set reasonable defaults if a client omits a param
     priority = priority or 0
     cpu = cpu if cpu is not None else MAX_BIG_INT_VAL
@@ -377,7 +421,7 @@ def get_requested_tasks(
 
     query = (
         select(
-            func.count().over().label("nb_records"),
+            (func.count().over() if count_in_query else literal(0)).label("nb_records"),
             RequestedTask.id,
             RequestedTask.status,
             RequestedTask.config,
@@ -390,6 +434,7 @@ def get_requested_tasks(
             RequestedTask.context,
             Recipe.name.label("recipe_name"),
             Worker.name.label("worker_name"),
+            requested_on.label("requested_on"),
         )
         .join(Account, RequestedTask.requested_by)
         .join(Worker, RequestedTask.worker, isouter=True)
@@ -417,17 +462,16 @@ def get_requested_tasks(
             | (RequestedTask.worker is None)  # pyright: ignore[reportUnnecessaryComparison]
             | (worker_name is None),
         )
-        .order_by(
-            RequestedTask.priority.desc(),
-            get_status_timestamp_expr(
-                RequestedTask.timestamp, TaskStatus.requested
-            ).desc(),
-        )
     )
-
-    query = query.offset(skip).limit(limit)
+    filtered_query = query
+    if cursor is not None:
+        query = query.where(
+            after_cursor(sort_keys, decode_cursor(cursor, int, int, UUID))
+        )
+    query = query.order_by(*order_by_keys(sort_keys)).offset(skip).limit(limit)
 
     results = RequestedTaskListResult(nb_records=0, requested_tasks=[])
+    last_requested_on = None
 
     for (
         nb_records,
@@ -443,16 +487,19 @@ def get_requested_tasks(
         context,
         _recipe_name,
         _worker_name,
+        _requested_on,
     ) in session.execute(query).all():
         # Because the SQL window function returns the total_records
         # for every row, assign that value to the nb_records
         results.nb_records = nb_records
+        last_requested_on = _requested_on
         results.requested_tasks.append(
             RequestedTaskLightSchema(
                 id=requested_task_id,
                 status=status,
                 config=ConfigWithOnlyOfflinerAndResourcesSchema(
                     offliner=config["offliner"]["offliner_id"],
+                    image=config.get("image"),
                     resources=ConfigResourcesSchema(
                         cpu=config["resources"]["cpu"],
                         memory=config["resources"]["memory"],
@@ -471,6 +518,16 @@ def get_requested_tasks(
             )
         )
 
+    if estimated_count:
+        results.nb_records = get_estimated_count(session, RequestedTask)
+        results.estimated_count = True
+    elif cursor is not None:
+        # following pages, exact count was returned with the first one
+        results.nb_records = estimate_count_from_stmt(session, filtered_query)
+        results.estimated_count = True
+    if len(results.requested_tasks) == limit:
+        last = results.requested_tasks[-1]
+        results.next_cursor = encode_cursor([last.priority, last_requested_on, last.id])
     return results
 
 
@@ -663,16 +720,83 @@ def get_possible_task_with_resources(
     available_resources: ResourcesSchema,
     available_time: float,
 ) -> RequestedTaskWithDuration | None:
-    """first of possible tasks runnable with availresources within avail_time"""
+    """best of possible tasks runnable with avail resources within avail_time
+
+    Considers the first SCHEDULING_LOOKAHEAD such tasks and returns the first task of
+    the combination which best fills available resources (next polls will pick the
+    other tasks of this combination if nothing changed meanwhile).
+    """
+    possible_tasks: list[RequestedTaskWithDuration] = []
     for temp_candidate in tasks_worker_could_do:
         if _can_run(temp_candidate, available_resources):
             if temp_candidate.duration.value <= available_time:
-                logger.debug(f"{temp_candidate.id}@{temp_candidate.recipe_name} it is!")
-                return temp_candidate
+                possible_tasks.append(temp_candidate)
+                if len(possible_tasks) >= SCHEDULING_LOOKAHEAD:
+                    break
+                continue
             logger.debug(
                 f"{temp_candidate.id}@{temp_candidate.recipe_name} would take too long"
             )
-    return None
+
+    packing = _get_best_packing(possible_tasks, available_resources)
+    if not packing:
+        return None
+    logger.debug(
+        f"{packing[0].id}@{packing[0].recipe_name} it is! "
+        f"(packed with {len(packing) - 1} other task(s))"
+    )
+    return packing[0]
+
+
+def _get_fill_rate(available: ResourcesSchema, remaining: ResourcesSchema) -> float:
+    """average ratio of used over available resources (cpu, memory and disk)"""
+    ratios = [
+        (total - left) / total
+        for total, left in (
+            (available.cpu, remaining.cpu),
+            (available.memory, remaining.memory),
+            (available.disk, remaining.disk),
+        )
+        if total > 0
+    ]
+    return sum(ratios) / len(ratios) if ratios else 0
+
+
+def _get_best_packing(
+    tasks: list[RequestedTaskWithDuration], available_resources: ResourcesSchema
+) -> list[RequestedTaskWithDuration]:
+    """combination of tasks which best fills available resources
+
+    tasks are expected in preference order: on equal fill rate, the combination
+    with the most preferred tasks wins."""
+    best_packing: list[RequestedTaskWithDuration] = []
+    best_fill_rate = -1.0
+
+    def explore(
+        start: int,
+        packing: list[RequestedTaskWithDuration],
+        remaining: ResourcesSchema,
+    ):
+        nonlocal best_packing, best_fill_rate
+        if packing:
+            fill_rate = _get_fill_rate(available_resources, remaining)
+            if fill_rate > best_fill_rate:
+                best_packing, best_fill_rate = packing, fill_rate
+        for index in range(start, len(tasks)):
+            task = tasks[index]
+            if _can_run(task, remaining):
+                explore(
+                    index + 1,
+                    [*packing, task],
+                    ResourcesSchema(
+                        cpu=remaining.cpu - task.config.resources.cpu,
+                        memory=remaining.memory - task.config.resources.memory,
+                        disk=remaining.disk - task.config.resources.disk,
+                    ),
+                )
+
+    explore(0, [], available_resources)
+    return best_packing
 
 
 def _can_run(task: RequestedTaskWithDuration, resource: ResourcesSchema) -> bool:
@@ -1031,9 +1155,19 @@ def update_requested_task_priority(
         .values(priority=priority)
         .returning(RequestedTask)
     ).one()
+    publish_live_update(
+        session,
+        "requested_task",
+        id=requested_task.id,
+        action="updated",
+        priority=priority,
+    )
     return create_requested_task_full_schema(session, requested_task)
 
 
 def delete_requested_task(session: OrmSession, requested_task_id: UUID) -> None:
     """Delete a requested task by ID."""
     session.execute(delete(RequestedTask).where(RequestedTask.id == requested_task_id))
+    publish_live_update(
+        session, "requested_task", id=requested_task_id, action="deleted"
+    )
@@ -1,8 +1,10 @@
 import datetime
+import zlib
+from collections.abc import Sequence
 from typing import Any, Literal, cast
 from uuid import UUID
 
-from sqlalchemy import func, literal, select
+from sqlalchemy import delete, exists, func, literal, select
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Bundle, selectinload
@@ -13,13 +15,11 @@ from zimfarm_backend.common.constants import parse_bool
 from zimfarm_backend.common.enums import TaskStatus
 from zimfarm_backend.common.schemas import BaseModel
 from zimfarm_backend.common.schemas.models import FileCreateUpdateSchema
-from zimfarm_backend.common.schemas.offliners.models import OfflinerSpecSchema
 from zimfarm_backend.common.schemas.orms import (
     ConfigResourcesSchema,
     ConfigWithOnlyResourcesSchema,
     ExpandedRecipeConfigSchema,
     MostRecentTaskSchema,
-    OfflinerDefinitionSchema,
     RecipeNotificationSchema,
     RequestedTaskFullSchema,
     RunningTask,
@@ -29,23 +29,38 @@ from zimfarm_backend.common.schemas.orms import (
     TaskLightSchema,
     TaskUploadSchema,
 )
+from zimfarm_backend.db import (
+    SortKeys,
+    after_cursor,
+    count_from_stmt,
+    decode_cursor,
+    encode_cursor,
+    estimate_count_from_stmt,
+    get_estimated_count,
+    order_by_keys,
+    zimfarm_dumps,
+    zimfarm_loads,
+)
 from zimfarm_backend.db.exceptions import (
     RecordAlreadyExistsError,
     RecordDoesNotExistError,
 )
 from zimfarm_backend.db.models import (
     Account,
+    ArchivedTask,
     File,
-    OfflinerDefinition,
     Recipe,
     Task,
     Worker,
 )
 from zimfarm_backend.db.offliner import get_offliner
-from zimfarm_backend.db.offliner_definition import create_offliner_instance
+from zimfarm_backend.db.offliner_definition import (
+    create_offliner_instance,
+    get_offliner_definition_by_id,
+)
 from zimfarm_backend.db.recipe import get_recipe_duration
 from zimfarm_backend.utils.timestamp import (
-    get_status_timestamp_expr,
+    get_status_sort_key_expr,
     get_timestamp_for_status,
 )
 
@@ -53,6 +68,8 @@ from zimfarm_backend.utils.timestamp import (
 class TaskListResult(BaseModel):
     nb_records: int
     tasks: list[TaskLightSchema]
+    next_cursor: str | None = None
+    estimated_count: bool = False
 
 
 def create_task_file_schema(file: File) -> TaskFileSchema:
@@ -74,18 +91,132 @@ def create_task_file_schema(file: File) -> TaskFileSchema:
     )
 
 
+def create_task_document(task: Task, *, worker_name: str | None) -> dict[str, Any]:
+    """Raw data of a task with its files, as kept once the task is archived
+
+    Task relationships (files, requested_by and canceled_by) must be loaded.
+    """
+    return {
+        "id": task.id,
+        "status": task.status,
+        "timestamp": task.timestamp,
+        "config": task.config,
+        "events": task.events,
+        "debug": task.debug,
+        "requested_by": task.requested_by.display_name,
+        "canceled_by": task.canceled_by.display_name if task.canceled_by else None,
+        "container": task.container,
+        "priority": task.priority,
+        "notification": task.notification,
+        "files": {file.name: create_task_file_schema(file) for file in task.files},
+        "upload": task.upload,
+        "updated_at": task.updated_at,
+        "original_recipe_name": task.original_recipe_name,
+        "recipe_id": task.recipe_id,
+        "worker_name": worker_name,
+        "context": task.context,
+        "offliner_definition_id": task.offliner_definition_id,
+    }
+
+
+def _isoformat_datetimes(values: dict[str, Any]) -> dict[str, Any]:
+    return {
+        key: value.isoformat() if isinstance(value, datetime.datetime) else value
+        for key, value in values.items()
+    }
+
+
+def compress_task_document(document: dict[str, Any]) -> bytes:
+    # JSON columns are serialized as stored while datetimes of other columns are
+    # serialized as ISO strings (parsed back by TaskFullSchema) since bson dates
+    # only have millisecond precision
+    return zlib.compress(
+        zimfarm_dumps(
+            {
+                **_isoformat_datetimes(document),
+                "files": {
+                    name: _isoformat_datetimes(file.model_dump())
+                    for name, file in document["files"].items()
+                },
+            }
+        ).encode()
+    )
+
+
+def decompress_task_document(payload: bytes) -> dict[str, Any]:
+    document = zimfarm_loads(zlib.decompress(payload))
+    # identifiers are serialized as strings, offliner definitions are looked up
+    # by UUID
+    document["offliner_definition_id"] = UUID(document["offliner_definition_id"])
+    return document
+
+
+def create_task_full_schema(
+    session: OrmSession, document: dict[str, Any], *, recipe_name: str | None
+) -> TaskFullSchema:
+    """Create the full schema of a task from its raw data"""
+    config = document["config"]
+    offliner_definition = get_offliner_definition_by_id(
+        session, document["offliner_definition_id"]
+    )
+    return TaskFullSchema(
+        id=document["id"],
+        status=document["status"],
+        timestamp=document["timestamp"],
+        config=ExpandedRecipeConfigSchema.model_validate(
+            {
+                "warehouse_path": config["warehouse_path"],
+                "resources": config["resources"],
+                "platform": config.get("platform"),
+                "offliner": create_offliner_instance(
+                    offliner=get_offliner(session, offliner_definition.offliner),
+                    offliner_definition=offliner_definition,
+                    data=config["offliner"],
+                    skip_validation=True,
+                ),
+                "monitor": parse_bool(config.get("monitor")),
+                "image": config["image"],
+                "mount_point": config["mount_point"],
+                "command": config["command"],
+                "str_command": config["str_command"],
+                "artifacts_globs": config.get("artifacts_globs", []),
+            },
+            context={"skip_validation": True},
+        ),
+        events=document["events"],
+        debug=document["debug"],
+        requested_by=document["requested_by"],
+        canceled_by=document["canceled_by"],
+        container=TaskContainerSchema.model_validate(document["container"]),
+        priority=document["priority"],
+        notification=(
+            RecipeNotificationSchema.model_validate(document["notification"])
+            if document["notification"]
+            else None
+        ),
+        files=document["files"],
+        upload=TaskUploadSchema.model_validate(document["upload"]),
+        updated_at=document["updated_at"],
+        original_recipe_name=document["original_recipe_name"],
+        recipe_id=document["recipe_id"],
+        recipe_name=recipe_name,
+        worker_name=document["worker_name"],
+        context=document["context"],
+        offliner_definition_id=offliner_definition.id,
+        version=offliner_definition.version,
+        offliner=offliner_definition.offliner,
+    )
+
+
 def get_task_by_id_or_none(session: OrmSession, task_id: UUID) -> TaskFullSchema | None:
     """
     Get a task by id or None if it does not exist
+
+    Tasks which have been archived are read from the archive.
     """
     stmt = (
         select(
             Task,
-            OfflinerDefinition.id.label("offliner_definition_id"),
-            OfflinerDefinition.offliner.label("offliner"),
-            OfflinerDefinition.schema.label("offliner_schema"),
-            OfflinerDefinition.version.label("offliner_version"),
-            OfflinerDefinition.created_at.label("offliner_definition_created_at"),
             Recipe.name.label("recipe_name"),
             Worker.name.label("worker_name"),
         )
@@ -94,67 +225,25 @@ def get_task_by_id_or_none(session: OrmSession, task_id: UUID) -> TaskFullSchema
             selectinload(Task.requested_by),
             selectinload(Task.canceled_by),
         )
-        .join(OfflinerDefinition, Task.offliner_definition)
         .join(Recipe, Task.recipe, isouter=True)
         .join(Worker, Task.worker, isouter=True)
         .where(Task.id == task_id)
     )
     if row := session.execute(stmt).one_or_none():
-        task = cast(Task, row.Task)
-        return TaskFullSchema(
-            id=task.id,
-            status=task.status,
-            timestamp=task.timestamp,
-            config=ExpandedRecipeConfigSchema.model_validate(
-                {
-                    "warehouse_path": task.config["warehouse_path"],
-                    "resources": task.config["resources"],
-                    "platform": task.config.get("platform"),
-                    "offliner": create_offliner_instance(
-                        offliner=get_offliner(session, row.offliner),
-                        offliner_definition=OfflinerDefinitionSchema(
-                            id=row.offliner_definition_id,
-                            version=row.offliner_version,
-                            created_at=row.offliner_definition_created_at,
-                            offliner=row.offliner,
-                            schema_=OfflinerSpecSchema.model_validate(
-                                row.offliner_schema
-                            ),
-                        ),
-                        data=task.config["offliner"],
-                        skip_validation=True,
-                    ),
-                    "monitor": parse_bool(task.config.get("monitor")),
-                    "image": task.config["image"],
-                    "mount_point": task.config["mount_point"],
-                    "command": task.config["command"],
-                    "str_command": task.config["str_command"],
-                    "artifacts_globs": task.config.get("artifacts_globs", []),
-                },
-                context={"skip_validation": True},
-            ),
-            events=task.events,
-            debug=task.debug,
-            requested_by=task.requested_by.display_name,
-            canceled_by=task.canceled_by.display_name if task.canceled_by else None,
-            container=TaskContainerSchema.model_validate(task.container),
-            priority=task.priority,
-            notification=(
-                RecipeNotificationSchema.model_validate(task.notification)
-                if task.notification
-                else None
-            ),
-            files={file.name: create_task_file_schema(file) for file in task.files},
-            upload=TaskUploadSchema.model_validate(task.upload),
-            updated_at=task.updated_at,
-            original_recipe_name=task.original_recipe_name,
-            recipe_id=task.recipe_id,
+        return create_task_full_schema(
+            session,
+            create_task_document(cast(Task, row.Task), worker_name=row.worker_name),
             recipe_name=row.recipe_name,
-            worker_name=row.worker_name,
-            context=task.context,
-            offliner_definition_id=row.offliner_definition_id,
-            version=row.offliner_version,
-            offliner=row.offliner,
+        )
+    if archived := session.execute(
+        select(ArchivedTask.payload, Recipe.name.label("recipe_name"))
+        .join(Recipe, Recipe.id == ArchivedTask.recipe_id, isouter=True)
+        .where(ArchivedTask.id == task_id)
+    ).one_or_none():
+        return create_task_full_schema(
+            session,
+            decompress_task_document(archived.payload),
+            recipe_name=archived.recipe_name,
         )
     return None
 
@@ -165,6 +254,76 @@ def get_task_by_id(session: OrmSession, task_id: UUID) -> TaskFullSchema:
     raise RecordDoesNotExistError(f"Task with id {task_id} does not exist")
 
 
+def archive_tasks(
+    session: OrmSession, *, updated_before: datetime.datetime, limit: int
+) -> list[UUID]:
+    """Move complete tasks last updated before a date to the archive
+
+    Tasks are still served by get_task_by_id but are not listed anymore. Most recent
+    task of a recipe is never archived. Returns ids of archived tasks.
+    """
+    rows = session.execute(
+        select(Task, Worker.name.label("worker_name"))
+        .options(
+            selectinload(Task.files),
+            selectinload(Task.requested_by),
+            selectinload(Task.canceled_by),
+        )
+        .join(Worker, Task.worker, isouter=True)
+        .where(
+            Task.status.in_(TaskStatus.complete()),
+            Task.updated_at < updated_before,
+            ~exists().where(Recipe.most_recent_task_id == Task.id),
+        )
+        .order_by(Task.updated_at)
+        .limit(limit)
+        .with_for_update(of=Task, skip_locked=True)
+    ).all()
+    if not rows:
+        return []
+
+    now = getnow()
+    session.execute(
+        insert(ArchivedTask),
+        [
+            {
+                "id": task.id,
+                "recipe_id": task.recipe_id,
+                "original_recipe_name": task.original_recipe_name,
+                "status": task.status,
+                "updated_at": task.updated_at,
+                "archived_at": now,
+                "payload": compress_task_document(
+                    create_task_document(task, worker_name=worker_name)
+                ),
+            }
+            for task, worker_name in rows
+        ],
+    )
+    task_ids = [task.id for task, _ in rows]
+    # files are removed along by the database
+    session.execute(
+        delete(Task)
+        .where(Task.id.in_(task_ids))
+        .execution_options(synchronize_session=False)
+    )
+    for task, _ in rows:
+        session.expunge(task)
+    return task_ids
+
+
+def get_tasks_version(session: OrmSession) -> tuple[int, datetime.datetime | None]:
+    """Token which changes whenever a task is created, deleted or changes status
+
+    Every task event bumps updated_at, which is indexed, and old tasks are archived,
+    so this is cheap and does not add any write to the (busy) task table.
+    """
+    count, last_updated_at = session.execute(
+        select(func.count(Task.id), func.max(Task.updated_at))
+    ).one()
+    return count, last_updated_at
+
+
 def get_tasks(
     session: OrmSession,
     *,
@@ -175,21 +334,34 @@ def get_tasks(
     sort_criteria: Literal["updated_at", "doing", "done", "failed"] = "updated_at",
     offliner: str | None = None,
     fetch_most_recent_tasks: bool = False,
+    cursor: str | None = None,
+    estimate_count: bool = False,
 ) -> TaskListResult:
+    """Get a list of tasks
+
+    With a cursor (next_cursor of previous page), the list resumes after the last
+    task of previous page instead of skipping records. With estimate_count, the total
+    of an unfiltered list is the planner estimate instead of an exact count.
+
+    Archived tasks are only listed when filtering on a recipe without a cursor, after
+    the other tasks.
+    """
     # Determine the event/column to sort the results based on sort_criteria
     match sort_criteria:
         case "done":
-            order_by = get_status_timestamp_expr(
-                Task.timestamp, TaskStatus.succeeded
-            ).desc()
+            sort_key = get_status_sort_key_expr(Task.timestamp, TaskStatus.succeeded)
+            parse_sort_key = int
         case "doing":
-            order_by = get_status_timestamp_expr(
-                Task.timestamp, TaskStatus.reserved
-            ).desc()
+            sort_key = get_status_sort_key_expr(Task.timestamp, TaskStatus.reserved)
+            parse_sort_key = int
         case "failed" | "updated_at":
-            order_by = Task.updated_at.desc()
+            sort_key = Task.updated_at
+            parse_sort_key = datetime.datetime.fromisoformat
         case _:
-            order_by = Task.updated_at.desc()
+            sort_key = Task.updated_at
+            parse_sort_key = datetime.datetime.fromisoformat
+    # id breaks ties so that order is stable across pages
+    sort_keys: SortKeys = [(sort_key, True), (Task.id, True)]
 
     if recipe_identifier is not None:
         if is_valid_uuid(recipe_identifier):
@@ -201,10 +373,16 @@ def get_tasks(
         # it to true so every row passes the condition
         recipe_where_clause = literal(True)
 
+    estimated_count = estimate_count and (
+        status is None and recipe_identifier is None and offliner is None
+    )
+    # window count is only correct when all filtered rows are before the limit
+    count_in_query = cursor is None and not estimated_count
+
     status = status or list(TaskStatus)
     stmt = (  # pyright: ignore[reportUnknownVariableType]
         select(
-            func.count().over().label("nb_records"),
+            (func.count().over() if count_in_query else literal(0)).label("nb_records"),
             Task.id,
             Task.status,
             Task.timestamp,
@@ -220,6 +398,7 @@ def get_tasks(
             Recipe.name.label("recipe_name"),
             Recipe.id.label("recipe_id"),
             Worker.name.label("worker_name"),
+            sort_key.label("sort_key"),
         )
         .join(Account, Task.requested_by)
         .join(Worker, Task.worker, isouter=True)
@@ -230,12 +409,16 @@ def get_tasks(
             | (offliner is None),
             (Task.status.in_(status)),
         )
-        .order_by(order_by)
-        .offset(skip)
-        .limit(limit)
     )
+    filtered_stmt = stmt  # pyright: ignore[reportUnknownVariableType]
+    if cursor is not None:
+        stmt = stmt.where(  # pyright: ignore[reportUnknownVariableType, reportUnknownMemberType]
+            after_cursor(sort_keys, decode_cursor(cursor, parse_sort_key, UUID))
+        )
+    stmt = stmt.order_by(*order_by_keys(sort_keys)).offset(skip).limit(limit)  # pyright: ignore[reportUnknownVariableType, reportUnknownMemberType]
 
     results = TaskListResult(nb_records=0, tasks=[])
+    last_sort_key = None
     for (
         nb_records,
         _id,
@@ -250,10 +433,12 @@ def get_tasks(
         _recipe_name,
         _recipe_id,
         worker_name,
+        sort_value,
     ) in session.execute(
         stmt  # pyright: ignore[reportUnknownArgumentType]
     ).all():
         results.nb_records = nb_records
+        last_sort_key = sort_value
         results.tasks.append(
             TaskLightSchema(
                 id=_id,
@@ -277,6 +462,74 @@ def get_tasks(
             )
         )
 
+    if estimated_count:
+        results.nb_records = get_estimated_count(session, Task)
+        results.estimated_count = True
+    elif cursor is not None:
+        # following pages, exact count was returned with the first one
+        results.nb_records = estimate_count_from_stmt(session, filtered_stmt)
+        results.estimated_count = True
+    if len(results.tasks) == limit:
+        results.next_cursor = encode_cursor([last_sort_key, results.tasks[-1].id])
+    if recipe_identifier is not None and cursor is None:
+        # history of a recipe goes on with its archived tasks, listed last
+        nb_tasks = (
+            results.nb_records
+            if results.tasks or skip == 0
+            else count_from_stmt(
+                session,
+                filtered_stmt,  # pyright: ignore[reportUnknownArgumentType]
+            )
+        )
+        archived_stmt = (
+            select(ArchivedTask.payload, Recipe.name, Recipe.id)
+            .join(Recipe, ArchivedTask.recipe_id == Recipe.id)
+            .where(
+                recipe_where_clause,
+                (Recipe.config["offliner"]["offliner_id"].astext == offliner)
+                | (offliner is None),
+                ArchivedTask.status.in_(status),
+            )
+        )
+        archived_rows: Sequence[tuple[bytes, str, UUID]] = []
+        if len(results.tasks) < limit:
+            archived_rows = (
+                session.execute(
+                    archived_stmt.order_by(
+                        ArchivedTask.updated_at.desc(), ArchivedTask.id.desc()
+                    )
+                    .offset(max(skip - nb_tasks, 0))
+                    .limit(limit - len(results.tasks))
+                )
+                .tuples()
+                .all()
+            )
+        for payload, _recipe_name, _recipe_id in archived_rows:
+            document = decompress_task_document(payload)
+            results.tasks.append(
+                TaskLightSchema(
+                    id=document["id"],
+                    status=document["status"],
+                    timestamp=document["timestamp"],
+                    original_recipe_name=document["original_recipe_name"],
+                    context=document["context"],
+                    priority=document["priority"],
+                    config=ConfigWithOnlyResourcesSchema(
+                        resources=ConfigResourcesSchema(
+                            cpu=document["config"]["resources"]["cpu"],
+                            disk=document["config"]["resources"]["disk"],
+                            memory=document["config"]["resources"]["memory"],
+                        ),
+                    ),
+                    updated_at=document["updated_at"],
+                    requested_by=document["requested_by"],
+                    recipe_name=_recipe_name,
+                    recipe_id=_recipe_id,
+                    worker_name=document["worker_name"],
+                )
+            )
+        results.nb_records = nb_tasks + count_from_stmt(session, archived_stmt)
+
     if fetch_most_recent_tasks:
         recipe_ids: set[UUID] = {
             task.recipe_id for task in results.tasks if task.recipe_id
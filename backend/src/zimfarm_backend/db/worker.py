@@ -1,10 +1,12 @@
 import datetime
 import ipaddress
+import threading
 from ipaddress import IPv4Address, IPv6Address
 from typing import Any
 from uuid import UUID
 
-from sqlalchemy import asc, func, select, update
+from sqlalchemy import DateTime, String, column, func, literal, or_, select, update
+from sqlalchemy import values as values_clause
 from sqlalchemy.orm import Session as OrmSession
 from sqlalchemy.orm.strategy_options import selectinload
 
@@ -20,8 +22,19 @@ from zimfarm_backend.common.schemas.orms import (
     WorkerMetricsSchema,
     WorkerResourcesSchema,
 )
+from zimfarm_backend.db import (
+    SortKeys,
+    after_cursor,
+    decode_cursor,
+    encode_cursor,
+    estimate_count_from_stmt,
+    get_estimated_count,
+    get_small_table_version,
+    order_by_keys,
+)
 from zimfarm_backend.db.account import create_account
 from zimfarm_backend.db.exceptions import RecordDoesNotExistError
+from zimfarm_backend.db.live import publish_live_update
 from zimfarm_backend.db.models import Account, Task, Worker
 from zimfarm_backend.db.ssh_key import (
     create_ssh_key,
@@ -33,6 +46,94 @@ from zimfarm_backend.db.tasks import get_currently_running_tasks
 class WorkersListResult(BaseModel):
     nb_records: int
     workers: list[WorkerLightSchema]
+    next_cursor: str | None = None
+    estimated_count: bool = False
+
+
+class LastSeenBuffer:
+    """Last seen timestamps of workers, written to the database in bulk
+
+    Workers poll for tasks every few seconds: instead of updating their row each
+    time, timestamps are kept in memory and written for all workers at once by a
+    periodic flush. Timestamps known to this process are used in place of older
+    database values when telling whether a worker is online."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # timestamps not written yet, by worker name
+        self.pending: dict[str, datetime.datetime] = {}
+        # most recent timestamps known to this process, by worker name
+        self.seen: dict[str, datetime.datetime] = {}
+
+    def record(
+        self,
+        worker_name: str,
+        when: datetime.datetime | None = None,
+        *,
+        written: bool = False,
+    ):
+        """Record that a worker has been seen, written already or to be flushed"""
+        when = when or getnow()
+        with self.lock:
+            self.seen[worker_name] = when
+            if written:
+                self.pending.pop(worker_name, None)
+            else:
+                self.pending[worker_name] = when
+
+    def get_last_seen(
+        self, worker_name: str, last_seen: datetime.datetime | None
+    ) -> datetime.datetime | None:
+        """Most recent of a worker's database last seen and buffered one"""
+        seen = self.seen.get(worker_name)
+        if seen is None or (last_seen is not None and last_seen >= seen):
+            return last_seen
+        return seen
+
+    def flush(self, session: OrmSession) -> int:
+        """Write pending timestamps with a single UPDATE, returns nb of workers"""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            # workers not seen for long are offline anyway, no need to keep them
+            stale_before = getnow() - datetime.timedelta(
+                seconds=WORKER_OFFLINE_DELAY_DURATION
+            )
+            self.seen = {
+                name: when for name, when in self.seen.items() if when > stale_before
+            }
+        if not pending:
+            return 0
+        seen = values_clause(
+            column("name", String), column("last_seen", DateTime), name="seen"
+        ).data(list(pending.items()))
+        try:
+            updated = session.execute(
+                update(Worker)
+                .where(
+                    Worker.name == seen.c.name,
+                    # another API process might have written a newer one
+                    or_(
+                        Worker.last_seen.is_(None),
+                        Worker.last_seen < seen.c.last_seen,
+                    ),
+                )
+                .values(last_seen=seen.c.last_seen)
+                .returning(Worker.name, Worker.last_seen)
+                .execution_options(synchronize_session=False)
+            ).all()
+        except Exception:
+            # keep timestamps for next flush, unless more recent ones came in
+            with self.lock:
+                self.pending = pending | self.pending
+            raise
+        for worker_name, last_seen in updated:
+            publish_live_update(
+                session, "worker", name=worker_name, last_seen=last_seen
+            )
+        return len(updated)
+
+
+last_seen_buffer = LastSeenBuffer()
 
 
 def get_worker_or_none(session: OrmSession, *, worker_name: str) -> Worker | None:
@@ -79,7 +180,7 @@ def create_worker_schema(
         id=worker.id,
         show_secrets=show_secrets,
         last_ip=worker.last_ip,
-        last_seen=worker.last_seen,
+        last_seen=last_seen_buffer.get_last_seen(worker.name, worker.last_seen),
         selfish=worker.selfish,
         name=worker.name,
         platforms=worker.platforms,
@@ -150,9 +251,63 @@ def update_worker(
 
     session.add(worker)
     session.flush()
+    if update_last_seen:
+        publish_live_update(
+            session, "worker", name=worker.name, last_seen=worker.last_seen
+        )
     return worker
 
 
+def _apply_changes(worker: Worker, **values: Any) -> bool:
+    """Set worker attributes which differ from given values, returns whether any did"""
+    changed = False
+    for attribute, value in values.items():
+        if getattr(worker, attribute) != value:
+            setattr(worker, attribute, value)
+            changed = True
+    return changed
+
+
+def record_worker_poll(
+    session: OrmSession,
+    *,
+    worker: Worker,
+    ip_address: str | None = None,
+    avail_disk: int | None = None,
+    avail_memory: int | None = None,
+    avail_cpu: int | None = None,
+    total_disk: int | None = None,
+    total_memory: int | None = None,
+    total_cpu: int | None = None,
+) -> bool:
+    """Record a worker polling for tasks, returns whether its row was updated
+
+    Only columns whose value changed are written. When nothing else changed, the
+    last seen timestamp is buffered to be written in bulk with other workers' ones.
+    """
+    values = {
+        "last_ip": IPv4Address(ip_address) if ip_address is not None else None,
+        "available_disk": avail_disk,
+        "available_memory": avail_memory,
+        "available_cpu": avail_cpu,
+        "total_disk": total_disk,
+        "total_memory": total_memory,
+        "total_cpu": total_cpu,
+    }
+    now = getnow()
+    if not _apply_changes(
+        worker, **{name: value for name, value in values.items() if value is not None}
+    ):
+        last_seen_buffer.record(worker.name, now)
+        return False
+
+    worker.last_seen = now
+    session.flush()
+    last_seen_buffer.record(worker.name, now, written=True)
+    publish_live_update(session, "worker", name=worker.name, last_seen=now)
+    return True
+
+
 def get_workers(
     session: OrmSession,
     *,
@@ -160,11 +315,16 @@ def get_workers(
     limit: int,
     hide_offlines: bool = False,
     show_secrets: bool = True,
+    cursor: str | None = None,
+    estimate_count: bool = False,
 ) -> WorkersListResult:
     """Get a list of workers."""
+    sort_keys: SortKeys = [(Worker.name, False)]
+    estimated_count = estimate_count and not hide_offlines
+    count_in_query = cursor is None and not estimated_count
     stmt = (
         select(
-            func.count().over().label("nb_records"),
+            (func.count().over() if count_in_query else literal(0)).label("nb_records"),
             Worker,
         )
         .join(Account)
@@ -179,17 +339,38 @@ def get_workers(
             )
             | (hide_offlines is False),
         )
-        .order_by(asc(Worker.name))
-        .offset(skip)
-        .limit(limit)
     )
+    filtered_stmt = stmt
+    if cursor is not None:
+        stmt = stmt.where(after_cursor(sort_keys, decode_cursor(cursor, str)))
+    stmt = stmt.order_by(*order_by_keys(sort_keys)).offset(skip).limit(limit)
     results = WorkersListResult(nb_records=0, workers=[])
     for nb_records, worker in session.execute(stmt).all():
         results.nb_records = nb_records
         results.workers.append(create_worker_schema(worker, show_secrets=show_secrets))
+    if estimated_count:
+        results.nb_records = get_estimated_count(session, Worker)
+        results.estimated_count = True
+    elif cursor is not None:
+        # following pages, exact count was returned with the first one
+        results.nb_records = estimate_count_from_stmt(session, filtered_stmt)
+        results.estimated_count = True
+    if len(results.workers) == limit:
+        results.next_cursor = encode_cursor([results.workers[-1].name])
     return results
 
 
+def get_workers_version(session: OrmSession) -> tuple[int, ...]:
+    """Token which changes whenever a worker is updated or goes offline"""
+    nb_online = session.execute(
+        select(func.count(Worker.id)).where(
+            func.extract("epoch", func.now() - Worker.last_seen)
+            < WORKER_OFFLINE_DELAY_DURATION
+        )
+    ).scalar_one()
+    return (*get_small_table_version(session, Worker), nb_online)
+
+
 def get_worker_metrics(
     session: OrmSession, *, worker_name: str, show_secrets: bool = True
 ) -> WorkerMetricsSchema:
@@ -216,7 +397,7 @@ def get_worker_metrics(
         name=worker.name,
         last_ip=worker.last_ip,
         selfish=worker.selfish,
-        last_seen=worker.last_seen,
+        last_seen=last_seen_buffer.get_last_seen(worker.name, worker.last_seen),
         username=worker.account.display_name,
         platforms=worker.platforms,
         resources=WorkerResourcesSchema(
@@ -266,30 +447,38 @@ def check_in_worker(
     docker_image_created_at: datetime.datetime | None = None,
     platforms: dict[str, int] | None = None,
     account_id: UUID,
-) -> None:
-    """Check in a worker."""
-    stmt = (
-        update(Worker)
-        .values(
-            selfish=selfish,
-            total_cpu=cpu,
-            total_memory=memory,
-            total_disk=disk,
-            offliners=offliners,
-            platforms=platforms if platforms is not None else {},
-            cordoned=cordoned,
-            last_seen=getnow(),
-            account_id=account_id,
-            docker_image_hash=docker_image_hash,
-            docker_image_created_at=(
-                to_naive_utc(docker_image_created_at)
-                if docker_image_created_at
-                else None
-            ),
-        )
-        .where(Worker.name == worker_name)
-    )
-    session.execute(stmt)
+) -> bool:
+    """Check in a worker, returns whether its row was updated
+
+    Only columns whose value changed are written, see record_worker_poll."""
+    worker = get_worker_or_none(session, worker_name=worker_name)
+    if worker is None:
+        return False
+
+    now = getnow()
+    if not _apply_changes(
+        worker,
+        selfish=selfish,
+        total_cpu=cpu,
+        total_memory=memory,
+        total_disk=disk,
+        offliners=offliners,
+        platforms=platforms if platforms is not None else {},
+        cordoned=cordoned,
+        account_id=account_id,
+        docker_image_hash=docker_image_hash,
+        docker_image_created_at=(
+            to_naive_utc(docker_image_created_at) if docker_image_created_at else None
+        ),
+    ):
+        last_seen_buffer.record(worker_name, now)
+        return False
+
+    worker.last_seen = now
+    session.flush()
+    last_seen_buffer.record(worker_name, now, written=True)
+    publish_live_update(session, "worker", name=worker_name, last_seen=now)
+    return True
 
 
 def create_worker(
@@ -0,0 +1,76 @@
+"""add table version
+
+Revision ID: 5e2f1c9a7b34
+Revises: 0bcc05780adb
+Create Date: 2026-10-19 15:05:12.482913
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5e2f1c9a7b34"
+down_revision = "0bcc05780adb"
+branch_labels = None
+depends_on = None
+
+# frequently written tables (task, requested_task, worker) are versioned from reads
+VERSIONED_TABLES = [
+    "account",
+    "offliner",
+    "offliner_definition",
+    "recipe",
+    "sshkey",
+]
+
+# transition tables can only be declared on single-event triggers
+TRIGGER_EVENTS = {
+    "insert": "INSERT REFERENCING NEW TABLE AS changed_rows",
+    "update": "UPDATE REFERENCING NEW TABLE AS changed_rows",
+    "delete": "DELETE REFERENCING OLD TABLE AS changed_rows",
+    "truncate": "TRUNCATE",
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        "table_version",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("name", name=op.f("pk_table_version")),
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+        BEGIN
+            -- separate statement: there is no transition table on TRUNCATE
+            IF TG_OP <> 'TRUNCATE' THEN
+                IF NOT EXISTS (SELECT FROM changed_rows) THEN
+                    RETURN NULL;
+                END IF;
+            END IF;
+            INSERT INTO table_version (name, version) VALUES (TG_TABLE_NAME, 1)
+            ON CONFLICT (name) DO UPDATE SET version = table_version.version + 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in VERSIONED_TABLES:
+        for operation, event in TRIGGER_EVENTS.items():
+            op.execute(
+                f"""
+                CREATE OR REPLACE TRIGGER bump_{table}_version_on_{operation}
+                AFTER {event} ON {table}
+                FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()
+                """
+            )
+
+
+def downgrade() -> None:
+    for table in VERSIONED_TABLES:
+        for operation in TRIGGER_EVENTS:
+            op.execute(f"DROP TRIGGER bump_{table}_version_on_{operation} ON {table}")
+    op.execute("DROP FUNCTION bump_table_version()")
+    op.drop_table("table_version")
@@ -0,0 +1,46 @@
+"""add task keyset pagination indexes
+
+Revision ID: 8c4d2e6f1a90
+Revises: 5e2f1c9a7b34
+Create Date: 2026-10-19 15:48:03.905127
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8c4d2e6f1a90"
+down_revision = "5e2f1c9a7b34"
+branch_labels = None
+depends_on = None
+
+
+def status_sort_key(status: str) -> sa.TextClause:
+    # must match get_status_sort_key_expr for the planner to use the index
+    return sa.text(
+        "coalesce(CAST(jsonb_path_query_first(timestamp, "
+        f'\'$[*] ? (@[0] == "{status}")[1]."$date"\') AS BIGINT), 0)'
+    )
+
+
+def upgrade() -> None:
+    op.create_index("ix_task_updated_at_id", "task", ["updated_at", "id"], unique=False)
+    op.create_index(
+        "ix_task_succeeded_on_id",
+        "task",
+        [status_sort_key("succeeded"), "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_task_reserved_on_id",
+        "task",
+        [status_sort_key("reserved"), "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_task_reserved_on_id", table_name="task")
+    op.drop_index("ix_task_succeeded_on_id", table_name="task")
+    op.drop_index("ix_task_updated_at_id", table_name="task")
@@ -1,8 +1,11 @@
 import datetime
 
-from sqlalchemy import BigInteger, cast, func, literal_column, select
+from sqlalchemy import BigInteger, ColumnElement, cast, func, literal_column
+from sqlalchemy.dialects.postgresql import JSONPATH
 from sqlalchemy.orm import InstrumentedAttribute
 
+from zimfarm_backend.common.enums import TaskStatus
+
 DEFAULT_TIMESTAMP = datetime.datetime(1970, 1, 1)
 
 
@@ -27,16 +30,26 @@ def get_timestamp_for_status(
 def get_status_timestamp_expr(
     jsonb_column: InstrumentedAttribute[list[tuple[str, datetime.datetime]]],
     status: str,
-):
-    elem = func.jsonb_array_elements(jsonb_column).alias("elem")
+) -> ColumnElement[int]:
+    """Timestamp (in ms) of first occurrence of status in a timestamp JSONB column
+
+    Status is inlined in the jsonpath rather than bound so that, with no subquery,
+    the expression can be indexed and matched against indexes by the planner.
+    """
+    path = f'$[*] ? (@[0] == "{TaskStatus(status)}")[1]."$date"'
     return cast(
-        # select the second element and then the date
-        select(
-            literal_column("elem->1->>'$date'")  # pyright: ignore[reportUnknownArgumentType]
-        )
-        .select_from(elem)
-        .where(literal_column("elem->>0") == status)
-        .limit(1)
-        .scalar_subquery(),
+        func.jsonb_path_query_first(
+            jsonb_column, literal_column(f"'{path}'", JSONPATH)
+        ),
         BigInteger,
     )
+
+
+def get_status_sort_key_expr(
+    jsonb_column: InstrumentedAttribute[list[tuple[str, datetime.datetime]]],
+    status: str,
+) -> ColumnElement[int]:
+    """Timestamp of status to sort on, 0 for records which never had this status"""
+    return func.coalesce(
+        get_status_timestamp_expr(jsonb_column, status), literal_column("0")
+    )
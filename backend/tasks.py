@@ -19,6 +19,24 @@ def test_cov(ctx: Context, args: str = ""):
     ctx.run(f"coverage run -m pytest {args}", pty=use_pty)
 
 
+@task(optional=["args"], help={"args": "benchmarks/seed.py additional arguments"})
+def bench_seed(ctx: Context, args: str = ""):
+    """seed database with synthetic dataset for benchmarks"""
+    ctx.run(f"python benchmarks/seed.py {args}", pty=use_pty)
+
+
+@task(optional=["args"], help={"args": "benchmarks/run.py additional arguments"})
+def bench(ctx: Context, args: str = ""):
+    """run benchmark scenarios against seeded database"""
+    ctx.run(f"python benchmarks/run.py {args}", pty=use_pty)
+
+
+@task(optional=["args"], help={"args": "benchmarks/simulate.py additional arguments"})
+def simulate(ctx: Context, args: str = ""):
+    """replay scheduling against database with a virtual clock"""
+    ctx.run(f"python benchmarks/simulate.py {args}", pty=use_pty)
+
+
 @task(optional=["html"], help={"html": "flag to export html report"})
 def report_cov(ctx: Context, *, html: bool = False):
     """report coverage"""
@@ -0,0 +1,57 @@
+import datetime
+from collections.abc import Callable
+
+from pytest import MonkeyPatch
+from sqlalchemy import select
+from sqlalchemy.orm import Session as OrmSession
+
+from zimfarm_backend.background_tasks import archive_tasks as archive_tasks_module
+from zimfarm_backend.background_tasks.archive_tasks import archive_old_tasks
+from zimfarm_backend.common import getnow
+from zimfarm_backend.common.enums import TaskStatus
+from zimfarm_backend.db import count_from_stmt
+from zimfarm_backend.db.models import ArchivedTask, Task
+from zimfarm_backend.db.tasks import get_task_by_id
+
+
+def test_archive_old_tasks(
+    dbsession: OrmSession,
+    create_task: Callable[..., Task],
+    monkeypatch: MonkeyPatch,
+):
+    """Test that archive_old_tasks moves old tasks to the archive"""
+    monkeypatch.setattr(
+        archive_tasks_module, "TASK_ARCHIVING_AGE", datetime.timedelta(days=30)
+    )
+    old_time = getnow() - datetime.timedelta(days=40)
+    old_task = create_task(status=TaskStatus.succeeded)
+    old_task.updated_at = old_time
+    recent_task = create_task(status=TaskStatus.succeeded)
+    dbsession.flush()
+    old_task_id = old_task.id
+
+    archive_old_tasks(dbsession)
+
+    assert dbsession.scalars(select(Task.id)).all() == [recent_task.id]
+    assert dbsession.scalars(select(ArchivedTask.id)).all() == [old_task_id]
+    assert get_task_by_id(dbsession, old_task_id).updated_at == old_time
+
+
+def test_archive_old_tasks_batch_size(
+    dbsession: OrmSession,
+    create_task: Callable[..., Task],
+    monkeypatch: MonkeyPatch,
+):
+    """Test that archive_old_tasks archives the oldest tasks first, in batches"""
+    monkeypatch.setattr(archive_tasks_module, "TASK_ARCHIVING_BATCH_SIZE", 2)
+    now = getnow()
+    tasks = [create_task(status=TaskStatus.failed) for _ in range(3)]
+    for days, task in enumerate(tasks, start=40):
+        task.updated_at = now - datetime.timedelta(days=days)
+    dbsession.flush()
+    task_ids = [task.id for task in tasks]
+
+    archive_old_tasks(dbsession)
+
+    assert count_from_stmt(dbsession, select(ArchivedTask.id)) == 2
+    assert dbsession.scalars(select(Task.id)).all() == [task_ids[0]]
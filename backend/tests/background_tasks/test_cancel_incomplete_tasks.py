@@ -9,6 +9,7 @@ from zimfarm_backend.background_tasks import cancel_tasks as cancel_tasks_module
 from zimfarm_backend.background_tasks.cancel_tasks import cancel_incomplete_tasks
 from zimfarm_backend.common import getnow
 from zimfarm_backend.common.enums import TaskStatus
+from zimfarm_backend.db.exceptions import RecordDoesNotExistError
 from zimfarm_backend.db.models import Account, Task, Worker
 
 
@@ -121,3 +122,27 @@ def test_cancel_incomplete_tasks_handles_various_incomplete_statuses(
     assert task.status == TaskStatus.cancel_requested
     assert task.canceled_by is not None
     assert task.canceled_by.username == "periodic-task-gone"
+
+
+def test_cancel_incomplete_tasks_missing_account(
+    dbsession: OrmSession,
+    create_task: Callable[..., Task],
+    worker: Worker,
+    monkeypatch: MonkeyPatch,
+):
+    """Test that stale tasks are not canceled by an unknown account"""
+    now = getnow()
+    monkeypatch.setattr(
+        cancel_tasks_module,
+        "STALLED_GONE_TIMEOUT",
+        datetime.timedelta(hours=1).total_seconds(),
+    )
+    task = create_task(status=TaskStatus.started)
+    task.worker_id = worker.id
+    task.updated_at = now - datetime.timedelta(hours=2)
+    worker.last_seen = now
+    dbsession.add_all([task, worker])
+    dbsession.flush()
+
+    with pytest.raises(RecordDoesNotExistError):
+        cancel_incomplete_tasks(dbsession)
@@ -1,10 +1,11 @@
 import datetime
 from collections.abc import Callable
 from unittest.mock import patch
+from uuid import UUID
 
 import pytest
 from pytest import MonkeyPatch
-from sqlalchemy import select
+from sqlalchemy import select, text
 from sqlalchemy.orm import Session as OrmSession
 
 from zimfarm_backend.background_tasks import cancel_tasks as cancel_tasks_module
@@ -47,6 +48,75 @@ def test_cancel_stale_task_with_status(
     assert task.canceled_by.username == PERIODIC_TASK_NAME
 
 
+def test_cancel_stale_tasks_with_status_appends_event(
+    dbsession: OrmSession,
+    create_task: Callable[..., Task],
+    create_account: Callable[..., Account],
+):
+    """Test that bulk cancellation appends status and event to every stale task"""
+    now = getnow()
+    create_account(username=PERIODIC_TASK_NAME)
+    delta = datetime.timedelta(hours=1)
+    old_time = now - delta
+    stale_tasks: list[Task] = []
+    for _ in range(3):
+        task = create_task(status=TaskStatus.started)
+        task.timestamp = [(TaskStatus.started, old_time)]
+        stale_tasks.append(task)
+    recent_task = create_task(status=TaskStatus.started)
+    recent_task.timestamp = [(TaskStatus.started, now)]
+    dbsession.add_all([*stale_tasks, recent_task])
+    dbsession.flush()
+
+    cancel_stale_tasks_with_status(
+        dbsession, TaskStatus.started, now, delta.total_seconds()
+    )
+
+    for task in stale_tasks:
+        dbsession.refresh(task)
+        assert task.status == TaskStatus.canceled
+        assert task.updated_at == now
+        assert len(task.timestamp) == 2
+        assert task.timestamp[-1][0] == TaskStatus.canceled
+        assert task.events[-1]["code"] == TaskStatus.canceled
+
+    dbsession.refresh(recent_task)
+    assert recent_task.status == TaskStatus.started
+    assert len(recent_task.timestamp) == 1
+
+
+def test_cancel_stale_tasks_with_status_notification_db_error(
+    dbsession: OrmSession,
+    create_task: Callable[..., Task],
+    create_account: Callable[..., Account],
+):
+    """Test that a notification failing on the database does not lose the batch"""
+    now = getnow()
+    create_account(username=PERIODIC_TASK_NAME)
+    delta = datetime.timedelta(hours=1)
+    stale_tasks: list[Task] = []
+    for _ in range(2):
+        task = create_task(status=TaskStatus.started)
+        task.timestamp = [(TaskStatus.started, now - delta)]
+        stale_tasks.append(task)
+    dbsession.flush()
+
+    def failing_notification(_task_id: UUID, _event: str, session: OrmSession):
+        session.execute(text("SELECT 1/0"))
+
+    with patch.object(
+        cancel_tasks_module, "handle_notification", side_effect=failing_notification
+    ) as mock_notification:
+        cancel_stale_tasks_with_status(
+            dbsession, TaskStatus.started, now, delta.total_seconds()
+        )
+
+    assert mock_notification.call_count == len(stale_tasks)
+    for task in stale_tasks:
+        dbsession.refresh(task)
+        assert task.status == TaskStatus.canceled
+
+
 @pytest.mark.parametrize(
     "exit_code, expected_status", [(0, TaskStatus.succeeded), (1, TaskStatus.failed)]
 )
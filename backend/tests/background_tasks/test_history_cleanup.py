@@ -1,3 +1,4 @@
+import datetime
 from collections.abc import Callable
 
 from pytest import MonkeyPatch
@@ -6,8 +7,11 @@ from sqlalchemy.orm import Session as OrmSession
 
 from zimfarm_backend.background_tasks import history_cleanup as history_cleanup_module
 from zimfarm_backend.background_tasks.history_cleanup import history_cleanup
+from zimfarm_backend.common import getnow
+from zimfarm_backend.common.enums import TaskStatus
 from zimfarm_backend.db import count_from_stmt
-from zimfarm_backend.db.models import Recipe, Task
+from zimfarm_backend.db.models import ArchivedTask, Recipe, Task
+from zimfarm_backend.db.tasks import archive_tasks
 
 
 def test_history_cleanup_recipe_with_few_tasks(
@@ -89,3 +93,30 @@ def test_history_cleanup_multiple_recipes(
         count_from_stmt(dbsession, select(Task.id).where(Task.recipe_id == recipe3.id))
         == 10
     )
+
+
+def test_history_cleanup_archived_tasks(
+    dbsession: OrmSession,
+    create_recipe: Callable[..., Recipe],
+    create_task: Callable[..., Task],
+    monkeypatch: MonkeyPatch,
+):
+    """Test that archived tasks count towards the tasks kept for a recipe"""
+    monkeypatch.setattr(history_cleanup_module, "HISTORY_TASK_PER_RECIPE", 5)
+    recipe = create_recipe()
+    now = getnow()
+    for days in range(40, 44):
+        task = create_task(recipe_name=recipe.name, status=TaskStatus.succeeded)
+        task.updated_at = now - datetime.timedelta(days=days)
+    dbsession.flush()
+    archive_tasks(dbsession, updated_before=now, limit=10)
+    newest_archived_task_id = dbsession.scalars(
+        select(ArchivedTask.id).order_by(ArchivedTask.updated_at.desc())
+    ).first()
+    for _ in range(4):
+        create_task(recipe_name=recipe.name)
+
+    history_cleanup(dbsession)
+
+    assert count_from_stmt(dbsession, select(Task.id)) == 4
+    assert dbsession.scalars(select(ArchivedTask.id)).all() == [newest_archived_task_id]
@@ -1,5 +1,6 @@
 from collections.abc import Callable
 from datetime import timedelta
+from typing import Any
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -10,12 +11,13 @@ from zimfarm_backend.background_tasks import (
 )
 from zimfarm_backend.background_tasks.send_cms_notifications import (
     CMSClientTokenProvider,
+    advertise_books_to_cms,
     notify_cms_for_checked_files,
 )
 from zimfarm_backend.common import getnow
 from zimfarm_backend.common.schemas.models import FileCreateUpdateSchema
 from zimfarm_backend.db.models import Task
-from zimfarm_backend.db.tasks import create_or_update_task_file
+from zimfarm_backend.db.tasks import create_or_update_task_file, get_task_by_id
 
 
 def test_send_cms_notifications_disabled(
@@ -45,7 +47,7 @@ def test_send_cms_notifications_disabled(
     dbsession.flush()
 
     with patch(
-        "zimfarm_backend.background_tasks.send_cms_notifications.advertise_book_to_cms"
+        "zimfarm_backend.background_tasks.send_cms_notifications.advertise_books_to_cms"
     ) as mock_advertise:
         notify_cms_for_checked_files(dbsession)
         mock_advertise.assert_not_called()
@@ -78,7 +80,7 @@ def test_send_cms_notifications_skip_already_notified(
     dbsession.flush()
 
     with patch(
-        "zimfarm_backend.background_tasks.send_cms_notifications.advertise_book_to_cms"
+        "zimfarm_backend.background_tasks.send_cms_notifications.advertise_books_to_cms"
     ) as mock_advertise:
         notify_cms_for_checked_files(dbsession)
         mock_advertise.assert_not_called()
@@ -112,7 +114,7 @@ def test_send_cms_notifications_retry_failed(
     dbsession.flush()
 
     with patch(
-        "zimfarm_backend.background_tasks.send_cms_notifications.advertise_book_to_cms"
+        "zimfarm_backend.background_tasks.send_cms_notifications.advertise_books_to_cms"
     ) as mock_advertise:
         notify_cms_for_checked_files(dbsession)
         mock_advertise.assert_called_once()
@@ -145,7 +147,7 @@ def test_send_cms_notifications_retry_never_notified(
     dbsession.flush()
 
     with patch(
-        "zimfarm_backend.background_tasks.send_cms_notifications.advertise_book_to_cms"
+        "zimfarm_backend.background_tasks.send_cms_notifications.advertise_books_to_cms"
     ) as mock_advertise:
         notify_cms_for_checked_files(dbsession)
         mock_advertise.assert_called_once()
@@ -180,7 +182,7 @@ def test_send_cms_notifications_with_check_result_only(
     dbsession.flush()
 
     with patch(
-        "zimfarm_backend.background_tasks.send_cms_notifications.advertise_book_to_cms"
+        "zimfarm_backend.background_tasks.send_cms_notifications.advertise_books_to_cms"
     ) as mock_advertise:
         notify_cms_for_checked_files(dbsession)
         mock_advertise.assert_not_called()
@@ -215,7 +217,7 @@ def test_send_cms_notifications_with_check_filename_only(
     dbsession.flush()
 
     with patch(
-        "zimfarm_backend.background_tasks.send_cms_notifications.advertise_book_to_cms"
+        "zimfarm_backend.background_tasks.send_cms_notifications.advertise_books_to_cms"
     ) as mock_advertise:
         notify_cms_for_checked_files(dbsession)
         mock_advertise.assert_not_called()
@@ -251,7 +253,7 @@ def test_send_cms_notifications_with_both_check_fields(
     dbsession.flush()
 
     with patch(
-        "zimfarm_backend.background_tasks.send_cms_notifications.advertise_book_to_cms"
+        "zimfarm_backend.background_tasks.send_cms_notifications.advertise_books_to_cms"
     ) as mock_advertise:
         notify_cms_for_checked_files(dbsession)
         mock_advertise.assert_called_once()
@@ -286,7 +288,7 @@ def test_send_cms_notifications_skip_without_check_fields(
     dbsession.flush()
 
     with patch(
-        "zimfarm_backend.background_tasks.send_cms_notifications.advertise_book_to_cms"
+        "zimfarm_backend.background_tasks.send_cms_notifications.advertise_books_to_cms"
     ) as mock_advertise:
         notify_cms_for_checked_files(dbsession)
         # Should NOT be notified - missing check fields
@@ -323,7 +325,7 @@ def test_send_cms_notifications_skip_old_timestamp(
     dbsession.flush()
 
     with patch(
-        "zimfarm_backend.background_tasks.send_cms_notifications.advertise_book_to_cms"
+        "zimfarm_backend.background_tasks.send_cms_notifications.advertise_books_to_cms"
     ) as mock_advertise:
         notify_cms_for_checked_files(dbsession)
         # Should NOT be notified - too old
@@ -361,13 +363,164 @@ def test_send_cms_notifications_coalesce_uses_created_timestamp(
     dbsession.flush()
 
     with patch(
-        "zimfarm_backend.background_tasks.send_cms_notifications.advertise_book_to_cms"
+        "zimfarm_backend.background_tasks.send_cms_notifications.advertise_books_to_cms"
     ) as mock_advertise:
         notify_cms_for_checked_files(dbsession)
         # Should be notified - recent created_timestamp + has check field
         mock_advertise.assert_called_once()
 
 
+def test_advertise_books_to_cms_records_each_result(
+    dbsession: OrmSession,
+    create_task: Callable[..., Task],
+):
+    """Test that each book's delivery result is recorded and acknowledged skipped"""
+    task = create_task()
+    for name, cms_notified in [
+        ("ok.zim", None),
+        ("ko.zim", None),
+        ("done.zim", True),
+    ]:
+        create_or_update_task_file(
+            dbsession,
+            FileCreateUpdateSchema(
+                task_id=task.id,
+                name=name,
+                status="checked",
+                cms_notified=cms_notified,
+                check_result=1,
+                check_filename=f"{name}.json",
+                info={"id": name},
+            ),
+        )
+    dbsession.flush()
+    task_full = get_task_by_id(dbsession, task.id)
+
+    def post_book(payload: dict[str, Any], access_token: str) -> bool:  # noqa: ARG001
+        return payload["filename"] == "ok.zim"
+
+    with (
+        patch.object(
+            send_cms_notifications_module.cms_client_token_provider,
+            "get_access_token",
+            return_value="token",
+        ) as mock_token,
+        patch.object(
+            send_cms_notifications_module.cms_notifier,
+            "post_book",
+            side_effect=post_book,
+        ) as mock_post,
+    ):
+        nb_notified = advertise_books_to_cms(
+            dbsession,
+            [(task_full, "ok.zim"), (task_full, "ko.zim"), (task_full, "done.zim")],
+        )
+
+    assert nb_notified == 1
+    mock_token.assert_called_once()
+    assert mock_post.call_count == 2
+
+    files = get_task_by_id(dbsession, task.id).files
+    assert files["ok.zim"].cms_notified is True
+    assert files["ok.zim"].cms_on is not None
+    assert files["ko.zim"].cms_notified is False
+    assert files["ko.zim"].cms_on is not None
+    assert files["done.zim"].cms_notified is True
+    assert files["done.zim"].cms_on is None
+
+
+def test_advertise_books_to_cms_skips_invalid_payload(
+    dbsession: OrmSession,
+    create_task: Callable[..., Task],
+):
+    """Test that a book with an invalid payload does not abort the whole batch"""
+    task = create_task()
+    for name, info in [("ok.zim", {"id": "ok.zim"}), ("invalid.zim", {})]:
+        create_or_update_task_file(
+            dbsession,
+            FileCreateUpdateSchema(
+                task_id=task.id,
+                name=name,
+                status="checked",
+                check_result=1,
+                check_filename=f"{name}.json",
+                info=info,
+            ),
+        )
+    dbsession.flush()
+    task_full = get_task_by_id(dbsession, task.id)
+
+    with (
+        patch.object(
+            send_cms_notifications_module.cms_client_token_provider,
+            "get_access_token",
+            return_value="token",
+        ),
+        patch.object(
+            send_cms_notifications_module.cms_notifier,
+            "post_book",
+            return_value=True,
+        ) as mock_post,
+    ):
+        nb_notified = advertise_books_to_cms(
+            dbsession, [(task_full, "invalid.zim"), (task_full, "ok.zim")]
+        )
+
+    assert nb_notified == 1
+    mock_post.assert_called_once()
+
+    files = get_task_by_id(dbsession, task.id).files
+    assert files["ok.zim"].cms_notified is True
+    assert files["invalid.zim"].cms_notified is False
+    assert files["invalid.zim"].cms_on is not None
+
+
+def test_advertise_books_to_cms_records_invalid_payload_without_token(
+    dbsession: OrmSession,
+    create_task: Callable[..., Task],
+):
+    """Test that invalid books are recorded even when no CMS token is available"""
+    task = create_task()
+    for name, info in [("ok.zim", {"id": "ok.zim"}), ("invalid.zim", {})]:
+        create_or_update_task_file(
+            dbsession,
+            FileCreateUpdateSchema(
+                task_id=task.id,
+                name=name,
+                status="checked",
+                check_result=1,
+                check_filename=f"{name}.json",
+                info=info,
+            ),
+        )
+    dbsession.flush()
+    task_full = get_task_by_id(dbsession, task.id)
+
+    with (
+        patch.object(
+            send_cms_notifications_module.cms_client_token_provider,
+            "get_access_token",
+            side_effect=Exception("CMS is down"),
+        ),
+        patch.object(
+            send_cms_notifications_module.cms_notifier, "post_book"
+        ) as mock_post,
+    ):
+        nb_notified = advertise_books_to_cms(
+            dbsession, [(task_full, "invalid.zim"), (task_full, "ok.zim")]
+        )
+
+    assert nb_notified == 0
+    mock_post.assert_not_called()
+
+    files = get_task_by_id(dbsession, task.id).files
+    assert files["invalid.zim"].cms_notified is False
+    assert files["invalid.zim"].cms_on is not None
+    # valid book is left as is, to be advertised once a token is available
+    assert files["ok.zim"].cms_notified is None
+    assert files["ok.zim"].cms_on is None
+
+
 def test_cms_client_token_provider_initial_token_request():
     """Test that initial access token is requested from OAuth server"""
     provider = CMSClientTokenProvider()
@@ -45,7 +45,7 @@ from zimfarm_backend.db.models import (
     Task,
     Worker,
 )
-from zimfarm_backend.db.offliner import create_offliner
+from zimfarm_backend.db.offliner import create_offliner, offliners_cache
 from zimfarm_backend.db.offliner_definition import create_offliner_definition_schema
 from zimfarm_backend.db.recipe import DEFAULT_RECIPE_DURATION, get_recipe_or_none
 from zimfarm_backend.utils.cryptography import (
@@ -69,6 +69,12 @@ def dbsession() -> Generator[OrmSession]:
     session.close()
 
 
+@pytest.fixture(autouse=True)
+def clear_offliners_cache():
+    # tables are recreated for each test, drop what previous tests cached
+    offliners_cache.invalidate()
+
+
 @pytest.fixture
 def data_gen(faker: Faker) -> Faker:
     """Sets up faker to generate random data for testing.
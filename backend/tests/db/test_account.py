@@ -2,6 +2,8 @@ from collections.abc import Callable
 from uuid import uuid4
 
 import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState
 from sqlalchemy.orm import Session as OrmSession
 
 from zimfarm_backend.common.roles import ROLES, RoleEnum, merge_scopes
@@ -14,6 +16,7 @@ from zimfarm_backend.db.account import (
     get_account_by_username,
     get_account_by_username_or_none,
     get_accounts,
+    get_principal_or_none,
     update_account,
 )
 from zimfarm_backend.db.exceptions import (
@@ -29,6 +32,17 @@ def test_get_account_by_id_or_none(dbsession: OrmSession):
     assert account is None
 
 
+def test_get_account_by_id_or_none_with_idp_sub(
+    dbsession: OrmSession, create_account: Callable[..., Account]
+):
+    """Test that get_account_by_id_or_none falls back to the IdP subject"""
+    idp_sub = uuid4()
+    account = create_account(idp_sub=idp_sub)
+    db_account = get_account_by_id_or_none(dbsession, account_id=idp_sub)
+    assert db_account is not None
+    assert db_account.id == account.id
+
+
 def test_get_account_by_id_not_found(dbsession: OrmSession):
     """Test that get_account_by_id raises an exception if the account does not exist"""
     with pytest.raises(RecordDoesNotExistError):
@@ -242,3 +256,48 @@ def test_delete_account(dbsession: OrmSession, account: Account):
     delete_account(dbsession, account_id=account.id)
     dbsession.refresh(account)
     assert account.deleted
+
+
+@pytest.mark.parametrize("use_idp_sub", [True, False])
+def test_get_principal_or_none_is_cached(
+    dbsession: OrmSession, create_account: Callable[..., Account], *, use_idp_sub: bool
+):
+    idp_sub = uuid4()
+    account = create_account(idp_sub=idp_sub)
+    subject = idp_sub if use_idp_sub else account.id
+    principal = get_principal_or_none(
+        dbsession, subject=subject, is_idp_subject=use_idp_sub
+    )
+    assert principal is not None
+    assert principal.id == account.id
+
+    # from now on, account is neither in session nor queried
+    dbsession.expunge(account)
+    statements: list[ORMExecuteState] = []
+    event.listen(dbsession, "do_orm_execute", statements.append)
+    principal = get_principal_or_none(
+        dbsession, subject=subject, is_idp_subject=use_idp_sub
+    )
+    event.remove(dbsession, "do_orm_execute", statements.append)
+    assert principal is not None
+    assert principal.id == account.id
+    assert principal.role == account.role
+    assert principal in dbsession
+    assert statements == []
+
+
+def test_update_account_invalidates_principal_cache(
+    dbsession: OrmSession, account: Account
+):
+    assert get_principal_or_none(dbsession, subject=account.id, is_idp_subject=False)
+    update_account(
+        dbsession,
+        account_id=account.id,
+        request=AccountUpdateSchema(role=RoleEnum.EDITOR),
+    )
+    dbsession.expunge(account)
+    principal = get_principal_or_none(
+        dbsession, subject=account.id, is_idp_subject=False
+    )
+    assert principal is not None
+    assert principal.role == RoleEnum.EDITOR
@@ -0,0 +1,52 @@
+import datetime
+from typing import Any
+
+import pytest
+from bson.json_util import LEGACY_JSON_OPTIONS, dumps
+
+from zimfarm_backend.db import zimfarm_dumps, zimfarm_loads
+
+DOCUMENTS: list[Any] = [
+    {"flags": {"name": "test", "verbose": True}, "resources": {"cpu": 3}},
+    {
+        "events": [
+            {"code": "started", "timestamp": datetime.datetime(2025, 1, 2, 3, 4, 5)},
+            {
+                "code": "succeeded",
+                "timestamp": datetime.datetime(2025, 1, 2, 5, 6, 7, 891000),
+            },
+        ],
+        "stdout": "Téléchargement terminé",
+        "progress": None,
+    },
+    [["requested", datetime.datetime(2024, 12, 31, 23, 59, 59)]],
+    "string",
+    1.5,
+]
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_zimfarm_dumps_matches_bson(document: Any):
+    """Documents are stored with the same bson extended JSON format as before"""
+    assert zimfarm_loads(zimfarm_dumps(document)) == zimfarm_loads(
+        dumps(document, json_options=LEGACY_JSON_OPTIONS)
+    )
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_zimfarm_loads_round_trip(document: Any):
+    assert zimfarm_loads(zimfarm_dumps(document)) == document
+    assert zimfarm_loads(zimfarm_dumps(document).encode()) == document
+
+
+def test_zimfarm_dumps_datetime_as_milliseconds():
+    assert (
+        zimfarm_dumps({"on": datetime.datetime(2025, 1, 1)})
+        == '{"on":{"$date":1735689600000}}'
+    )
+
+
+def test_zimfarm_loads_naive_datetime():
+    value = zimfarm_loads('{"on": {"$date": 1735689600000}}')["on"]
+    assert value == datetime.datetime(2025, 1, 1)
+    assert value.tzinfo is None
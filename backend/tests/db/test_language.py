@@ -6,7 +6,11 @@ from sqlalchemy.orm import Session as OrmSession
 from zimfarm_backend.common.schemas.models import RecipeConfigSchema
 from zimfarm_backend.common.schemas.orms import OfflinerDefinitionSchema, OfflinerSchema
 from zimfarm_backend.db.exceptions import RecordDoesNotExistError
-from zimfarm_backend.db.language import get_language_from_code, get_languages
+from zimfarm_backend.db.language import (
+    get_language_from_code,
+    get_languages,
+    get_languages_by_code,
+)
 from zimfarm_backend.db.models import Recipe
 from zimfarm_backend.db.recipe import create_recipe_full_schema, get_recipe
 
@@ -211,3 +215,11 @@ def test_get_language_from_code_invalid(code: str):
     """Test getting language information with invalid language codes."""
     with pytest.raises(RecordDoesNotExistError):
         get_language_from_code(code)
+
+
+def test_get_language_from_code_shared():
+    """Test that languages are resolved once and shared across lookups."""
+    language = get_language_from_code("fra")
+    assert get_language_from_code("FRA") is language
+    assert get_languages_by_code()["fra"] is language
+    assert language.model_dump() == {"code": "fra", "name": "French"}
@@ -1,6 +1,7 @@
 from unittest.mock import patch
 
 import pytest
+from pydantic import ValidationError
 from sqlalchemy.orm import Session as OrmSession
 
 from zimfarm_backend.common.schemas.orms import OfflinerSchema
@@ -8,12 +9,13 @@ from zimfarm_backend.db.exceptions import (
     RecordAlreadyExistsError,
     RecordDoesNotExistError,
 )
+from zimfarm_backend.db.models import Offliner
 from zimfarm_backend.db.offliner import (
-    _cache_map,  # pyright: ignore[reportPrivateUsage]
     create_offliner,
     get_all_offliners,
     get_offliner,
     get_offliner_by_id_or_none,
+    offliners_cache,
 )
 
 
@@ -67,83 +69,75 @@ def test_create_duplicate_offliner(dbsession: OrmSession, ted_offliner: Offliner
 
 
 class TestOfflinerCache:
-    def setup_method(self):
-        _cache_map.clear()
-
-    def teardown_method(self):
-        _cache_map.clear()
-
     def test_get_offliner_cache_miss(
         self, dbsession: OrmSession, ted_offliner: OfflinerSchema
     ):
-        """Test that get_offliner populates cache on first call (cache miss)."""
-        # Ensure cache is empty
-        assert ted_offliner.id not in _cache_map
-
-        # First call should hit database and populate cache
-        with patch(
-            "zimfarm_backend.db.offliner.get_offliner_by_id_or_none"
-        ) as mock_get_by_id:
-            mock_get_by_id.return_value = ted_offliner
-            result = get_offliner(dbsession, ted_offliner.id)
+        """Test that get_offliner loads the cache on first call (cache miss)."""
+        offliners_cache.invalidate()
+        assert offliners_cache.snapshot.version is None
+
+        result = get_offliner(dbsession, ted_offliner.id)
 
-            mock_get_by_id.assert_called_once_with(dbsession, ted_offliner.id)
-            assert result.id == ted_offliner.id
-            assert ted_offliner.id in _cache_map
-            assert _cache_map[ted_offliner.id] == ted_offliner
+        assert result == ted_offliner
+        assert offliners_cache.snapshot.version is not None
+        assert offliners_cache.snapshot.offliners[ted_offliner.id] is result
 
     def test_get_offliner_cache_hit(
         self, dbsession: OrmSession, ted_offliner: OfflinerSchema
     ):
         """Test that get_offliner uses cache on subsequent calls (cache hit)."""
-        # Pre-populate cache
-        _cache_map[ted_offliner.id] = ted_offliner
+        cached = get_offliner(dbsession, ted_offliner.id)
 
-        # Call should use cache, not database
-        with patch(
-            "zimfarm_backend.db.offliner.get_offliner_by_id_or_none"
-        ) as mock_get_by_id:
+        with patch("zimfarm_backend.db.offliner.get_table_version") as mock_version:
             result = get_offliner(dbsession, ted_offliner.id)
 
-            mock_get_by_id.assert_not_called()
-            assert result.id == ted_offliner.id
-            assert result == ted_offliner
+            mock_version.assert_not_called()
+            assert result is cached
+
+    def test_get_offliner_version_changed(
+        self, dbsession: OrmSession, ted_offliner: OfflinerSchema
+    ):
+        """Test that cache is reloaded when offliners changed in another process."""
+        assert get_all_offliners(dbsession) == [ted_offliner]
+        # simulate a change not invalidating the cache, once it is due for a check
+        dbsession.add(
+            Offliner(
+                id="youtube",
+                base_model="DashModel",
+                docker_image_name="openzim/youtube",
+                command_name="youtube2zim",
+                ci_secret_hash=None,
+            )
+        )
+        dbsession.flush()
+        offliners_cache.checked_on = None
+
+        assert {offliner.id for offliner in get_all_offliners(dbsession)} == {
+            ted_offliner.id,
+            "youtube",
+        }
+
+    def test_create_offliner_invalidates_cache(
+        self, dbsession: OrmSession, ted_offliner: OfflinerSchema
+    ):
+        """Test that creating an offliner makes it available right away."""
+        assert get_all_offliners(dbsession) == [ted_offliner]
+        create_offliner(
+            dbsession, "youtube", "DashModel", "openzim/youtube", "youtube2zim"
+        )
+        assert get_offliner(dbsession, "youtube").id == "youtube"
 
-    def test_get_all_offliners_populates_cache(
+    def test_get_offliner_immutable(
         self, dbsession: OrmSession, ted_offliner: OfflinerSchema
     ):
-        """Test that get_all_offliners populates the cache."""
-        # Ensure cache is empty
-        assert ted_offliner.id not in _cache_map
-
-        # Call get_all_offliners
-        with patch("zimfarm_backend.db.offliner.Session.scalars") as mock_scalars:
-            # Mock the database query to return our test offliner
-            mock_offliner = type(
-                "MockOffliner",
-                (),
-                {
-                    "id": ted_offliner.id,
-                    "base_model": ted_offliner.base_model,
-                    "docker_image_name": ted_offliner.docker_image_name,
-                    "command_name": ted_offliner.command_name,
-                    "ci_secret_hash": ted_offliner.ci_secret_hash,
-                },
-            )()
-            mock_scalars.return_value.all.return_value = [mock_offliner]
-
-            result = get_all_offliners(dbsession)
-
-            assert len(result) == 1
-            assert result[0].id == ted_offliner.id
-            assert ted_offliner.id in _cache_map
-            assert _cache_map[ted_offliner.id].id == ted_offliner.id
+        """Test that cached offliners cannot be modified by callers."""
+        offliner = get_offliner(dbsession, ted_offliner.id)
+        with pytest.raises(ValidationError):
+            offliner.command_name = "other"
 
     def test_get_offliner_missing_not_cached(self, dbsession: OrmSession):
         """Test that missing offliners are not cached."""
-        assert len(_cache_map) == 0
-
         with pytest.raises(RecordDoesNotExistError):
             get_offliner(dbsession, "non_existent")
 
-        assert len(_cache_map) == 0
+        assert "non_existent" not in offliners_cache.snapshot.offliners
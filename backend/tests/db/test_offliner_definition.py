@@ -321,3 +321,22 @@ def test_update_offliner_flags(
         name_mappings=name_mappings,
     )
     assert updated_data == expected_data
+
+
+def test_update_offliner_definition_invalidates_cache(
+    dbsession: OrmSession,
+    mwoffliner_flags: OfflinerSpecSchema,
+    mwoffliner_definition: OfflinerDefinitionSchema,
+    mwoffliner: OfflinerSchema,
+):
+    cached = get_offliner_definition_by_id(dbsession, mwoffliner_definition.id)
+    assert cached.schema_.std_output != "changedDirectory"
+    update_offliner_definition(
+        dbsession,
+        mwoffliner.id,
+        mwoffliner_definition.version,
+        mwoffliner_flags.model_copy(update={"std_output": "changedDirectory"}),
+    )
+    updated = get_offliner_definition_by_id(dbsession, mwoffliner_definition.id)
+    assert updated is not cached
+    assert updated.schema_.std_output == "changedDirectory"
@@ -7,7 +7,7 @@ from uuid import uuid4
 import pytest
 from _pytest.raises import RaisesExc
 from faker import Faker
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session as OrmSession
 
 from zimfarm_backend.common.enums import (
@@ -25,7 +25,7 @@ from zimfarm_backend.common.schemas.orms import (
     OfflinerDefinitionSchema,
     OfflinerSchema,
 )
-from zimfarm_backend.db import count_from_stmt
+from zimfarm_backend.db import count_from_stmt, get_table_version
 from zimfarm_backend.db.exceptions import (
     RecordAlreadyExistsError,
     RecordDoesNotExistError,
@@ -335,6 +335,32 @@ def test_get_recipes(
         assert result_recipe.most_recent_task is not None
 
 
+def test_get_recipes_ranked_by_similarity(
+    dbsession: OrmSession,
+    create_recipe: Callable[..., Recipe],
+):
+    """Test that recipes sharing most similarity data come first"""
+    for name, similarity_data in [
+        ("a_one_shared", ["foo", "other"]),
+        ("b_none_shared", ["other"]),
+        ("c_all_shared", ["foo", "bar", "baz"]),
+        ("d_two_shared", ["bar", "baz"]),
+    ]:
+        recipe = create_recipe(name=name)
+        recipe.similarity_data = similarity_data
+        dbsession.add(recipe)
+    dbsession.flush()
+
+    results = get_recipes(
+        dbsession, skip=0, limit=2, similarity_data=["foo", "bar", "baz"]
+    )
+    assert results.nb_records == 3
+    assert [recipe.name for recipe in results.recipes] == [
+        "c_all_shared",
+        "d_two_shared",
+    ]
+
+
 def test_update_recipe_duration_no_tasks(
     dbsession: OrmSession, create_recipe: Callable[..., Recipe]
 ):
@@ -713,3 +739,27 @@ def test_revert_recipe_all_fields(
     assert reverted_recipe.context == initial_context
     assert reverted_recipe.enabled == initial_enabled
     assert reverted_recipe.notification == initial_notification
+
+
+def test_get_table_version(
+    dbsession: OrmSession,
+    create_recipe: Callable[..., Recipe],
+):
+    """Test that recipes version is bumped on each write to the recipe table"""
+    recipe = create_recipe()
+    dbsession.flush()
+    (version,) = get_table_version(dbsession, Recipe)
+    assert version > 0
+
+    recipe.enabled = not recipe.enabled
+    dbsession.flush()
+    assert get_table_version(dbsession, Recipe) == (version + 1,)
+
+    # statements which did not change any row leave the version alone
+    dbsession.execute(
+        update(Recipe).where(Recipe.name == "does-not-exist").values(enabled=False)
+    )
+    assert get_table_version(dbsession, Recipe) == (version + 1,)
+
+    # frequently written tables are not versioned this way
+    assert get_table_version(dbsession, Task) == (0,)
@@ -601,6 +601,8 @@ def test_get_requested_tasks(
         assert (
             task.worker_name == requested_task.worker.name  # pyright: ignore[reportOptionalMemberAccess]
         )
+        assert task.config.image is not None
+        assert task.config.image.model_dump() == requested_task.config["image"]
 
 
 def test_get_requested_task_by_id_or_none(
@@ -1461,6 +1463,81 @@ def test_find_requested_task_first_cannot_run_alternative_by_duration(
         assert found_task is None
 
 
+def test_find_requested_task_first_cannot_run_best_packing(
+    dbsession: OrmSession,
+    create_worker: Callable[..., Worker],
+    create_account: Callable[..., Account],
+    create_recipe_config: Callable[..., RecipeConfigSchema],
+    create_task: Callable[..., Task],
+    create_requested_task: Callable[..., RequestedTask],
+    mwoffliner: OfflinerSchema,
+    mwoffliner_definition: OfflinerDefinitionSchema,
+):
+    """Test that alternative tasks best filling the worker are preferred"""
+    worker = create_worker(
+        account=create_account(),
+        name="test_worker",
+        cpu=4,
+        memory=2000,
+        disk=10000,
+        offliners=["mwoffliner"],
+    )
+
+    create_task(
+        worker=worker,
+        recipe_name="testrecipe_1",
+        status=TaskStatus.started,
+        requested_task=create_requested_task(
+            recipe_name="testrecipe_1",
+            recipe_config=create_recipe_config(cpu=2, memory=1000, disk=6000),
+        ),
+    )
+
+    def add_requested_task(
+        name: str, priority: int, cpu: int, memory: int, disk: int
+    ) -> RequestedTask:
+        requested_task = RequestedTask(
+            status="requested",
+            timestamp=[("requested", getnow())],
+            events=[{"code": "requested", "timestamp": getnow()}],
+            priority=priority,
+            config=expanded_config(
+                create_recipe_config(cpu=cpu, memory=memory, disk=disk),
+                mwoffliner,
+                mwoffliner_definition,
+            ).model_dump(mode="json", context={"show_secrets": True}),
+            upload={},
+            notification={},
+            updated_at=getnow(),
+            original_recipe_name=name,
+        )
+        requested_task.requested_by = worker.account
+        requested_task.offliner_definition_id = mwoffliner_definition.id
+        requested_task.worker = worker
+        dbsession.add(requested_task)
+        return requested_task
+
+    # waits for running task to complete
+    add_requested_task("high_priority_recipe", 10, cpu=3, memory=1000, disk=4000)
+    # fits but would leave resources no other task could use
+    add_requested_task("first_fit_recipe", 5, cpu=1, memory=800, disk=1000)
+    # fit together and fill the worker
+    packed_task = add_requested_task("packed_recipe", 4, cpu=1, memory=500, disk=2000)
+    add_requested_task("other_packed_recipe", 3, cpu=1, memory=500, disk=2000)
+    dbsession.flush()
+
+    found_task = find_requested_task_for_worker(
+        session=dbsession,
+        worker=create_worker_schema(worker),
+        avail_cpu=2,
+        avail_memory=1000,
+        avail_disk=4000,
+    ).requested_task
+
+    assert found_task is not None
+    assert found_task.id == packed_task.id
+
+
 def test_check_worker_unavailable_reason_with_running_tasks(
     dbsession: OrmSession, worker: Worker, create_task: Callable[..., Task]
 ):
@@ -1,4 +1,6 @@
+import datetime
 from collections.abc import Callable
+from typing import Literal
 from uuid import UUID
 
 import pytest
@@ -8,20 +10,30 @@ from sqlalchemy.orm import Session as OrmSession
 from zimfarm_backend.common import getnow
 from zimfarm_backend.common.enums import TaskStatus
 from zimfarm_backend.common.schemas.models import FileCreateUpdateSchema
+from zimfarm_backend.db import encode_cursor
 from zimfarm_backend.db.exceptions import (
     RecordAlreadyExistsError,
     RecordDoesNotExistError,
 )
-from zimfarm_backend.db.models import File, RequestedTask, Task, Worker
+from zimfarm_backend.db.models import (
+    ArchivedTask,
+    File,
+    Recipe,
+    RequestedTask,
+    Task,
+    Worker,
+)
 from zimfarm_backend.db.requested_task import (
     create_requested_task_full_schema,  # pyright: ignore[reportPrivateUsage]
 )
 from zimfarm_backend.db.tasks import (
+    archive_tasks,
     create_or_update_task_file,
     create_task,
     get_task_by_id,
     get_task_by_id_or_none,
     get_tasks,
+    get_tasks_version,
 )
 
 
@@ -50,6 +62,89 @@ def test_get_task_by_id_not_found(dbsession: OrmSession):
         get_task_by_id(dbsession, UUID(int=0))
 
 
+def test_archive_tasks(
+    dbsession: OrmSession,
+    create_task: Callable[..., Task],
+):
+    """Test that only old complete tasks are moved to the archive"""
+    now = getnow()
+    old_task = create_task(status=TaskStatus.succeeded)
+    old_task.updated_at = now - datetime.timedelta(days=60)
+    old_running_task = create_task(status=TaskStatus.started)
+    old_running_task.updated_at = now - datetime.timedelta(days=60)
+    create_task(status=TaskStatus.failed)
+    dbsession.flush()
+    old_task_id = old_task.id
+
+    assert archive_tasks(
+        dbsession, updated_before=now - datetime.timedelta(days=30), limit=10
+    ) == [old_task_id]
+
+    assert dbsession.get(Task, old_task_id) is None
+    assert dbsession.scalars(select(ArchivedTask.id)).all() == [old_task_id]
+    assert dbsession.scalars(select(Task.id)).all() != []
+
+
+def test_archive_tasks_keeps_most_recent_task(
+    dbsession: OrmSession,
+    create_recipe: Callable[..., Recipe],
+    create_task: Callable[..., Task],
+):
+    """Test that the most recent task of a recipe stays in the task table"""
+    recipe = create_recipe()
+    task = create_task(recipe_name=recipe.name, status=TaskStatus.succeeded)
+    task.updated_at = getnow() - datetime.timedelta(days=60)
+    recipe.most_recent_task = task
+    dbsession.flush()
+
+    assert archive_tasks(dbsession, updated_before=getnow(), limit=10) == []
+
+
+def test_get_tasks_version(
+    dbsession: OrmSession,
+    create_task: Callable[..., Task],
+):
+    """Test that tasks version changes when a task is created, updated or deleted"""
+    task = create_task()
+    dbsession.flush()
+    version = get_tasks_version(dbsession)
+    assert version[0] == 1
+
+    task.updated_at = getnow()
+    dbsession.flush()
+    assert get_tasks_version(dbsession) != version
+
+    dbsession.delete(task)
+    dbsession.flush()
+    assert get_tasks_version(dbsession) == (0, None)
+
+
+def test_get_task_by_id_archived(
+    dbsession: OrmSession,
+    create_task: Callable[..., Task],
+):
+    """Test that archived tasks are read from the archive"""
+    task = create_task(status=TaskStatus.succeeded)
+    create_or_update_task_file(
+        dbsession,
+        FileCreateUpdateSchema(
+            task_id=task.id,
+            name="test.zim",
+            status="uploaded",
+            size=1024,
+            uploaded_timestamp=getnow(),
+        ),
+    )
+    dbsession.flush()
+    dbsession.expire(task)
+    expected = get_task_by_id(dbsession, task.id)
+
+    assert archive_tasks(dbsession, updated_before=getnow(), limit=10) == [expected.id]
+    dbsession.expire_all()
+
+    assert get_task_by_id(dbsession, expected.id) == expected
+
+
 @pytest.mark.parametrize(
     "skip,limit,status,recipe_name,offliner, expected_nb_records",
     [
@@ -112,6 +207,113 @@ def test_get_tasks(
     assert len(result.tasks) <= limit
 
 
+def test_get_tasks_of_recipe_lists_archived_tasks(
+    dbsession: OrmSession,
+    create_task: Callable[..., Task],
+):
+    """Test that history of a recipe goes on with its archived tasks"""
+    task_ids = [
+        create_task(recipe_name="recipe", status=TaskStatus.succeeded).id
+        for _ in range(3)
+    ]
+    archived_ids = archive_tasks(dbsession, updated_before=getnow(), limit=2)
+    dbsession.expire_all()
+    assert len(archived_ids) == 2
+    (hot_id,) = set(task_ids) - set(archived_ids)
+
+    first = get_tasks(dbsession, skip=0, limit=2, recipe_identifier="recipe")
+    assert first.nb_records == 3
+    assert first.tasks[0].id == hot_id
+    assert first.tasks[0].recipe_name == "recipe"
+    assert first.tasks[1].recipe_name == "recipe"
+    second = get_tasks(dbsession, skip=2, limit=2, recipe_identifier="recipe")
+    assert second.nb_records == 3
+    assert {first.tasks[1].id, second.tasks[0].id} == set(archived_ids)
+    assert len(second.tasks) == 1
+
+    # lists not filtered on a recipe don't include archived tasks
+    assert get_tasks(dbsession, skip=0, limit=10).nb_records == 1
+    # archived tasks are filtered as well
+    assert (
+        get_tasks(
+            dbsession,
+            skip=0,
+            limit=10,
+            recipe_identifier="recipe",
+            status=[TaskStatus.failed],
+        ).nb_records
+        == 0
+    )
+
+
+@pytest.mark.parametrize("sort_criteria", ["updated_at", "done", "doing"])
+def test_get_tasks_cursor_pagination(
+    dbsession: OrmSession,
+    create_task: Callable[..., Task],
+    sort_criteria: Literal["updated_at", "done", "doing"],
+):
+    """Test that following cursors lists same tasks as a single page"""
+    for index in range(5):
+        create_task(recipe_name=f"recipe_{index}", status=TaskStatus.succeeded)
+
+    expected = get_tasks(dbsession, skip=0, limit=5, sort_criteria=sort_criteria)
+    assert expected.next_cursor is not None
+
+    task_ids: list[UUID] = []
+    cursor = None
+    while True:
+        page = get_tasks(
+            dbsession, skip=0, limit=2, sort_criteria=sort_criteria, cursor=cursor
+        )
+        if cursor is None:
+            assert page.nb_records == 5
+        else:
+            # following pages are not counted again
+            assert page.estimated_count
+        task_ids.extend(task.id for task in page.tasks)
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+
+    assert task_ids == [task.id for task in expected.tasks]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-a-cursor",
+        encode_cursor([None, "not-an-id"]),
+        encode_cursor([1, 2, 3]),
+        encode_cursor([1, 2]),
+    ],
+)
+def test_get_tasks_invalid_cursor(dbsession: OrmSession, cursor: str):
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        get_tasks(dbsession, skip=0, limit=2, sort_criteria="done", cursor=cursor)
+
+
+def test_get_tasks_estimated_count(
+    dbsession: OrmSession, create_task: Callable[..., Task]
+):
+    for index in range(3):
+        create_task(recipe_name=f"recipe_{index}", status=TaskStatus.succeeded)
+
+    result = get_tasks(dbsession, skip=0, limit=2, estimate_count=True)
+    assert result.estimated_count is True
+    # table is never analyzed in tests, hence falling back to an exact count
+    assert result.nb_records == 3
+
+    # estimate is of the whole table, not available on filtered lists
+    result = get_tasks(
+        dbsession,
+        skip=0,
+        limit=2,
+        status=[TaskStatus.succeeded],
+        estimate_count=True,
+    )
+    assert result.estimated_count is False
+
+
 def test_create_task(
     dbsession: OrmSession,
     worker: Worker,
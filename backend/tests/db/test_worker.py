@@ -15,15 +15,25 @@ from zimfarm_backend.db import worker as worker_module
 from zimfarm_backend.db.exceptions import RecordDoesNotExistError
 from zimfarm_backend.db.models import Account, Worker
 from zimfarm_backend.db.worker import (
+    LastSeenBuffer,
     check_in_worker,
     create_worker,
+    create_worker_schema,
     get_worker,
     get_worker_or_none,
     get_workers,
+    record_worker_poll,
     update_worker,
 )
 
 
+@pytest.fixture
+def last_seen_buffer(monkeypatch: MonkeyPatch) -> LastSeenBuffer:
+    buffer = LastSeenBuffer()
+    monkeypatch.setattr(worker_module, "last_seen_buffer", buffer)
+    return buffer
+
+
 def test_get_worker_or_none(dbsession: OrmSession):
     """Test that get_worker_or_none returns None if the worker does not exist"""
     worker = get_worker_or_none(dbsession, worker_name="nonexistent")
@@ -77,6 +87,25 @@ def test_get_workers_pagination(
     assert len(result.workers) == limit
 
 
+def test_get_workers_cursor_pagination(
+    dbsession: OrmSession,
+    create_worker: Callable[..., Worker],
+    create_account: Callable[..., Account],
+):
+    for i in range(5):
+        create_worker(account=create_account(), name=f"worker-{i}")
+
+    first = get_workers(dbsession, skip=0, limit=3)
+    assert first.next_cursor is not None
+    second = get_workers(dbsession, skip=0, limit=3, cursor=first.next_cursor)
+    assert first.nb_records == 5
+    assert second.estimated_count
+    assert second.next_cursor is None
+    assert [worker.name for worker in first.workers + second.workers] == [
+        f"worker-{i}" for i in range(5)
+    ]
+
+
 @pytest.mark.parametrize("hide_offlines,nb_records", [(True, 20), (False, 30)])
 def test_get_workers_hide_offlines(
     dbsession: OrmSession,
@@ -402,3 +431,90 @@ def test_create_worker_duplicate_ssh_key(
             worker_name="anotherworker",
             ssh_key=ssh_key,
         )
+
+
+def test_record_worker_poll_unchanged(
+    dbsession: OrmSession, worker: Worker, last_seen_buffer: LastSeenBuffer
+):
+    """Polling without any change only buffers last seen"""
+    worker.last_seen = getnow() - datetime.timedelta(minutes=5)
+    dbsession.flush()
+    original_last_seen = worker.last_seen
+    assert original_last_seen is not None
+
+    assert (
+        record_worker_poll(
+            dbsession,
+            worker=worker,
+            avail_cpu=worker.available_cpu,
+            total_cpu=worker.total_cpu,
+        )
+        is False
+    )
+    assert worker not in dbsession.dirty
+    assert worker.last_seen == original_last_seen
+    assert worker.name in last_seen_buffer.pending
+    # buffered value is used to tell whether worker is online
+    schema = create_worker_schema(worker)
+    assert schema.last_seen is not None
+    assert schema.last_seen > original_last_seen
+
+    assert last_seen_buffer.flush(dbsession) == 1
+    assert last_seen_buffer.pending == {}
+    dbsession.expire(worker)
+    assert worker.last_seen == schema.last_seen
+
+
+def test_record_worker_poll_changed(
+    dbsession: OrmSession, worker: Worker, last_seen_buffer: LastSeenBuffer
+):
+    """Polling with new resources writes them along with last seen"""
+    original_last_seen = worker.last_seen
+    assert original_last_seen is not None
+
+    assert (
+        record_worker_poll(dbsession, worker=worker, avail_cpu=worker.available_cpu + 1)
+        is True
+    )
+    dbsession.expire(worker)
+    assert worker.available_cpu == worker.total_cpu + 1
+    assert worker.last_seen is not None
+    assert worker.last_seen >= original_last_seen
+    assert last_seen_buffer.pending == {}
+
+
+def test_last_seen_flush_keeps_newer(
+    dbsession: OrmSession, worker: Worker, last_seen_buffer: LastSeenBuffer
+):
+    """A flush never overwrites a more recent last seen"""
+    now = getnow()
+    worker.last_seen = now
+    dbsession.flush()
+
+    last_seen_buffer.record(worker.name, now - datetime.timedelta(minutes=1))
+    assert last_seen_buffer.flush(dbsession) == 0
+    dbsession.expire(worker)
+    assert worker.last_seen == now
+
+
+def test_check_in_worker_unchanged(
+    dbsession: OrmSession, worker: Worker, last_seen_buffer: LastSeenBuffer
+):
+    """Checking in with same configuration does not update the worker row"""
+    assert (
+        check_in_worker(
+            session=dbsession,
+            worker_name=worker.name,
+            cpu=worker.total_cpu,
+            memory=worker.total_memory,
+            disk=worker.total_disk,
+            selfish=worker.selfish,
+            offliners=worker.offliners,
+            platforms=worker.platforms,
+            account_id=worker.account_id,
+            cordoned=worker.cordoned,
+        )
+        is False
+    )
+    assert worker not in dbsession.dirty
+    assert worker.name in last_seen_buffer.pending
@@ -5,7 +5,11 @@ from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session as OrmSession
 
 from zimfarm_backend.api.entrypoint import app
-from zimfarm_backend.db import gen_dbsession, gen_manual_dbsession
+from zimfarm_backend.db import (
+    gen_dbsession,
+    gen_manual_dbsession,
+    gen_readonly_dbsession,
+)
 
 
 @pytest.fixture
@@ -16,5 +20,6 @@ def client(dbsession: OrmSession) -> TestClient:
     # Replace the  database session with the test dbsession
     app.dependency_overrides[gen_dbsession] = test_dbsession
     app.dependency_overrides[gen_manual_dbsession] = test_dbsession
+    app.dependency_overrides[gen_readonly_dbsession] = test_dbsession
 
     return TestClient(app=app)
@@ -0,0 +1,14 @@
+from http import HTTPStatus
+
+import pytest
+from fastapi.testclient import TestClient
+
+from zimfarm_backend.api.live import broker
+
+
+def test_get_live_updates_too_many_subscribers(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(broker, "max_subscribers", 0)
+    response = client.get("/v2/live")
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
@@ -0,0 +1,36 @@
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+
+from zimfarm_backend.common.notifications import handle_mailgun_notification
+
+
+def test_get_metrics(client: TestClient):
+    response = client.get(
+        "/v2/status/oldest_task_older_than?status=started&threshold_secs=500"
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    response = client.get("/v2/metrics")
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-type"].startswith("text/plain")
+    # requests are labelled with their route template, with SQL statements counted
+    assert (
+        'zimfarm_http_request_db_statements_count{method="GET",'
+        'route="/v2/status/{monitor_name}"}'
+    ) in response.text
+    assert "zimfarm_db_pool_checkout_wait_seconds_count" in response.text
+
+
+def test_get_metrics_skipped_notifications(client: TestClient):
+    # mailgun is not configured in tests
+    handle_mailgun_notification({}, ["one@example.com", "two@example.com"])
+
+    response = client.get("/v2/metrics")
+    assert response.status_code == HTTPStatus.OK
+    assert (
+        'zimfarm_notifications_total{method="mailgun",result="skipped"}'
+    ) in response.text
+    assert (
+        'zimfarm_notifications_total{method="mailgun",result="failure"}'
+    ) not in response.text
@@ -80,6 +80,25 @@ def test_get_recipes(
     assert len(data["items"]) <= 5
 
 
+def test_get_recipes_not_modified(
+    client: TestClient,
+    create_recipe: Callable[..., Recipe],
+):
+    """Test that recipes list is only sent again once recipes changed"""
+    create_recipe()
+    response = client.get("/v2/recipes")
+    assert response.status_code == HTTPStatus.OK
+    etag = response.headers["ETag"]
+
+    response = client.get("/v2/recipes", headers={"If-None-Match": f'W/"x", {etag}'})
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    create_recipe(name="other_recipe")
+    response = client.get("/v2/recipes", headers={"If-None-Match": etag})
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["ETag"] != etag
+
+
 @pytest.mark.parametrize(
     "permission,expected_status_code",
     [
@@ -273,6 +273,31 @@ def test_get_requested_tasks_success(
     assert len(data["items"]) == 5
 
 
+def test_get_requested_tasks_not_modified(
+    client: TestClient,
+    access_token: str,
+    create_requested_task: Callable[..., RequestedTask],
+):
+    """Test that requested tasks list is only sent again once they changed"""
+    create_requested_task()
+    headers = {"Authorization": f"Bearer {access_token}"}
+    response = client.get("/v2/requested-tasks", headers=headers)
+    assert response.status_code == HTTPStatus.OK
+    etag = response.headers["ETag"]
+
+    response = client.get(
+        "/v2/requested-tasks", headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    create_requested_task(recipe_name="other_recipe")
+    response = client.get(
+        "/v2/requested-tasks", headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["ETag"] != etag
+
+
 def test_get_requested_tasks_for_worker_scheduler_disabled(
     client: TestClient,
     access_token: str,
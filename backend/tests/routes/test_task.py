@@ -65,6 +65,35 @@ def test_get_tasks(
             assert most_recent_task is None
 
 
+def test_get_tasks_not_modified(
+    client: TestClient,
+    access_token: str,
+    create_task: Callable[..., Task],
+):
+    """Test that tasks list is only sent again once tasks changed"""
+    create_task()
+    headers = {"Authorization": f"Bearer {access_token}"}
+    response = client.get("/v2/tasks", headers=headers)
+    assert response.status_code == HTTPStatus.OK
+    etag = response.headers["ETag"]
+
+    response = client.get("/v2/tasks", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    # other query parameters are another representation
+    response = client.get(
+        "/v2/tasks?limit=5", headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    create_task(recipe_name="other_recipe")
+    response = client.get("/v2/tasks", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["ETag"] != etag
+
+
 @pytest.mark.parametrize("hide_secrets", ["true", "false"])
 @patch("zimfarm_backend.common.upload.requests.get")
 def test_get_task_no_auth(
@@ -41,6 +41,32 @@ def test_get_active_workers_success(
     assert len(data["items"]) == 5
 
 
+def test_get_workers_not_modified(
+    client: TestClient,
+    access_token: str,
+    create_worker: Callable[..., Worker],
+    create_account: Callable[..., Account],
+):
+    """Test that workers list is only sent again once workers changed"""
+    create_worker()
+    headers = {"Authorization": f"Bearer {access_token}"}
+    response = client.get("/v2/workers", headers=headers)
+    assert response.status_code == HTTPStatus.OK
+    etag = response.headers["ETag"]
+
+    response = client.get("/v2/workers", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    # secrets are not shown to anonymous users
+    response = client.get("/v2/workers", headers={"If-None-Match": etag})
+    assert response.status_code == HTTPStatus.OK
+
+    create_worker(account=create_account(), name="other-worker")
+    response = client.get("/v2/workers", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["ETag"] != etag
+
+
 @patch("zimfarm_backend.api.routes.workers.logic.get_latest_worker_manager_version")
 @patch("zimfarm_backend.api.routes.workers.logic.GITHUB_TOKEN", "test_token")
 def test_check_in_worker_not_found(
@@ -333,6 +359,41 @@ def test_list_worker_keys(client: TestClient, account: Account, worker: Worker):
     }
 
 
+def test_list_worker_keys_not_modified(
+    client: TestClient, account: Account, worker: Worker
+):
+    """Test that workers' SSH keys are only sent again once keys changed"""
+    access_token = generate_access_token(
+        issue_time=getnow(),
+        account_id=str(account.id),
+    )
+    headers = {"Authorization": f"Bearer {access_token}"}
+    url = f"/v2/workers/{worker.name}/keys"
+    response = client.get(url, headers=headers)
+    assert response.status_code == HTTPStatus.OK
+    etag = response.headers["ETag"]
+
+    response = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    new_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_key = new_key.public_key().public_bytes(
+        encoding=serialization.Encoding.OpenSSH,
+        format=serialization.PublicFormat.OpenSSH,
+    )
+    response = client.post(
+        url,
+        headers=headers,
+        json={"key": public_key.decode(encoding="ascii") + " test@localhost"},
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    response = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json()["items"]) == 2
+    assert response.headers["ETag"] != etag
+
+
 def test_list_worker_keys_forbidden(
     client: TestClient, create_account: Callable[..., Account], worker: Worker
 ):
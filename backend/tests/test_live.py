@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from zimfarm_backend.api.live import RESET, LiveUpdatesBroker, TooManySubscribersError
+
+
+class IdleBroker(LiveUpdatesBroker):
+    """Broker not listening to database, payloads are published by tests"""
+
+    async def listen(self) -> None:
+        await asyncio.Event().wait()
+
+
+@pytest.mark.asyncio
+async def test_live_updates_fan_out():
+    broker = IdleBroker(max_subscribers=2, queue_size=10)
+    first, second = broker.subscribe(), broker.subscribe()
+    try:
+        with pytest.raises(TooManySubscribersError):
+            broker.subscribe()
+
+        broker.publish('{"type": "worker"}')
+        assert first.get_nowait() == '{"type": "worker"}'
+        assert second.get_nowait() == '{"type": "worker"}'
+
+        broker.unsubscribe(second)
+        broker.publish('{"type": "task"}')
+        assert first.get_nowait() == '{"type": "task"}'
+        assert second.empty()
+    finally:
+        await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_live_updates_lagging_subscriber_reset():
+    broker = IdleBroker(max_subscribers=2, queue_size=2)
+    slow, fast = broker.subscribe(), broker.subscribe()
+    try:
+        for index in range(3):
+            broker.publish(str(index))
+            assert fast.get_nowait() == str(index)
+
+        # backlog of slow subscriber is dropped in favor of a reset
+        assert slow.get_nowait() is RESET
+        assert slow.empty()
+    finally:
+        await broker.stop()
@@ -0,0 +1,89 @@
+import type { Config } from '@/config'
+import constants from '@/constants'
+import type { LiveUpdate, LiveUpdateHandler } from '@/types/live'
+import { defineStore } from 'pinia'
+import { inject, ref } from 'vue'
+
+// delay before opening a new stream once server refused or closed it
+const RECONNECT_DELAY = 60000
+
+export const useLiveStore = defineStore('live', () => {
+  const config = inject<Config>(constants.config)
+
+  if (!config) {
+    throw new Error('Config is not defined')
+  }
+
+  // views fall back to polling while stream is not connected
+  const connected = ref(false)
+
+  const handlers = new Set<LiveUpdateHandler>()
+  let source: EventSource | null = null
+  let reconnectTimeout: number | null = null
+  let wasConnected = false
+
+  const dispatch = (update: LiveUpdate) => {
+    handlers.forEach((handler) => handler(update))
+  }
+
+  const open = () => {
+    if (source || typeof EventSource === 'undefined') {
+      return
+    }
+    source = new EventSource(`${config.ZIMFARM_WEBAPI}/live`)
+    source.onopen = () => {
+      connected.value = true
+      // updates sent while we were disconnected are lost
+      if (wasConnected) {
+        dispatch({ type: 'reset' })
+      }
+      wasConnected = true
+    }
+    source.onmessage = (event: MessageEvent<string>) => {
+      try {
+        dispatch(JSON.parse(event.data) as LiveUpdate)
+      } catch (_error) {
+        console.error('Failed to parse live update', _error)
+      }
+    }
+    source.addEventListener('reset', () => dispatch({ type: 'reset' }))
+    source.onerror = () => {
+      connected.value = false
+      // browser retries on its own unless server refused the stream
+      if (source?.readyState === EventSource.CLOSED) {
+        close()
+        reconnectTimeout = window.setTimeout(open, RECONNECT_DELAY)
+      }
+    }
+  }
+
+  const close = () => {
+    if (reconnectTimeout) {
+      clearTimeout(reconnectTimeout)
+      reconnectTimeout = null
+    }
+    source?.close()
+    source = null
+    connected.value = false
+  }
+
+  // stream is opened with first subscriber and closed with last one
+  const subscribe = (handler: LiveUpdateHandler) => {
+    handlers.add(handler)
+    open()
+    return () => {
+      handlers.delete(handler)
+      if (handlers.size === 0) {
+        close()
+        wasConnected = false
+      }
+    }
+  }
+
+  return {
+    // State
+    connected,
+    // Actions
+    subscribe,
+  }
+})
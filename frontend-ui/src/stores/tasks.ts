@@ -1,6 +1,7 @@
 import { useAuthStore } from '@/stores/auth'
 import type { ListResponse, Paginator } from '@/types/base'
 import type { ErrorResponse } from '@/types/errors'
+import type { TaskLiveUpdate } from '@/types/live'
 import { type Task, type TaskLight } from '@/types/tasks'
 import { translateErrors } from '@/utils/errors'
 import { defineStore } from 'pinia'
@@ -96,6 +97,21 @@ export const useTasksStore = defineStore('tasks', () => {
     }
   }
 
+  // apply a status change in place, returns whether a loaded task was updated
+  const applyLiveUpdate = (update: TaskLiveUpdate) => {
+    let applied = false
+    tasks.value = tasks.value.map((item) => {
+      if (item.id !== update.id) return item
+      applied = true
+      return { ...item, status: update.status, updated_at: update.updated_at }
+    })
+    if (task.value && task.value.id === update.id) {
+      task.value = { ...task.value, status: update.status, updated_at: update.updated_at }
+      applied = true
+    }
+    return applied
+  }
+
   return {
     // State
     task,
@@ -108,5 +124,6 @@ export const useTasksStore = defineStore('tasks', () => {
     cancelTask,
     fetchTask,
     savePaginatorLimit,
+    applyLiveUpdate,
   }
 })
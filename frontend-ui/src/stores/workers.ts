@@ -1,6 +1,7 @@
 import { useAuthStore } from '@/stores/auth'
 import type { ListResponse, Paginator } from '@/types/base'
 import type { ErrorResponse } from '@/types/errors'
+import type { WorkerLiveUpdate } from '@/types/live'
 import type { TaskLight } from '@/types/tasks'
 import type {
   DockerImageVersion,
@@ -66,6 +67,17 @@ export const useWorkersStore = defineStore('workers', () => {
     }))
   }
 
+  // refresh last seen in place, returns whether a loaded worker was updated
+  const applyLiveUpdate = (update: WorkerLiveUpdate) => {
+    let applied = false
+    workers.value = workers.value.map((worker) => {
+      if (worker.name !== update.name) return worker
+      applied = true
+      return { ...worker, last_seen: update.last_seen, status: 'online' as const }
+    })
+    return applied
+  }
+
   const fetchWorkerMetrics = async (name: string) => {
     try {
       const service = await authStore.getApiService('workers')
@@ -158,6 +170,7 @@ export const useWorkersStore = defineStore('workers', () => {
     // Actions
     fetchWorkers,
     updateWorkerTasks,
+    applyLiveUpdate,
     savePaginatorLimit,
     fetchWorkerMetrics,
     createWorker,
@@ -28,15 +28,17 @@ export interface ConfigWithOnlyOffliner {
   offliner: string
 }
 
-export interface ConfigWithOnlyOfflinerAndResources
-  extends ConfigWithOnlyResources,
-    ConfigWithOnlyOffliner {}
-
 export interface DockerImage {
   name: string
   tag: string
 }
 
+export interface ConfigWithOnlyOfflinerAndResources
+  extends ConfigWithOnlyResources,
+    ConfigWithOnlyOffliner {
+  image?: DockerImage | null
+}
+
 export interface WorkerRecipeDuration {
   value: number
   on: string
@@ -0,0 +1,35 @@
+export interface TaskLiveUpdate {
+  type: 'task'
+  id: string
+  event: string
+  status: string
+  recipe_name: string
+  updated_at: string
+}
+
+export interface WorkerLiveUpdate {
+  type: 'worker'
+  name: string
+  last_seen: string
+}
+
+export interface RequestedTaskLiveUpdate {
+  type: 'requested_task'
+  id: string
+  action: 'created' | 'updated' | 'deleted'
+  recipe_name?: string
+  priority?: number
+}
+
+// sent when updates might have been missed, data has to be reloaded
+export interface ResetLiveUpdate {
+  type: 'reset'
+}
+
+export type LiveUpdate =
+  | TaskLiveUpdate
+  | WorkerLiveUpdate
+  | RequestedTaskLiveUpdate
+  | ResetLiveUpdate
+
+export type LiveUpdateHandler = (update: LiveUpdate) => void
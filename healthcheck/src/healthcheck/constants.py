@@ -47,3 +47,27 @@ CMS_ENABLED = parse_bool(getenv("CMS_ENABLED", default="false"))
 CMS_PENDING_THRESHOLD = datetime.timedelta(
     seconds=parse_timespan(getenv("CMS_PENDING_THRESHOLD", default="24h"))
 )
+
+# probes run in the background on these intervals and the page is served from their
+# last results. Each probe interval defaults to PROBES_INTERVAL
+PROBES_INTERVAL = getenv("PROBES_INTERVAL", default="1m")
+AUTH_PROBE_INTERVAL = parse_timespan(
+    getenv("AUTH_PROBE_INTERVAL", default=PROBES_INTERVAL)
+)
+DATABASE_PROBE_INTERVAL = parse_timespan(
+    getenv("DATABASE_PROBE_INTERVAL", default=PROBES_INTERVAL)
+)
+FRONTEND_PROBE_INTERVAL = parse_timespan(
+    getenv("FRONTEND_PROBE_INTERVAL", default=PROBES_INTERVAL)
+)
+WORKERS_PROBE_INTERVAL = parse_timespan(
+    getenv("WORKERS_PROBE_INTERVAL", default=PROBES_INTERVAL)
+)
+TASKS_PROBE_INTERVAL = parse_timespan(
+    getenv("TASKS_PROBE_INTERVAL", default=PROBES_INTERVAL)
+)
+CMS_PROBE_INTERVAL = parse_timespan(
+    getenv("CMS_PROBE_INTERVAL", default=PROBES_INTERVAL)
+)
+# a result older than this many intervals is considered failed (probe stuck)
+PROBES_STALE_FACTOR = int(getenv("PROBES_STALE_FACTOR", default="3"))
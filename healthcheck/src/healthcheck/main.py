@@ -1,3 +1,5 @@
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import APIRouter, FastAPI
@@ -5,12 +7,21 @@ from fastapi.responses import RedirectResponse
 from fastapi.staticfiles import StaticFiles
 
 from healthcheck.constants import DEBUG
+from healthcheck.probes import scheduler
 from healthcheck.router import router
 
 
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncGenerator[None]:
+    scheduler.start()
+    yield
+    await scheduler.stop()
+
+
 def create_app(*, debug: bool = True):
     app = FastAPI(
         debug=debug,
+        lifespan=lifespan,
         docs_url="/docs",
         title="Zimfarm Healthcheck Service",
         version="1.0.0",
@@ -0,0 +1,167 @@
+import asyncio
+import datetime
+import time
+from collections.abc import Awaitable, Callable
+from http import HTTPStatus
+from typing import Any
+
+from healthcheck import getnow
+from healthcheck.constants import (
+    AUTH_PROBE_INTERVAL,
+    CMS_ENABLED,
+    CMS_PROBE_INTERVAL,
+    DATABASE_PROBE_INTERVAL,
+    FRONTEND_PROBE_INTERVAL,
+    PROBES_STALE_FACTOR,
+    TASKS_PROBE_INTERVAL,
+    WORKERS_PROBE_INTERVAL,
+)
+from healthcheck.status import Result
+from healthcheck.status import status_logger as logger
+from healthcheck.status.auth import authenticate
+from healthcheck.status.cms import (
+    check_cms_availability,
+    check_cms_pending_notifications,
+)
+from healthcheck.status.database import check_database_connection
+from healthcheck.status.frontend import check_frontend
+from healthcheck.status.tasks import check_log_and_artifacts_upload_status
+from healthcheck.status.workers import get_workers_status
+
+
+class Probe:
+    """A status check run in the background, keeping its last result"""
+
+    def __init__(
+        self,
+        name: str,
+        check: Callable[[], Awaitable[Result[Any]]],
+        interval: float,
+        *,
+        optional: bool = False,
+    ):
+        self.name = name
+        self.check = check
+        self.interval = interval
+        # failure of an optional probe doesn't affect global status
+        self.optional = optional
+        self.result: Result[Any] | None = None
+        self.checked_on: datetime.datetime | None = None
+        self.duration: float | None = None
+        self.ready = asyncio.Event()
+
+    async def run(self):
+        started_on = time.monotonic()
+        try:
+            result = await self.check()
+        except Exception:
+            logger.exception(
+                "Unexpected error while running probe", extra={"checkname": self.name}
+            )
+            result = Result[Any](
+                success=False, status_code=HTTPStatus.INTERNAL_SERVER_ERROR
+            )
+        self.duration = time.monotonic() - started_on
+        self.checked_on = getnow()
+        self.result = result
+        self.ready.set()
+
+    async def loop(self):
+        while True:
+            await self.run()
+            await asyncio.sleep(self.interval)
+
+    @property
+    def is_stale(self) -> bool:
+        return self.checked_on is None or (
+            getnow() - self.checked_on
+        ).total_seconds() > self.interval * PROBES_STALE_FACTOR + (self.duration or 0)
+
+    async def get_result(self) -> Result[Any]:
+        """last result, waiting for first one if probe never completed"""
+        await self.ready.wait()
+        result = self.result
+        if result is None:
+            raise ValueError(f"Probe {self.name} has no result")
+        if self.is_stale:
+            logger.warning(
+                f"Last result from {self.checked_on} is stale",
+                extra={"checkname": self.name},
+            )
+            result = result.model_copy(
+                update={
+                    "success": False,
+                    "status_code": HTTPStatus.SERVICE_UNAVAILABLE,
+                }
+            )
+        if self.optional and not result.success:
+            result = result.model_copy(update={"success": True})
+        return result
+
+    def to_dict(self, result: Result[Any]) -> dict[str, Any]:
+        return {
+            "success": result.success,
+            "status_code": result.status_code,
+            "checked_on": self.checked_on.isoformat() if self.checked_on else None,
+            "duration": self.duration,
+            "interval": self.interval,
+            "data": result.model_dump(mode="json")["data"],
+        }
+
+
+class ProbesScheduler:
+    """Runs all probes concurrently, each on its own interval
+
+    Pages are served from last known results so that their rendering doesn't
+    query the backend and remains as fast as it gets."""
+
+    def __init__(self, probes: list[Probe]):
+        self.probes = {probe.name: probe for probe in probes}
+        self.tasks: list[asyncio.Task[None]] = []
+
+    def start(self):
+        self.tasks = [
+            asyncio.create_task(probe.loop(), name=f"probe-{name}")
+            for name, probe in self.probes.items()
+        ]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    async def get_results(self) -> dict[str, Result[Any]]:
+        names = list(self.probes.keys())
+        results = await asyncio.gather(
+            *[self.probes[name].get_result() for name in names]
+        )
+        return dict(zip(names, results, strict=True))
+
+
+scheduler = ProbesScheduler(
+    [
+        Probe("auth", authenticate, AUTH_PROBE_INTERVAL),
+        Probe("database", check_database_connection, DATABASE_PROBE_INTERVAL),
+        Probe("frontend", check_frontend, FRONTEND_PROBE_INTERVAL),
+        Probe("workers", get_workers_status, WORKERS_PROBE_INTERVAL),
+        Probe(
+            "logs_and_artifacts",
+            check_log_and_artifacts_upload_status,
+            TASKS_PROBE_INTERVAL,
+        ),
+        # If CMS checks fail and CMS is disabled, consider them as successful
+        Probe(
+            "cms_availability",
+            check_cms_availability,
+            CMS_PROBE_INTERVAL,
+            optional=not CMS_ENABLED,
+        ),
+        Probe(
+            "cms_pending_notifications",
+            check_cms_pending_notifications,
+            CMS_PROBE_INTERVAL,
+            optional=not CMS_ENABLED,
+        ),
+    ]
+)
@@ -1,24 +1,13 @@
 import os
-from asyncio import gather
 from collections.abc import Callable
 from http import HTTPStatus
 
 from fastapi import APIRouter, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 
 from healthcheck.constants import CMS_ENABLED
-from healthcheck.status.auth import authenticate
-from healthcheck.status.cms import (
-    check_cms_availability,
-    check_cms_pending_notifications,
-)
-from healthcheck.status.database import (
-    check_database_connection,
-)
-from healthcheck.status.frontend import check_frontend
-from healthcheck.status.tasks import check_log_and_artifacts_upload_status
-from healthcheck.status.workers import get_workers_status
+from healthcheck.probes import scheduler
 
 router = APIRouter(prefix="/healthcheck", tags=["healthcheck"])
 
@@ -45,58 +34,40 @@ for name, func in filters:
 
 @router.get("")
 async def healthcheck(request: Request) -> HTMLResponse:
-    (
-        auth_check,
-        db_check,
-        frontend_check,
-        workers_check,
-        logs_and_artifacts_upload_check,
-        cms_availability_check,
-        cms_pending_notifications_check,
-    ) = await gather(
-        authenticate(),
-        check_database_connection(),
-        check_frontend(),
-        get_workers_status(),
-        check_log_and_artifacts_upload_status(),
-        check_cms_availability(),
-        check_cms_pending_notifications(),
-    )
-    # If CMS checks fail and CMS is disabled, consider them as successful
-    if not (CMS_ENABLED or cms_availability_check.success):
-        cms_availability_check = cms_availability_check.model_copy(
-            update={"success": True}
-        )
-    if not (CMS_ENABLED or cms_pending_notifications_check.success):
-        cms_pending_notifications_check = cms_pending_notifications_check.model_copy(
-            update={"success": True}
-        )
-
-    global_status = all(
-        [
-            auth_check.success,
-            db_check.success,
-            frontend_check.success,
-            workers_check.success,
-            logs_and_artifacts_upload_check.success,
-            cms_availability_check.success,
-            cms_pending_notifications_check.success,
-        ]
-    )
+    results = await scheduler.get_results()
+    global_status = all(result.success for result in results.values())
+    checked_on = [
+        probe.checked_on
+        for probe in scheduler.probes.values()
+        if probe.checked_on is not None
+    ]
 
     return templates.TemplateResponse(
         "healthcheck.html",
         {
             "request": request,
             "global_status": global_status,
-            "auth": auth_check,
-            "database": db_check,
-            "frontend": frontend_check,
-            "workers": workers_check,
-            "logs_and_artifacts": logs_and_artifacts_upload_check,
-            "cms_availability": cms_availability_check,
-            "cms_pending_notifications": cms_pending_notifications_check,
+            **results,
             "cms_enabled": CMS_ENABLED,
+            "checked_on": min(checked_on) if checked_on else None,
+        },
+        status_code=HTTPStatus.OK if global_status else HTTPStatus.SERVICE_UNAVAILABLE,
+    )
+
+
+@router.get("/status")
+async def healthcheck_status() -> JSONResponse:
+    """Last known results of all probes, as JSON"""
+    results = await scheduler.get_results()
+    global_status = all(result.success for result in results.values())
+
+    return JSONResponse(
+        {
+            "global_status": global_status,
+            "checks": {
+                name: scheduler.probes[name].to_dict(result)
+                for name, result in results.items()
+            },
         },
         status_code=HTTPStatus.OK if global_status else HTTPStatus.SERVICE_UNAVAILABLE,
     )
@@ -0,0 +1,87 @@
+import asyncio
+import datetime
+from http import HTTPStatus
+from typing import Any
+
+from healthcheck.probes import Probe, ProbesScheduler
+from healthcheck.status import Result
+
+
+async def succeeding_check() -> Result[Any]:
+    return Result(success=True, status_code=HTTPStatus.OK, data={"value": 1})
+
+
+async def failing_check() -> Result[Any]:
+    return Result(success=False, status_code=HTTPStatus.BAD_GATEWAY)
+
+
+async def raising_check() -> Result[Any]:
+    raise RuntimeError("unexpected")
+
+
+async def test_probe_keeps_last_result() -> None:
+    probe = Probe("test", succeeding_check, 60)
+    await probe.run()
+
+    result = await probe.get_result()
+    assert result.success is True
+    assert result.data == {"value": 1}
+    assert probe.checked_on is not None
+    assert probe.duration is not None
+    assert probe.to_dict(result)["data"] == {"value": 1}
+
+
+async def test_probe_check_raising() -> None:
+    probe = Probe("test", raising_check, 60)
+    await probe.run()
+
+    result = await probe.get_result()
+    assert result.success is False
+    assert result.status_code == HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+async def test_probe_stale_result() -> None:
+    probe = Probe("test", succeeding_check, 60)
+    await probe.run()
+    probe.checked_on = datetime.datetime(2020, 1, 1)
+
+    result = await probe.get_result()
+    assert result.success is False
+    assert result.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+
+
+async def test_optional_probe_failing() -> None:
+    probe = Probe("test", failing_check, 60, optional=True)
+    await probe.run()
+
+    result = await probe.get_result()
+    assert result.success is True
+    assert result.status_code == HTTPStatus.BAD_GATEWAY
+
+
+async def test_scheduler_runs_probes_concurrently() -> None:
+    calls: list[str] = []
+
+    async def slow_check() -> Result[Any]:
+        calls.append("slow")
+        await asyncio.sleep(0.2)
+        return await succeeding_check()
+
+    async def fast_check() -> Result[Any]:
+        calls.append("fast")
+        return await failing_check()
+
+    scheduler = ProbesScheduler(
+        [Probe("slow", slow_check, 60), Probe("fast", fast_check, 60)]
+    )
+    scheduler.start()
+    try:
+        # waits for first results
+        results = await asyncio.wait_for(scheduler.get_results(), timeout=1)
+        assert results["slow"].success is True
+        assert results["fast"].success is False
+        # results are served from cache afterwards
+        await scheduler.get_results()
+        assert sorted(calls) == ["fast", "slow"]
+    finally:
+        await scheduler.stop()
@@ -1,8 +1,20 @@
 #!/usr/bin/env python3
 
+"""Generate netdata stream.conf sections for the SSH keys of all zimfarm workers
+
+Prints the configuration on stdout. With --output, the configuration file is only
+(atomically) rewritten if it changed, exiting with EXIT_UNCHANGED otherwise so that
+netdata is only reloaded when needed.
+
+Workers list and keys are fetched with conditional requests, validated against the
+ETags saved in --cache from previous run.
+"""
+
+import argparse
 import json
 import os
 import sys
+import tempfile
 import time
 import urllib.error
 import urllib.parse
@@ -24,6 +36,10 @@ ZIMFARM_OAUTH_ISSUER = os.getenv("ZIMFARM_OAUTH_ISSUER", "https://ory.login.kiwi
 ZIMFARM_OAUTH_CLIENT_ID = os.getenv("ZIMFARM_OAUTH_CLIENT_ID", "")
 ZIMFARM_OAUTH_CLIENT_SECRET = os.getenv("ZIMFARM_OAUTH_CLIENT_SECRET", "")
 ZIMFARM_OAUTH_AUDIENCE_ID = os.getenv("ZIMFARM_OAUTH_AUDIENCE_ID", "")
+CACHE_PATH = os.getenv("STREAM_CONF_CACHE", "/var/cache/regen-stream-conf.json")
+
+# exit code when --output is already up to date
+EXIT_UNCHANGED = 3
 
 TEMPLATE = """[__KEY__]
  enabled = yes
@@ -40,6 +56,12 @@ TEMPLATE = """[__KEY__]
 """
 
 
+class HTTPStatusError(IOError):
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"ERROR HTTP {status_code}: {message}")
+        self.status_code = status_code
+
+
 def format_key(fingerprint: str) -> str:
     """UUID-hex looking from fingerprint"""
     return str(uuid.uuid5(uuid.NAMESPACE_DNS, fingerprint)).upper()
@@ -113,10 +135,31 @@ class ClientTokenProvider:
                 self._access_token = response_data.get("access_token")
                 self._refresh_token = response_data.get("refresh_token")
         except urllib.error.HTTPError as e:
+            if self._refresh_token:
+                # refresh token (from a previous run) expired: authenticate again
+                self._refresh_token = None
+                return self._generate_local_access_token()
             raise IOError(
                 f"Local authentication failed - HTTP Error {e.code}: {e.reason}"
             )
 
+    def restore(self, access_token: str | None, refresh_token: str | None) -> None:
+        """Reuse tokens from a previous run"""
+        self._access_token = access_token
+        self._refresh_token = refresh_token
+
+    def invalidate(self) -> None:
+        """Discard access token so that next call generates a new one"""
+        self._access_token = None
+
+    @property
+    def access_token(self) -> str | None:
+        return self._access_token
+
+    @property
+    def refresh_token(self) -> str | None:
+        return self._refresh_token
+
     def get_access_token(self) -> str:
         """Retrieve or generate access token."""
         if self._access_token is None:
@@ -145,7 +188,7 @@ def query_api(
     params: dict[str, Any] | None = None,
     headers: dict[str, str] | None = None,
     attempt: int = 0,
-) -> Tuple[bool, int, Union[str, dict]]:
+) -> Tuple[bool, int, Union[str, dict], dict[str, str]]:
     url = f"{API_URL}{path}"
 
     # Add query parameters to URL if provided
@@ -169,10 +212,11 @@ def query_api(
         )
         with urllib.request.urlopen(req) as response:  # nosec B310
             status_code = response.getcode()
+            response_headers = dict(response.headers)
             response_text = response.read().decode("utf-8")
 
             if status_code == HTTPStatus.NO_CONTENT:
-                return True, status_code, ""
+                return True, status_code, "", response_headers
 
             try:
                 resp = json.loads(response_text) if response_text else {}
@@ -181,20 +225,24 @@ def query_api(
                     False,
                     status_code,
                     f"ResponseError (not JSON): -- {response_text}",
+                    response_headers,
                 )
 
             if status_code in (HTTPStatus.OK, HTTPStatus.CREATED, HTTPStatus.ACCEPTED):
-                return True, status_code, resp
+                return True, status_code, resp, response_headers
 
             if "message" in resp:
                 content = resp["message"]
             else:
                 content = str(resp)
 
-            return (False, status_code, content)
+            return (False, status_code, content, response_headers)
 
     except urllib.error.HTTPError as e:
         status_code = e.code
+        # urllib considers 304 (response to a conditional request) as an error
+        if status_code == HTTPStatus.NOT_MODIFIED:
+            return True, status_code, {}, dict(e.headers)
         try:
             error_body = e.read().decode("utf-8")
             try:
@@ -208,7 +256,7 @@ def query_api(
         except Exception:
             content = f"HTTPError: {e.reason}"
 
-        return (False, status_code, content)
+        return (False, status_code, content, dict(e.headers))
 
     except Exception as exc:
         attempt += 1
@@ -216,55 +264,177 @@ def query_api(
         if attempt <= 3:
             time.sleep(attempt * 60 * 2)
             return query_api(token, method, path, payload, params, headers, attempt)
-        return (False, 599, f"ConnectionError -- {exc}")
+        return (False, 599, f"ConnectionError -- {exc}", {})
 
 
-def main() -> None:
-    fingerprints = []
+def load_cache(path: str) -> dict[str, Any]:
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_atomically(path: str, content: str, mode: int = 0o644) -> None:
+    """replace file at path with content, never leaving a partially written file"""
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)), prefix=".tmp-"
+    )
+    try:
+        with os.fdopen(fd, "w") as fh:
+            fh.write(content)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def get_sections(content: str) -> set[str]:
+    """keys of the sections of a stream.conf"""
+    return {
+        line.strip()[1:-1]
+        for line in content.splitlines()
+        if line.startswith("[") and line.strip().endswith("]")
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--output", help="Path of stream.conf to update (prints it if not set)"
+    )
+    parser.add_argument(
+        "--cache",
+        default=CACHE_PATH,
+        help="Path to keep ETags and tokens in between runs",
+    )
+    args = parser.parse_args()
+
+    cache = load_cache(args.cache)
+    token_provider.restore(cache.get("access_token"), cache.get("refresh_token"))
     token = token_provider.get_access_token()
 
     def get_from_api(
         path: str,
         params: dict[str, Any] | None = None,
-        headers: dict[str, str] | None = None,
-    ) -> dict[str, Any]:
+        etag: str | None = None,
+    ) -> Tuple[int, dict[str, Any], str | None]:
+        """status code, response and ETag; response is empty if not modified"""
         nonlocal token
         attempts = 0
         success = False
         status_code = 0
         response: Union[str, dict] = ""
+        response_headers: dict[str, str] = {}
 
         while attempts <= 1:
-            success, status_code, response = query_api(
-                token, "GET", path, params=params, headers=headers
+            success, status_code, response, response_headers = query_api(
+                token,
+                "GET",
+                path,
+                params=params,
+                headers={"If-None-Match": etag} if etag else None,
             )
             attempts += 1
 
-            # Unauthorised error: attempt to re-auth as scheduler might have restarted?
+            # Unauthorised error: token expired or scheduler might have restarted?
             if status_code == HTTPStatus.UNAUTHORIZED:
+                token_provider.invalidate()
                 token = token_provider.get_access_token()
                 continue
             else:
                 break
 
         if not success:
-            raise IOError(f"ERROR HTTP {status_code}: {response}")
+            raise HTTPStatusError(status_code, str(response))
 
         # At this point, we know success is True, so response must be a dict
         assert isinstance(response, dict)
-        return response
-
-    for worker in get_from_api("/workers", params={"limit": 100}).get("items", []):
-        for ssh_key in get_from_api(f"/workers/{worker['name']}").get("ssh_keys", []):
-            fingerprint = ssh_key.get("fingerprint")
-            if fingerprint:
-                fingerprints.append(fingerprint)
-
-    content = ""
-    for fingerprint in fingerprints:
-        key = format_key(fingerprint)
-        content += TEMPLATE.replace("__KEY__", key)
-    print(content)
+        return status_code, response, response_headers.get("ETag")
+
+    def get_fingerprints(worker_name: str) -> list[str]:
+        cached = cache.get("keys", {}).get(worker_name, {})
+        try:
+            status_code, response, etag = get_from_api(
+                f"/workers/{worker_name}/keys", etag=cached.get("etag")
+            )
+        except HTTPStatusError as exc:
+            if exc.status_code != HTTPStatus.FORBIDDEN:
+                raise
+            # account can't list keys: get them from (unconditional) worker details
+            status_code, response, etag = (
+                HTTPStatus.OK,
+                {"items": get_from_api(f"/workers/{worker_name}")[1]["ssh_keys"]},
+                None,
+            )
+        if status_code == HTTPStatus.NOT_MODIFIED:
+            return cached["fingerprints"]
+        fingerprints = [
+            ssh_key["fingerprint"]
+            for ssh_key in response.get("items", [])
+            if ssh_key.get("fingerprint")
+        ]
+        new_cache["keys"][worker_name] = {"etag": etag, "fingerprints": fingerprints}
+        return fingerprints
+
+    new_cache: dict[str, Any] = {"workers": cache.get("workers", {}), "keys": {}}
+    status_code, response, etag = get_from_api(
+        "/workers", params={"limit": 100}, etag=cache.get("workers", {}).get("etag")
+    )
+    if status_code == HTTPStatus.NOT_MODIFIED:
+        workers_names: list[str] = new_cache["workers"]["names"]
+    else:
+        workers_names = [worker["name"] for worker in response.get("items", [])]
+        new_cache["workers"] = {"etag": etag, "names": workers_names}
+
+    keys: set[str] = set()
+    for worker_name in workers_names:
+        new_cache["keys"].setdefault(
+            worker_name, cache.get("keys", {}).get(worker_name, {})
+        )
+        keys.update(
+            format_key(fingerprint) for fingerprint in get_fingerprints(worker_name)
+        )
+
+    # sorted so that content only changes when keys change
+    content = "".join(TEMPLATE.replace("__KEY__", key) for key in sorted(keys))
+
+    new_cache["access_token"] = token_provider.access_token
+    new_cache["refresh_token"] = token_provider.refresh_token
+    try:
+        write_atomically(args.cache, json.dumps(new_cache), mode=0o600)
+    except OSError as exc:
+        print(f"Unable to save cache to {args.cache}: {exc}", file=sys.stderr)
+
+    if not args.output:
+        print(content)
+        return 0
+
+    if not keys:
+        print("No worker key found, keeping existing configuration", file=sys.stderr)
+        return 1
+
+    try:
+        with open(args.output) as fh:
+            current = fh.read()
+    except FileNotFoundError:
+        current = ""
+    if current == content:
+        print("workers keys unchanged")
+        return EXIT_UNCHANGED
+
+    current_keys = get_sections(current)
+    print(
+        f"workers keys updated: {len(keys - current_keys)} added, "
+        f"{len(current_keys - keys)} removed"
+    )
+    write_atomically(args.output, content)
+    return 0
 
 
 if __name__ == "__main__":
@@ -10,12 +10,23 @@
 - must respond with a list of public keys to authenticate it with
 - connects to the Zimfarm API to request a public key from the fingerprint
 - requests it to be associated with a user having zim.upload permission
+- caches API responses on disk (per fingerprint) so that bursts of uploads
+  don't each wait on the API:
+    - fresh entries (younger than ZIMFARM_KEYS_CACHE_TTL) are served as is
+    - stale entries (younger than ZIMFARM_KEYS_CACHE_MAX_STALE) are served
+      immediately while a detached process refreshes them
+    - stale entries are also served should the API be unreachable
+    - refusals are cached for ZIMFARM_KEYS_CACHE_NEGATIVE_TTL only
 """
 
+import hashlib
 import json
 import logging
 import os
+import pathlib
 import sys
+import tempfile
+import time
 
 import requests
 
@@ -41,6 +52,13 @@ except Exception as exc:
     logger.error(f"unable to load environ file: {exc}")
     environ = default_environ
 
+CACHE_DIR = pathlib.Path(
+    environ.get("ZIMFARM_KEYS_CACHE_DIR", "/var/cache/zimfarm-keys")
+)
+CACHE_TTL = int(environ.get("ZIMFARM_KEYS_CACHE_TTL", 5 * 60))
+CACHE_MAX_STALE = int(environ.get("ZIMFARM_KEYS_CACHE_MAX_STALE", 24 * 60 * 60))
+CACHE_NEGATIVE_TTL = int(environ.get("ZIMFARM_KEYS_CACHE_NEGATIVE_TTL", 30))
+
 
 def print_keys_for(username, fingerprint):
     # skip requests for unexpected users
@@ -48,11 +66,90 @@ def print_keys_for(username, fingerprint):
         logger.warning(f"refused login for {username}")
         return
 
-    keys = fetch_public_keys_for(username, fingerprint)
+    keys = get_public_keys_for(username, fingerprint)
     if not keys:
         return
 
-    print("\n".join(keys))
+    print("\n".join(keys), flush=True)
+
+
+def get_cache_path(fingerprint):
+    # fingerprints are base64 and may contain `/`
+    return CACHE_DIR / hashlib.sha256(fingerprint.encode("UTF-8")).hexdigest()
+
+
+def read_cache(fingerprint):
+    """cached (age, keys) for fingerprint or None"""
+    try:
+        entry = json.loads(get_cache_path(fingerprint).read_text())
+        return time.time() - entry["fetched_on"], entry["keys"]
+    except FileNotFoundError:
+        return None
+    except Exception as exc:
+        logger.warning(f"ignoring invalid cache entry for {fingerprint}: {exc}")
+        return None
+
+
+def write_cache(fingerprint, keys):
+    """atomically record keys (empty list for a refusal) for fingerprint"""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=CACHE_DIR, delete=False, suffix=".tmp"
+        ) as fh:
+            json.dump({"fetched_on": time.time(), "keys": keys}, fh)
+        os.replace(fh.name, get_cache_path(fingerprint))
+    except Exception as exc:
+        logger.warning(f"unable to cache keys for {fingerprint}: {exc}")
+
+
+def refresh_cache(username, fingerprint):
+    """fetch keys from API and cache them. Returns keys (empty if refused)"""
+    keys = fetch_public_keys_for(username, fingerprint) or []
+    write_cache(fingerprint, keys)
+    return keys
+
+
+def refresh_cache_in_background(username, fingerprint):
+    """refresh cache entry from a detached process so sshd is not kept waiting"""
+    try:
+        if os.fork():
+            return
+    except OSError as exc:
+        logger.warning(f"unable to fork for cache refresh: {exc}")
+        return
+
+    # detach from sshd: it waits for stdout to be closed before proceeding
+    try:
+        os.setsid()
+        devnull = os.open(os.devnull, os.O_RDWR)
+        os.dup2(devnull, sys.stdin.fileno())
+        os.dup2(devnull, sys.stdout.fileno())
+        refresh_cache(username, fingerprint)
+    except Exception as exc:
+        logger.warning(f"failed to refresh keys cache for {fingerprint}: {exc}")
+    finally:
+        os._exit(0)
+
+
+def get_public_keys_for(username, fingerprint):
+    cached = read_cache(fingerprint)
+    if cached:
+        age, keys = cached
+        if age < (CACHE_TTL if keys else CACHE_NEGATIVE_TTL):
+            return keys
+        if keys and age < CACHE_MAX_STALE:
+            refresh_cache_in_background(username, fingerprint)
+            return keys
+
+    try:
+        return refresh_cache(username, fingerprint)
+    except Exception as exc:
+        logger.error(f"unable to query API for {fingerprint}: {exc}")
+        # API unreachable: better serve a stale key than lock uploaders out
+        if cached and cached[1] and cached[0] < CACHE_MAX_STALE:
+            return cached[1]
+        return
 
 
 def fetch_public_keys_for(username, fingerprint):
@@ -70,6 +167,9 @@ def fetch_public_keys_for(username, fingerprint):
         reason = f"HTTP {req.status_code}."
         if response and "message" in response:
             reason += f" {response['message']}"
+        # server-side errors are not a refusal: don't cache them
+        if req.status_code >= 500:
+            raise requests.HTTPError(reason, response=req)
         logger.warning(f"failed login attempt using {fingerprint}: {reason}")
         return
 
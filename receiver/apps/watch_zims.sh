@@ -0,0 +1,48 @@
+#!/bin/bash
+#
+# Usage : watch_zims.sh <nbJobs> <zimSrcDir> <zimDstDir> <zimQuarantineDir>
+#
+# Moves ZIM files as soon as they are completely written (close_write) or
+# renamed into place (moved_to, as done by uploader's --move).
+# Events received within ZIM_MOVE_BATCH_DELAY seconds of each other are
+# moved together (up to ZIM_MOVE_BATCH_SIZE files) using parallel.
+#
+
+ZIM_MOVE_PARALLEL_JOBS=$1
+ZIM_SRC_DIR=$2
+ZIM_DST_DIR=$3
+ZIM_QUAR_DIR=$4
+BATCH_DELAY=${ZIM_MOVE_BATCH_DELAY:-2}
+BATCH_SIZE=${ZIM_MOVE_BATCH_SIZE:-100}
+
+PARALLEL="parallel -j${ZIM_MOVE_PARALLEL_JOBS}"
+ZIM_MOVE='/usr/local/bin/move_zim.sh'
+
+shopt -s nocasematch
+
+function moveZims () {
+  printf '%s\n' "$@" |
+      $PARALLEL "$ZIM_MOVE {} $ZIM_SRC_DIR $ZIM_DST_DIR $ZIM_QUAR_DIR"
+}
+
+# catch-up on files uploaded while not watching
+/usr/local/bin/move_zims.sh "$ZIM_MOVE_PARALLEL_JOBS" "$ZIM_SRC_DIR" "$ZIM_DST_DIR" "$ZIM_QUAR_DIR"
+
+inotifywait --monitor --recursive --quiet \
+    --event close_write --event moved_to \
+    --format '%w%f' "$ZIM_SRC_DIR" |
+while read -r ZIMFILE; do
+  BATCH=()
+  while true; do
+    if [[ "$ZIMFILE" == *.zim ]] ; then
+      BATCH+=("$ZIMFILE")
+    fi
+    if [ ${#BATCH[@]} -ge "$BATCH_SIZE" ] || ! read -r -t "$BATCH_DELAY" ZIMFILE ; then
+      break
+    fi
+  done
+
+  if [ ${#BATCH[@]} -gt 0 ] ; then
+    moveZims "${BATCH[@]}"
+  fi
+done
@@ -24,10 +24,20 @@ cat $JSON_PATH
 
 ENABLE_ZIM_MOVE=${ENABLE_ZIM_MOVE:-1}
 
-# If ENABLE_MOVE is set, create cron entry for ZIM management in receiver
+# If ENABLE_MOVE is set, start ZIM files watcher and a periodic full sweep
+# (catches anything the watcher would have missed)
 if [ "$ENABLE_ZIM_MOVE" = "1" ]; then
-    echo "* *  * * *  root  /usr/bin/flock -w 0 /dev/shm/cron.lock /usr/local/bin/move_zims.sh $ZIM_MOVE_PARALLEL_JOBS $ZIM_SRC_DIR $ZIM_DST_DIR $ZIM_QUAR_DIR >> /dev/shm/move_zims.log 2>&1" >> /etc/cron.d/move_zims
+    echo "$ZIM_MOVE_SWEEP_SCHEDULE  root  /usr/bin/flock -w 0 /dev/shm/cron.lock /usr/local/bin/move_zims.sh $ZIM_MOVE_PARALLEL_JOBS $ZIM_SRC_DIR $ZIM_DST_DIR $ZIM_QUAR_DIR >> /dev/shm/move_zims.log 2>&1" >> /etc/cron.d/move_zims
     chmod +x /etc/cron.d/move_zims
+
+    # restart watcher should it exit (inotifywait failure)
+    (
+        while true; do
+            /usr/local/bin/watch_zims.sh "$ZIM_MOVE_PARALLEL_JOBS" "$ZIM_SRC_DIR" "$ZIM_DST_DIR" "$ZIM_QUAR_DIR"
+            echo "ZIM watcher exited, restarting in 5s"
+            sleep 5
+        done
+    ) >> /dev/shm/move_zims.log 2>&1 &
 fi
 
 exec "$@"
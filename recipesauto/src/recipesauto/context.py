@@ -30,6 +30,9 @@ class Context:
     # timeout of HTTP calls
     http_timeout: int = 10
 
+    # number of concurrent HTTP calls to Zimfarm (fetching / applying recipes)
+    concurrency: int = 8
+
     # dict of values to use in configuration (typically to pass secrets)
     values: dict[str, str]
 
@@ -45,6 +45,15 @@ def prepare_context(raw_args: list[str]) -> None:
         "-p", "--push", action="store_true", help="Really apply changes"
     )
 
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        help=(
+            "Number of concurrent requests to the Zimfarm. "
+            f"Defaults to {Context.concurrency}"
+        ),
+    )
+
     parser.add_argument(
         "--values",
         type="CommaSeparatedKeyValues",
@@ -1,11 +1,15 @@
 # ruff: noqa: PLC0415
 
 import copy
+import functools
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
 from typing import Any
 
 import requests
 import yaml
+from requests.adapters import HTTPAdapter
 
 from recipesauto.constants import logger
 from recipesauto.context import Context
@@ -44,6 +48,15 @@ class Processor:
                 "do_not_delete": [],
             }
 
+        # single pooled session, shared by concurrent requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=context.concurrency, pool_maxsize=context.concurrency
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(self.get_zf_headers())
+
         logger.info("Authenticating with zimfarm")
         self.authenticate()
         logger.info("Authenticated with zimfarm")
@@ -139,6 +152,7 @@ class Processor:
                     f"{len(recipes_to_create)} recipes would have been created:"
                 )
             ask_for_confirmation = True
+            operations: dict[str, Callable[[], None]] = {}
             for recipe in recipes_to_create:
                 logger.info(f"- {recipe['name']}")
                 if not context.push:
@@ -156,17 +170,18 @@ class Processor:
                         continue
                     if response == "A":
                         ask_for_confirmation = False
-                self._create_recipe_on_zf(recipe)
-                logger.info("Recipe created successfully")
+                operations[recipe["name"]] = functools.partial(
+                    self._create_recipe_on_zf, recipe
+                )
+            self._apply_on_zf("created", operations)
 
     def _create_recipe_on_zf(self, recipe: dict[str, Any]):
         """Really create the recipe on the Zimfarm"""
         patched_recipe = copy.deepcopy(recipe)
         patched_recipe["config"]["warehouse_path"] = "/.hidden/dev"
         patched_recipe["periodicity"] = "manually"
-        response = requests.post(
+        response = self.session.post(
             self.get_zf_url("/recipes"),
-            headers=self.get_zf_headers(),
             timeout=context.http_timeout,
             json=recipe,
         )
@@ -220,92 +235,19 @@ class Processor:
                 logger.info(
                     f"{len(recipes_to_maintain)} recipes would have been maintained:"
                 )
+            current_recipes = self._get_recipe_definitions_on_zf(
+                [expected_recipe["name"] for expected_recipe in recipes_to_maintain]
+            )
             ask_for_confirmation = True
+            operations: dict[str, Callable[[], None]] = {}
             for expected_recipe in recipes_to_maintain:
                 logger.info(f"- {expected_recipe['name']}")
                 if override := self._get_recipe_overrides(expected_recipe["name"]):
                     logger.debug(f"Overriding config with {override['overrides']}")
                     self._patch_dictionary(expected_recipe, override["overrides"])
-                changes = {}
-                current_recipe = self._get_recipe_definition_on_zf(
-                    expected_recipe["name"]
+                changes = self._get_recipe_changes(
+                    expected_recipe, current_recipes[expected_recipe["name"]]
                 )
-                for current_recipe_key, current_recipe_value in current_recipe.items():
-                    if current_recipe_key in [
-                        # keys handled separately
-                        "config",
-                        "language",
-                        # read-only keys
-                        "duration",
-                        "most_recent_task",
-                        "notification",
-                        "is_requested",
-                        "is_valid",
-                        "id",
-                    ]:
-                        continue
-                    expected_value = expected_recipe[current_recipe_key]
-                    if current_recipe_value == expected_value:
-                        continue
-                    logger.info(
-                        f"{current_recipe_key}: {current_recipe_value} => "
-                        f"{expected_value}"
-                    )
-                    changes[current_recipe_key] = expected_value
-
-                # handle special case of language (read != write)
-                current_recipe_value = current_recipe["language"]["code"]
-                expected_value = expected_recipe["language"]
-                if current_recipe_value != expected_value:
-                    logger.info(f"language: {current_recipe_value} => {expected_value}")
-                    changes["language"] = expected_value
-
-                # handle special case of config
-                for current_recipe_key, current_recipe_value in current_recipe[
-                    "config"
-                ].items():
-                    if current_recipe_key in [
-                        "command",
-                        "mount_point",
-                        "str_command",
-                        "artifacts_globs",
-                    ]:
-                        continue
-                    expected_value = expected_recipe["config"][current_recipe_key]
-                    if hasattr(current_recipe_value, "items"):
-                        keys_to_remove = []
-                        for key, value in current_recipe_value.items():
-                            if value is None or value == []:
-                                keys_to_remove.append(key)
-                        for key in keys_to_remove:
-                            del current_recipe_value[key]
-                    if hasattr(expected_value, "items"):
-                        keys_to_remove = []
-                        for key, value in expected_value.items():
-                            if value is None or value == []:
-                                keys_to_remove.append(key)
-                        for key in keys_to_remove:
-                            del expected_value[key]
-                    if current_recipe_value == expected_value:
-                        continue
-                    if current_recipe_key != "offliner":
-                        logger.info(
-                            f"config.{current_recipe_key}: {current_recipe_value} => "
-                            f"{expected_value}"
-                        )
-                        changes[current_recipe_key] = expected_value
-                    else:
-                        logger.info("Flags have changed:")
-                        current_flags = set(current_recipe_value.items())
-                        expected_flags = set(
-                            expected_recipe["config"]["offliner"].items()
-                        )
-                        if new_keys := expected_flags - current_flags:
-                            logger.info(f"Added keys: {new_keys}")
-                        if previous_keys := current_flags - expected_flags:
-                            logger.info(f"Removed keys: {previous_keys}")
-                        # 'offliner' at read time ends up in 'flags' at write time
-                        changes["flags"] = expected_value
                 if changes and context.push:
                     if ask_for_confirmation:
                         response = input(
@@ -315,14 +257,95 @@ class Processor:
                             continue
                         if response == "A":
                             ask_for_confirmation = False
-                    self._patch_recipe_on_zf(expected_recipe["name"], changes)
-                    logger.info("Recipe updated successfully")
+                    operations[expected_recipe["name"]] = functools.partial(
+                        self._patch_recipe_on_zf, expected_recipe["name"], changes
+                    )
+            self._apply_on_zf("updated", operations)
+
+    def _get_recipe_changes(
+        self, expected_recipe: dict[str, Any], current_recipe: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Changes to apply to current recipe definition to match expected one"""
+        changes = {}
+        for current_recipe_key, current_recipe_value in current_recipe.items():
+            if current_recipe_key in [
+                # keys handled separately
+                "config",
+                "language",
+                # read-only keys
+                "duration",
+                "most_recent_task",
+                "notification",
+                "is_requested",
+                "is_valid",
+                "id",
+            ]:
+                continue
+            expected_value = expected_recipe[current_recipe_key]
+            if current_recipe_value == expected_value:
+                continue
+            logger.info(
+                f"{current_recipe_key}: {current_recipe_value} => {expected_value}"
+            )
+            changes[current_recipe_key] = expected_value
+
+        # handle special case of language (read != write)
+        current_recipe_value = current_recipe["language"]["code"]
+        expected_value = expected_recipe["language"]
+        if current_recipe_value != expected_value:
+            logger.info(f"language: {current_recipe_value} => {expected_value}")
+            changes["language"] = expected_value
+
+        # handle special case of config
+        for current_recipe_key, current_recipe_value in current_recipe[
+            "config"
+        ].items():
+            if current_recipe_key in [
+                "command",
+                "mount_point",
+                "str_command",
+                "artifacts_globs",
+            ]:
+                continue
+            expected_value = expected_recipe["config"][current_recipe_key]
+            if hasattr(current_recipe_value, "items"):
+                keys_to_remove = []
+                for key, value in current_recipe_value.items():
+                    if value is None or value == []:
+                        keys_to_remove.append(key)
+                for key in keys_to_remove:
+                    del current_recipe_value[key]
+            if hasattr(expected_value, "items"):
+                keys_to_remove = []
+                for key, value in expected_value.items():
+                    if value is None or value == []:
+                        keys_to_remove.append(key)
+                for key in keys_to_remove:
+                    del expected_value[key]
+            if current_recipe_value == expected_value:
+                continue
+            if current_recipe_key != "offliner":
+                logger.info(
+                    f"config.{current_recipe_key}: {current_recipe_value} => "
+                    f"{expected_value}"
+                )
+                changes[current_recipe_key] = expected_value
+            else:
+                logger.info("Flags have changed:")
+                current_flags = set(current_recipe_value.items())
+                expected_flags = set(expected_recipe["config"]["offliner"].items())
+                if new_keys := expected_flags - current_flags:
+                    logger.info(f"Added keys: {new_keys}")
+                if previous_keys := current_flags - expected_flags:
+                    logger.info(f"Removed keys: {previous_keys}")
+                # 'offliner' at read time ends up in 'flags' at write time
+                changes["flags"] = expected_value
+        return changes
 
     def _patch_recipe_on_zf(self, recipe_name: str, changes: dict[str, Any]):
         """Really patch a recipe on the Zimfarm"""
-        response = requests.patch(
+        response = self.session.patch(
             self.get_zf_url(f"/recipes/{recipe_name}"),
-            headers=self.get_zf_headers(),
             timeout=context.http_timeout,
             json=changes,
         )
@@ -353,6 +376,7 @@ class Processor:
                     f"{len(recipes_to_delete)} recipes would have been deleted:"
                 )
             ask_for_confirmation = True
+            operations: dict[str, Callable[[], None]] = {}
             for recipe in recipes_to_delete:
                 logger.info(f"- {recipe}")
                 if not context.push:
@@ -365,14 +389,15 @@ class Processor:
                         continue
                     if response == "A":
                         ask_for_confirmation = False
-                self._delete_recipe_on_zf(recipe)
-                logger.info("Recipe deleted successfully")
+                operations[recipe] = functools.partial(
+                    self._delete_recipe_on_zf, recipe
+                )
+            self._apply_on_zf("deleted", operations)
 
     def _delete_recipe_on_zf(self, recipe_name: str):
         """Really delete a recipe from Zimfarm"""
-        response = requests.delete(
+        response = self.session.delete(
             self.get_zf_url(f"/recipes/{recipe_name}"),
-            headers=self.get_zf_headers(),
             timeout=context.http_timeout,
         )
         if not HTTPStatus(response.status_code).is_success:
@@ -387,11 +412,10 @@ class Processor:
 
         recipe_names: list[str] = []
         while True:
-            response = requests.get(
+            response = self.session.get(
                 self.get_zf_url(
                     f"/recipes/?limit={per_page}&skip={skip}&tag={self.recipe_tag}"
                 ),
-                headers=self.get_zf_headers(),
                 timeout=context.http_timeout,
             )
 
@@ -415,9 +439,8 @@ class Processor:
     def _get_recipe_definition_on_zf(self, recipe_name: str) -> dict[str, Any]:
         """Get the recipe details on zimfarm"""
 
-        response = requests.get(
+        response = self.session.get(
             self.get_zf_url(f"/recipes/{recipe_name}?hide_secrets=False"),
-            headers=self.get_zf_headers(),
             timeout=context.http_timeout,
         )
         if not HTTPStatus(response.status_code).is_success:
@@ -425,6 +448,46 @@ class Processor:
         response.raise_for_status()
         return response.json()
 
+    def _get_recipe_definitions_on_zf(
+        self, recipe_names: list[str]
+    ) -> dict[str, dict[str, Any]]:
+        """Get the recipes details on zimfarm, concurrently"""
+        logger.info(f"Fetching {len(recipe_names)} recipes definitions")
+        with ThreadPoolExecutor(max_workers=context.concurrency) as executor:
+            return dict(
+                zip(
+                    recipe_names,
+                    executor.map(self._get_recipe_definition_on_zf, recipe_names),
+                    strict=True,
+                )
+            )
+
+    def _apply_on_zf(self, action: str, operations: dict[str, Callable[[], None]]):
+        """Run operations on recipes (keyed by recipe name) concurrently
+
+        All operations are run, failures are reported at the end"""
+        if not operations:
+            return
+
+        def apply(recipe_name: str) -> Exception | None:
+            try:
+                operations[recipe_name]()
+            except Exception as exc:
+                return exc
+            return None
+
+        with ThreadPoolExecutor(max_workers=context.concurrency) as executor:
+            results = dict(
+                zip(operations, executor.map(apply, operations), strict=True)
+            )
+
+        failures = {name: exc for name, exc in results.items() if exc is not None}
+        for recipe_name, exc in failures.items():
+            logger.error(f"Recipe {recipe_name} could not be {action}: {exc}")
+        logger.info(f"{len(operations) - len(failures)} recipes {action} successfully")
+        if failures:
+            raise Exception(f"{len(failures)} recipes could not be {action}")
+
     def get_zf_url(self, path: str):
         """Build full Zimfarm URL from a path"""
         return "/".join([context.zimfarm_api_url, path[1:] if path[0] == "/" else path])
@@ -437,9 +500,8 @@ class Processor:
         }
 
     def authenticate(self):
-        response = requests.get(
+        response = self.session.get(
             self.get_zf_url("/auth/me"),
-            headers=self.get_zf_headers(),
             timeout=context.http_timeout,
         )
         response.raise_for_status()
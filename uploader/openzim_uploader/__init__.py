@@ -19,8 +19,13 @@ manual tests lists (for each method):
 """
 
 import argparse
+import base64
+import concurrent.futures
 import datetime
+import hashlib
+import json
 import logging
+import math
 import os
 import pathlib
 from typing import cast
@@ -52,6 +57,12 @@ MARKER_FILE = pathlib.Path(os.getenv("MARKER_FILE", "/usr/share/marker"))
 SCP_BIN_PATH = pathlib.Path(os.getenv("SCP_BIN_PATH", "/usr/bin/scp"))
 SFTP_BIN_PATH = pathlib.Path(os.getenv("SFTP_BIN_PATH", "/usr/bin/sftp"))
 S3_SCHEMES = ("s3", "s3+http", "s3+https")
+# S3 multipart constraints
+S3_MIN_PART_SIZE = 5 * 2**20
+S3_MAX_PARTS = 10000
+S3_PART_SIZE = int(os.getenv("S3_PART_SIZE", str(100 * 2**20)))
+S3_CONCURRENCY = int(os.getenv("S3_CONCURRENCY", "4"))
+PROGRESS_INTERVAL = 30  # seconds between two throughput/ETA reports
 
 
 def now():
@@ -347,18 +358,235 @@ def sftp_upload_file(
     return sftp.returncode
 
 
+def format_size(size):
+    if humanfriendly:
+        return humanfriendly.format_size(size, binary=True)
+    return f"{size / 2**20:.1f}MiB"
+
+
+def format_timespan(seconds):
+    if humanfriendly:
+        return humanfriendly.format_timespan(seconds, max_units=2)
+    return f"{seconds:.0f}s"
+
+
+class UploadProgress:
+    """periodically log throughput and ETA of a multipart upload"""
+
+    def __init__(self, total, already_uploaded=0, interval=PROGRESS_INTERVAL):
+        self.total = total
+        self.uploaded = already_uploaded
+        self.sent = 0  # bytes sent during this run (excludes resumed parts)
+        self.started_on = time.monotonic()
+        self.last_report = self.started_on
+        self.interval = interval
+
+    def add(self, nbytes):
+        self.uploaded += nbytes
+        self.sent += nbytes
+        if time.monotonic() - self.last_report >= self.interval:
+            self.report()
+
+    def report(self):
+        self.last_report = time.monotonic()
+        elapsed = self.last_report - self.started_on
+        speed = self.sent / elapsed if elapsed else 0
+        remaining = self.total - self.uploaded
+        eta = format_timespan(remaining / speed) if speed else "unknown"
+        logger.info(
+            f"[progress] {format_size(self.uploaded)}/{format_size(self.total)} "
+            f"({self.uploaded / self.total:.1%}) at {format_size(speed)}/s, "
+            f"ETA {eta}"
+        )
+
+
+def get_part_size(filesize, part_size):
+    """part_size adjusted to S3 limits (min part size, max number of parts)"""
+    part_size = max(part_size, S3_MIN_PART_SIZE)
+    if math.ceil(filesize / part_size) > S3_MAX_PARTS:
+        # round up to the next MiB so parts stay aligned
+        part_size = math.ceil(filesize / S3_MAX_PARTS / 2**20) * 2**20
+    return part_size
+
+
+def get_checkpoint_dir(src_path, checkpoint_dir=None):
+    """folder to store upload checkpoints in: requested one, source's or temp"""
+    if checkpoint_dir:
+        checkpoint_dir = pathlib.Path(checkpoint_dir).expanduser().resolve()
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        return checkpoint_dir
+    if os.access(src_path.parent, os.W_OK):
+        return src_path.parent
+    logger.warning(
+        f"{src_path.parent} is not writable, storing upload checkpoint in "
+        f"{tempfile.gettempdir()} (won't survive a container restart)"
+    )
+    return pathlib.Path(tempfile.gettempdir())
+
+
+def read_part(src_path, part_number, part_size):
+    """bytes of 1-indexed part_number of src_path"""
+    with open(src_path, "rb") as fh:
+        fh.seek((part_number - 1) * part_size)
+        return fh.read(part_size)
+
+
+def read_checkpoint(checkpoint_path):
+    try:
+        return json.loads(checkpoint_path.read_text())
+    except FileNotFoundError:
+        return None
+    except Exception as exc:
+        logger.warning(f"ignoring unreadable checkpoint {checkpoint_path}: {exc}")
+        return None
+
+
+def get_uploaded_parts(client, bucket, key, upload_id, src_path, part_size):
+    """{PartNumber: ETag} of parts already uploaded matching our local file"""
+    parts = {}
+    paginator = client.get_paginator("list_parts")
+    for page in paginator.paginate(Bucket=bucket, Key=key, UploadId=upload_id):
+        for part in page.get("Parts", []):
+            data = read_part(src_path, part["PartNumber"], part_size)
+            # ETag of a (non-encrypted) part is the MD5 of its content
+            if (
+                part["Size"] == len(data)
+                and part["ETag"].strip('"') == hashlib.md5(data).hexdigest()
+            ):
+                parts[part["PartNumber"]] = part["ETag"]
+    return parts
+
+
+def s3_upload_part(client, bucket, key, upload_id, src_path, part_number, part_size):
+    """upload a single part, returning its (PartNumber, ETag, size)"""
+    data = read_part(src_path, part_number, part_size)
+    digest = hashlib.md5(data).digest()
+    resp = client.upload_part(
+        Bucket=bucket,
+        Key=key,
+        UploadId=upload_id,
+        PartNumber=part_number,
+        Body=data,
+        # server rejects the part should it get corrupted in transit
+        ContentMD5=base64.b64encode(digest).decode("ASCII"),
+    )
+    return part_number, resp["ETag"], len(data)
+
+
+def s3_multipart_upload(
+    s3_storage, src_path, key, filesize, part_size, concurrency, checkpoint_dir
+):
+    """upload src_path to key via a parallel, resumable multipart upload
+
+    upload-id is checkpointed into checkpoint_dir so that a later attempt
+    reuses the parts already on the bucket instead of starting over.
+    An interrupted upload is thus left incomplete on the bucket on purpose."""
+    client, bucket = s3_storage.client, s3_storage.bucket_name
+    nb_parts = math.ceil(filesize / part_size)
+    checkpoint_path = checkpoint_dir.joinpath(f".{key.replace('/', '_')}.upload.json")
+    fingerprint = {
+        "key": key,
+        "size": filesize,
+        "mtime": src_path.stat().st_mtime,
+        "part_size": part_size,
+    }
+
+    upload_id, uploaded = None, {}
+    checkpoint = read_checkpoint(checkpoint_path)
+    if checkpoint and {k: checkpoint.get(k) for k in fingerprint} == fingerprint:
+        try:
+            uploaded = get_uploaded_parts(
+                client, bucket, key, checkpoint["upload_id"], src_path, part_size
+            )
+            upload_id = checkpoint["upload_id"]
+            logger.info(
+                f"Resuming upload {upload_id} with {len(uploaded)}/{nb_parts} "
+                "parts already uploaded"
+            )
+        except client.exceptions.NoSuchUpload:
+            logger.info("Checkpointed upload is gone, starting over")
+    elif checkpoint:
+        logger.info("Source file or settings changed, discarding previous upload")
+        try:
+            client.abort_multipart_upload(
+                Bucket=checkpoint["bucket"],
+                Key=checkpoint["key"],
+                UploadId=checkpoint["upload_id"],
+            )
+        except Exception as exc:
+            logger.warning(f"Failed to abort previous upload: {exc}")
+
+    if not upload_id:
+        upload_id = client.create_multipart_upload(Bucket=bucket, Key=key)["UploadId"]
+        checkpoint_path.write_text(
+            json.dumps({"bucket": bucket, "upload_id": upload_id, **fingerprint})
+        )
+
+    logger.info(
+        f"Uploading {nb_parts - len(uploaded)} parts of {format_size(part_size)} "
+        f"using {concurrency} connections"
+    )
+    progress = UploadProgress(
+        total=filesize,
+        already_uploaded=sum(
+            min(part_size, filesize - (number - 1) * part_size) for number in uploaded
+        ),
+    )
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            executor.submit(
+                s3_upload_part,
+                client,
+                bucket,
+                key,
+                upload_id,
+                src_path,
+                number,
+                part_size,
+            )
+            for number in range(1, nb_parts + 1)
+            if number not in uploaded
+        ]
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                number, etag, size = future.result()
+                uploaded[number] = etag
+                progress.add(size)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    progress.report()
+
+    client.complete_multipart_upload(
+        Bucket=bucket,
+        Key=key,
+        UploadId=upload_id,
+        MultipartUpload={
+            "Parts": [
+                {"PartNumber": number, "ETag": uploaded[number]}
+                for number in sorted(uploaded)
+            ]
+        },
+    )
+    checkpoint_path.unlink(missing_ok=True)
+
+
 def s3_upload_file(
     src_path,
     upload_uri,
     filesize,
     private_key,  # not used
-    resume=False,  # not supported
+    resume=False,  # multipart uploads are always resumed
     move=False,  # not relevant
     delete=False,
     compress=False,  # not relevant
     bandwidth=None,  # not supported
     cipher=None,  # not relevant
     delete_after=None,  # nb of days to expire upload file after
+    part_size=S3_PART_SIZE,
+    concurrency=S3_CONCURRENCY,
+    checkpoint_dir=None,
 ):
     def get_url_scheme(url: urllib.parse.ParseResult) -> str:
         if url.scheme.startswith("s3+http"):
@@ -379,13 +607,25 @@ def s3_upload_file(
     if upload_uri.path.endswith("/"):
         key += src_path.name
 
+    part_size = get_part_size(filesize, part_size)
     try:
         logger.info(f"Uploading to {key}")
-        hook = FileTransferHook(filename=src_path)
-        s3_storage.upload_file(fpath=str(src_path), key=key, Callback=hook)
-        print("", flush=True)
+        if filesize > part_size:
+            s3_multipart_upload(
+                s3_storage=s3_storage,
+                src_path=src_path,
+                key=key,
+                filesize=filesize,
+                part_size=part_size,
+                concurrency=concurrency,
+                checkpoint_dir=get_checkpoint_dir(src_path, checkpoint_dir),
+            )
+        else:
+            hook = FileTransferHook(filename=src_path)
+            s3_storage.upload_file(fpath=str(src_path), key=key, Callback=hook)
+            print("", flush=True)
     except Exception as exc:
-        # as there is no resume, uploading to existing URL will result in DELETE+UPLOAD
+        # uploading to existing URL will result in DELETE+UPLOAD
         # if credentials doesn't allow DELETE or if there is an unsatisfied
         # retention, will raise PermissionError
         logger.error(f"uploader failed: {exc}")
@@ -538,6 +778,9 @@ def upload_file(
     bandwidth=None,
     cipher=None,
     delete_after=None,
+    part_size=S3_PART_SIZE,
+    concurrency=S3_CONCURRENCY,
+    checkpoint_dir=None,
 ):
     try:
         upload_uri = cast(urllib.parse.ParseResult, urllib.parse.urlparse(upload_uri))
@@ -576,8 +819,8 @@ def upload_file(
         logger.critical(f"URI scheme not supported: {upload_uri.scheme}")
         return 1
 
-    if upload_uri.scheme in ("scp",) + S3_SCHEMES and resume:
-        logger.warning("--resume not supported via SCP/S3. Will upload from scratch.")
+    if upload_uri.scheme == "scp" and resume:
+        logger.warning("--resume not supported via SCP. Will upload from scratch.")
 
     if upload_uri.scheme not in S3_SCHEMES and delete_after:
         logger.warning("--delete-after only supported on S3/Wasabi.")
@@ -595,6 +838,14 @@ def upload_file(
         "cipher": cipher,
         "delete_after": delete_after,
     }
+    if upload_uri.scheme in S3_SCHEMES:
+        kwargs.update(
+            {
+                "part_size": part_size,
+                "concurrency": concurrency,
+                "checkpoint_dir": checkpoint_dir,
+            }
+        )
 
     if watch:
         try:
@@ -623,6 +874,9 @@ def check_and_upload_file(
     delete_after=None,
     attempts=None,
     attempt_delay=None,
+    part_size=S3_PART_SIZE,
+    concurrency=S3_CONCURRENCY,
+    checkpoint_dir=None,
 ):
     """checks inputs and uploads file, returning 0 on success"""
 
@@ -689,6 +943,9 @@ def check_and_upload_file(
             bandwidth=bandwidth,
             cipher=cipher,
             delete_after=delete_after,
+            part_size=part_size,
+            concurrency=concurrency,
+            checkpoint_dir=checkpoint_dir,
         )
         if rc != 0:
             if not attempts:
@@ -734,7 +991,7 @@ def main():
     parser.add_argument(
         "--resume",
         help="whether to continue uploading existing remote file instead "
-        "of overriding (SFTP only)",
+        "of overriding (SFTP only, S3 multipart uploads always resume)",
         action="store_true",
         default=False,
     )
@@ -801,6 +1058,31 @@ def main():
         type=int,
     )
 
+    # format: https://humanfriendly.readthedocs.io/en/latest/api.html
+    # humanfriendly.parse_size
+    parser.add_argument(
+        "--part-size",
+        help="Size of each part of S3 multipart uploads (ex. 100MiB). "
+        "Files larger than this are uploaded in parallel parts and resumable",
+        default=S3_PART_SIZE,
+        type=humanfriendly.parse_size if humanfriendly else int,
+        dest="part_size",
+    )
+
+    parser.add_argument(
+        "--concurrency",
+        help="Number of S3 multipart parts to upload in parallel",
+        default=S3_CONCURRENCY,
+        type=int,
+    )
+
+    parser.add_argument(
+        "--checkpoint-dir",
+        help="Where to store S3 multipart upload checkpoints for resume. "
+        "Defaults to the source file's folder (or temp dir if not writable)",
+        dest="checkpoint_dir",
+    )
+
     parser.add_argument(
         "--debug",
         help="change logging level to DEBUG",
@@ -827,6 +1109,9 @@ def main():
             delete_after=args.delete_after,
             attempts=args.attempts,
             attempt_delay=args.attempt_delay,
+            part_size=args.part_size,
+            concurrency=args.concurrency,
+            checkpoint_dir=args.checkpoint_dir,
         )
     )
 
@@ -27,8 +27,10 @@ This tool does not:
 """
 
 import argparse
+import base64
 import concurrent.futures as cf
 import datetime
+import hashlib
 import json
 import logging
 import os
@@ -37,6 +39,7 @@ import re
 import signal
 import subprocess
 import sys
+import threading
 import time
 import traceback
 import urllib.parse
@@ -81,6 +84,9 @@ for logger_name in set(["urllib3", "boto3", "botocore", "s3transfer"]):
 
 HTTP_REQUEST_TIMEOUT = 30
 SUMMARY_FILENAME = "summary.json"
+# S3 multipart uploads constraints
+MULTIPART_MIN_PART_SIZE = 5 * 2**20
+MULTIPART_MAX_PARTS = 10000
 
 # Authentication mode: can be either "local" or "oauth"
 AUTH_MODE = os.getenv("AUTH_MODE", default="local")
@@ -97,6 +103,11 @@ ZIMFARM_TOKEN_RENEWAL_WINDOW = datetime.timedelta(
 )
 
 
+def parse_bool(value: Any) -> bool:
+    """Parse value into boolean."""
+    return str(value).lower() in ("true", "1", "yes", "y", "on")
+
+
 def getnow():
     """naive UTC now"""
     return datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
@@ -260,6 +271,339 @@ def query_api(
     return (False, req.status_code, {})
 
 
+class StreamingTransfer:
+    """Stream an HTTP download straight into an S3 multipart upload
+
+    Parts are read from the HTTP response in `part_size` chunks and uploaded
+    by up to `nb_parallel_parts` threads, so at most `nb_parallel_parts + 1`
+    parts are held in memory and nothing is written to disk.
+
+    Each part is sent with its Content-MD5 so S3 rejects corrupted parts, the
+    whole stream is hashed to compare with the source MD5 and the assembled
+    object ETag is checked against the parts' MD5s.
+
+    A small checkpoint (upload ID, source version and MD5 of uploaded parts) is
+    kept in `work_dir` so that after a crash, the upload is resumed from its
+    completed parts with an HTTP Range request instead of restarting from scratch.
+    Parts found on S3 are only reused if their ETag matches the checkpointed MD5,
+    so the assembled object ETag is still checked against locally computed MD5s.
+    The whole stream can't be hashed on resume though: resumed transfers are not
+    compared to the source MD5.
+    """
+
+    def __init__(
+        self,
+        storage: KiwixStorage,
+        work_dir: pathlib.Path,
+        part_size: int,
+        nb_parallel_parts: int,
+    ):
+        if part_size < MULTIPART_MIN_PART_SIZE:
+            min_size = humanfriendly.format_size(MULTIPART_MIN_PART_SIZE, binary=True)
+            raise ValueError(f"Part size must be at least {min_size}")
+        self.storage = storage
+        self.work_dir = work_dir
+        self.part_size = part_size
+        self.nb_parallel_parts = max(1, nb_parallel_parts)
+        # parts of different files are recorded concurrently
+        self.checkpoint_lock = threading.Lock()
+
+    @property
+    def client(self) -> Any:
+        return self.storage.client
+
+    @property
+    def bucket_name(self) -> str:
+        return self.storage.bucket_name
+
+    def checkpoint_path(self, key: str) -> pathlib.Path:
+        return self.work_dir / f"{key}.upload.json"
+
+    def read_checkpoint(self, key: str) -> dict[str, Any] | None:
+        fpath = self.checkpoint_path(key)
+        if not fpath.exists():
+            return None
+        try:
+            return json.loads(fpath.read_text())
+        except Exception:
+            logger.exception(f"Ignoring unreadable checkpoint {fpath}")
+            return None
+
+    def write_checkpoint(self, key: str, checkpoint: dict[str, Any]):
+        fpath = self.checkpoint_path(key)
+        tmp_fpath = fpath.with_suffix(".tmp")
+        tmp_fpath.write_text(json.dumps(checkpoint))
+        tmp_fpath.replace(fpath)
+
+    def record_part(self, key: str, part: dict[str, Any]):
+        """Add an uploaded part's MD5 to the checkpoint of key"""
+        with self.checkpoint_lock:
+            checkpoint = self.read_checkpoint(key)
+            if checkpoint is None:
+                return
+            checkpoint.setdefault("parts", {})[str(part["PartNumber"])] = part["ETag"]
+            self.write_checkpoint(key, checkpoint)
+
+    def abort_upload(self, key: str, upload_id: str):
+        try:
+            self.client.abort_multipart_upload(
+                Bucket=self.bucket_name, Key=key, UploadId=upload_id
+            )
+        except Exception:
+            logger.exception(f"Failed to abort multipart upload {upload_id} of {key}")
+
+    def get_resumable_upload(self, key: str, last_modified: str | None) -> str | None:
+        """ID of an incomplete upload of this very version of key, if any
+
+        Other incomplete uploads of key are aborted as they can't be resumed.
+        """
+        checkpoint = self.read_checkpoint(key)
+        resumable_id = None
+        if (
+            checkpoint
+            and checkpoint.get("last_modified") == last_modified
+            and checkpoint.get("part_size") == self.part_size
+        ):
+            resumable_id = checkpoint.get("upload_id")
+
+        paginator = self.client.get_paginator("list_multipart_uploads")
+        found = False
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=key):
+            for upload in page.get("Uploads", []):
+                if upload["Key"] != key:
+                    continue
+                if upload["UploadId"] == resumable_id:
+                    found = True
+                    continue
+                logger.info(f" [{key}] Aborting stale upload {upload['UploadId']}")
+                self.abort_upload(key, upload["UploadId"])
+
+        if not found:
+            self.checkpoint_path(key).unlink(missing_ok=True)
+            return None
+        return resumable_id
+
+    def list_completed_parts(self, key: str, upload_id: str) -> list[dict[str, Any]]:
+        """Contiguous parts, from the first one, already uploaded and checkpointed
+
+        Parts which S3 ETag does not match the MD5 of the data that was read for them
+        (or which were not checkpointed) are uploaded again, as well as following ones.
+        """
+        checkpoint = self.read_checkpoint(key) or {}
+        checksums: dict[str, str] = checkpoint.get("parts", {})
+        parts: dict[int, dict[str, Any]] = {}
+        paginator = self.client.get_paginator("list_parts")
+        for page in paginator.paginate(
+            Bucket=self.bucket_name, Key=key, UploadId=upload_id
+        ):
+            for part in page.get("Parts", []):
+                parts[part["PartNumber"]] = part
+
+        completed: list[dict[str, Any]] = []
+        number = 1
+        while number in parts and parts[number]["Size"] == self.part_size:
+            etag = parts[number]["ETag"].strip('"')
+            if etag != checksums.get(str(number)):
+                logger.warning(
+                    f" [{key}] Part #{number} does not match checkpoint, "
+                    "uploading again from there"
+                )
+                break
+            completed.append({"PartNumber": number, "ETag": etag})
+            number += 1
+        return completed
+
+    def upload_part(
+        self, key: str, upload_id: str, number: int, data: bytes
+    ) -> dict[str, Any]:
+        digest = hashlib.md5(data)  # noqa: S324
+        resp = self.client.upload_part(
+            Bucket=self.bucket_name,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=number,
+            Body=data,
+            ContentMD5=base64.b64encode(digest.digest()).decode("ASCII"),
+        )
+        etag = resp["ETag"].strip('"')
+        if etag != digest.hexdigest():
+            raise OSError(f"Part #{number} ETag mismatch: {etag}")
+        return {"PartNumber": number, "ETag": etag}
+
+    def transfer(
+        self,
+        url: str,
+        key: str,
+        meta: dict[str, Any],
+        expected_md5: str | None = None,
+    ):
+        """Transfer url into key, resuming a previous transfer if possible"""
+        prefix = f" [{key}]"
+        last_modified = meta.get("lastmodified")
+
+        upload_id = self.get_resumable_upload(key, last_modified)
+        parts: list[dict[str, Any]] = []
+        if upload_id:
+            parts = self.list_completed_parts(key, upload_id)
+            logger.info(f"{prefix} Resuming upload after {len(parts)} completed parts")
+        else:
+            upload_id = self.client.create_multipart_upload(
+                Bucket=self.bucket_name, Key=key, Metadata=meta
+            )["UploadId"]
+            self.write_checkpoint(
+                key,
+                {
+                    "upload_id": upload_id,
+                    "last_modified": last_modified,
+                    "part_size": self.part_size,
+                    "parts": {},
+                },
+            )
+
+        try:
+            parts += self.stream_parts(
+                url,
+                key,
+                upload_id,
+                first_part=len(parts) + 1,
+                expected_md5=expected_md5,
+            )
+            self.check_parts(key, parts)
+            resp = self.client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except ChecksumError:
+            # corrupted data can't be resumed
+            self.abort_upload(key, upload_id)
+            self.checkpoint_path(key).unlink(missing_ok=True)
+            raise
+
+        etag = resp["ETag"].strip('"')
+        expected_etag = self.get_multipart_etag(parts)
+        if etag != expected_etag:
+            self.storage.delete_object(key)
+            self.checkpoint_path(key).unlink(missing_ok=True)
+            raise ChecksumError(
+                f"Object ETag mismatch: {etag} instead of {expected_etag}"
+            )
+        self.checkpoint_path(key).unlink(missing_ok=True)
+
+    def stream_parts(
+        self,
+        url: str,
+        key: str,
+        upload_id: str,
+        first_part: int,
+        expected_md5: str | None,
+    ) -> list[dict[str, Any]]:
+        """Download url from first_part onwards, uploading parts as they come"""
+        prefix = f" [{key}]"
+        offset = (first_part - 1) * self.part_size
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        # whole stream can only be hashed when transfer is not resumed
+        digest = hashlib.md5() if not offset else None  # noqa: S324
+
+        started_on = time.monotonic()
+        transferred = 0
+        parts: list[dict[str, Any]] = []
+        # bound the number of parts held in memory
+        slots = threading.BoundedSemaphore(self.nb_parallel_parts)
+
+        def upload(number: int, data: bytes) -> dict[str, Any]:
+            try:
+                part = self.upload_part(key, upload_id, number, data)
+            finally:
+                slots.release()
+            self.record_part(key, part)
+            return part
+
+        with (
+            requests.get(
+                url,
+                headers=headers,
+                stream=True,
+                allow_redirects=True,
+                timeout=HTTP_REQUEST_TIMEOUT,
+            ) as resp,
+            cf.ThreadPoolExecutor(max_workers=self.nb_parallel_parts) as executor,
+        ):
+            # all parts were uploaded before the transfer got interrupted
+            if (
+                offset
+                and resp.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+            ):
+                return parts
+            resp.raise_for_status()
+            if offset and resp.status_code != HTTPStatus.PARTIAL_CONTENT:
+                raise OSError(f"Server ignored range request for {url}")
+
+            futures: list[cf.Future[dict[str, Any]]] = []
+            number = first_part
+            buffer = bytearray()
+            for chunk in resp.iter_content(chunk_size=2**20):
+                buffer += chunk
+                while len(buffer) >= self.part_size:
+                    data = bytes(buffer[: self.part_size])
+                    del buffer[: self.part_size]
+                    if digest:
+                        digest.update(data)
+                    slots.acquire()
+                    futures.append(executor.submit(upload, number, data))
+                    number += 1
+                    transferred += len(data)
+                    elapsed = time.monotonic() - started_on
+                    logger.info(
+                        f"{prefix} Part #{number - 1} read, "
+                        f"{humanfriendly.format_size(transferred, binary=True)} "
+                        f"at {humanfriendly.format_size(transferred / elapsed, binary=True)}/s"
+                    )
+            # last part may be smaller (and is the only part if file is small)
+            if buffer or number == 1:
+                data = bytes(buffer)
+                if digest:
+                    digest.update(data)
+                slots.acquire()
+                futures.append(executor.submit(upload, number, data))
+
+            for future in futures:
+                parts.append(future.result())
+
+        if not digest:
+            logger.info(
+                f"{prefix} Resumed transfer, source MD5 can't be checked: "
+                "relying on parts checksums only"
+            )
+        elif expected_md5 and digest.hexdigest() != expected_md5:
+            raise ChecksumError(
+                f"Downloaded data MD5 mismatch: {digest.hexdigest()} "
+                f"instead of {expected_md5}"
+            )
+        return parts
+
+    def check_parts(self, key: str, parts: list[dict[str, Any]]):
+        if len(parts) > MULTIPART_MAX_PARTS:
+            raise ChecksumError(
+                f"{key} needs {len(parts)} parts, more than {MULTIPART_MAX_PARTS}. "
+                "Increase part size."
+            )
+        numbers = [part["PartNumber"] for part in parts]
+        if numbers != list(range(1, len(parts) + 1)):
+            raise ChecksumError(f"{key} has missing parts: {numbers}")
+
+    @staticmethod
+    def get_multipart_etag(parts: list[dict[str, Any]]) -> str:
+        """Expected S3 ETag of an object assembled from parts"""
+        digests = b"".join(bytes.fromhex(part["ETag"]) for part in parts)
+        return f"{hashlib.md5(digests).hexdigest()}-{len(parts)}"  # noqa: S324
+
+
+class ChecksumError(Exception):
+    """Transferred data does not match the expected checksum"""
+
+
 class WatcherRunner:
     def __init__(
         self,
@@ -272,6 +616,9 @@ class WatcherRunner:
         work_dir: str,
         only: list[str] | None,
         runonce: bool,
+        stream: bool = False,
+        part_size: int = 0,
+        nb_parallel_parts: int = 1,
         debug: bool = False,
     ):
         self.running = True
@@ -283,6 +630,9 @@ class WatcherRunner:
         self.work_dir = work_dir
         self.only = only
         self.runonce = runonce
+        self.stream = stream
+        self.part_size = part_size
+        self.nb_parallel_parts = nb_parallel_parts
         self.debug = debug
         self._token_provider = ClientTokenProvider()
 
@@ -410,7 +760,8 @@ class WatcherRunner:
             raise SystemExit(1)
         return identifier
 
-    def retrieve_archives(self, identifier: str) -> list[str]:
+    def retrieve_archives(self, identifier: str) -> dict[str, str | None]:
+        """archives names of the dump with their MD5 checksum (when provided)"""
         resp = requests.get(
             f"https://archive.org/download/{identifier}/{identifier}_files.xml",
             timeout=HTTP_REQUEST_TIMEOUT,
@@ -424,13 +775,13 @@ class WatcherRunner:
             .get("file", [])  # pyright: ignore[reportOptionalMemberAccess]
         )
 
-        return [
-            file["@name"]
+        return {
+            file["@name"]: file.get("md5")
             for file in files
             if file.get("format") == "7z"
             and file.get("@source") == "original"
             and "meta." not in file["@name"]
-        ]
+        }
 
     def get_recipes_for(self, domain: str) -> list[str]:
         """list of Zimfarm recipes names for a StackExchange domain"""
@@ -529,7 +880,9 @@ class WatcherRunner:
 
         return payload.get("requested", [])
 
-    def update_file(self, url: str, key: str, last_modified: str | None):
+    def update_file(
+        self, url: str, key: str, last_modified: str | None, md5: str | None = None
+    ):
         """Do an all-steps update of that file as we know there's a new one avail."""
         domain = re.sub(r".7z$", "", key)
         prefix = f" [{domain}]"
@@ -551,6 +904,31 @@ class WatcherRunner:
             self.s3_storage.delete_object(key)
             logger.info(f"{prefix} Removed object (was from {obsolete})")
 
+        if self.stream:
+            logger.info(f"{prefix} Streaming to S3…")
+            self.streaming_transfer.transfer(
+                url=url,
+                key=key,
+                meta={"lastmodified": last_modified},
+                expected_md5=md5,
+            )
+            logger.info(f"{prefix} Uploaded")
+        elif not self.download_and_upload(url, key, last_modified):
+            return
+
+        if self.schedule_on_update:
+            logger.info(f"{prefix} Scheduling recipe on Zimfarm")
+            scheduled = self.schedule_in_zimfarm(domain)
+            if scheduled:
+                logger.info(f"{prefix} scheduled: {', '.join(scheduled)}")
+            elif scheduled is False:
+                logger.info(f"{prefix} no recipe to schedule")
+            else:
+                logger.warning(f"{prefix} couldn't schedule recipe(s)")
+
+    def download_and_upload(self, url: str, key: str, last_modified: str | None):
+        """Download file to work_dir, upload it to S3 then remove it"""
+        prefix = f" [{re.sub(r'.7z$', '', key)}]"
         logger.info(f"{prefix} Downloading…")
         fpath = self.work_dir / key
 
@@ -563,7 +941,7 @@ class WatcherRunner:
         if wget.returncode != 0:
             logger.error(f"[{key}] Download failed with exit-code {wget.returncode}")
             logger.error(wget.stdout)
-            return
+            return False
         logger.info(f"{prefix} Download completed")
 
         logger.info(f"{prefix} Uploading to S3…")
@@ -574,16 +952,7 @@ class WatcherRunner:
 
         fpath.unlink()
         logger.info(f"{prefix} Local file removed")
-
-        if self.schedule_on_update:
-            logger.info(f"{prefix} Scheduling recipe on Zimfarm")
-            scheduled = self.schedule_in_zimfarm(domain)
-            if scheduled:
-                logger.info(f"{prefix} scheduled: {', '.join(scheduled)}")
-            elif scheduled is False:
-                logger.info(f"{prefix} no recipe to schedule")
-            else:
-                logger.warning(f"{prefix} couldn't schedule recipe(s)")
+        return True
 
     def retrieve_cached_summary(self) -> dict[str, Any] | None:
         if not self.s3_summary_file_url:
@@ -610,7 +979,7 @@ class WatcherRunner:
         self.archives_futures = {}  # future: key
         self.archives_executor = cf.ThreadPoolExecutor(max_workers=self.nb_threads)
 
-        for archive in archives:
+        for archive, md5 in archives.items():
             url = f"https://archive.org/download/{identifier}/{archive}"
 
             key = archive.split("/")[-1]
@@ -626,6 +995,7 @@ class WatcherRunner:
                     url=url,
                     key=key,
                     last_modified=last_modified,
+                    md5=md5,
                 )
                 self.archives_futures.update({future: key})
 
@@ -685,10 +1055,19 @@ class WatcherRunner:
         if not self.zimfarm_credentials_ok():
             raise ValueError("Unable to connect to Zimfarm. Check credentials.")
 
+        if self.stream:
+            self.streaming_transfer = StreamingTransfer(
+                storage=self.s3_storage,
+                work_dir=self.work_dir,
+                part_size=self.part_size,
+                nb_parallel_parts=self.nb_parallel_parts,
+            )
+
         logger.info(
             f"Starting watcher:\n"
             f"  using cache: {self.s3_storage.url.netloc}\n"
-            f"  with bucket: {self.s3_storage.bucket_name}"
+            f"  with bucket: {self.s3_storage.bucket_name}\n"
+            f"  transfer mode: {'streaming' if self.stream else 'download'}"
             + (
                 ("\n  only for:\n   - " + "\n   - ".join(self.only))
                 if self.only
@@ -790,9 +1169,33 @@ def entrypoint():
         default=1,
     )
 
+    parser.add_argument(
+        "--stream",
+        help="Stream downloads directly into S3 multipart uploads instead of "
+        "downloading files to disk first",
+        action="store_true",
+        default=parse_bool(os.getenv("STREAM_TRANSFER")),
+    )
+    parser.add_argument(
+        "--part-size",
+        help="Size of multipart upload parts in stream mode. Defaults to 100MiB",
+        dest="part_size",
+        type=humanfriendly.parse_size,
+        default=os.getenv("PART_SIZE", "100MiB"),
+    )
+    parser.add_argument(
+        "--parallel-parts",
+        help="How many parts to upload in parallel, per file, in stream mode. "
+        "Defaults to 4",
+        dest="nb_parallel_parts",
+        type=int,
+        default=int(os.getenv("PARALLEL_PARTS", "4")),
+    )
+
     parser.add_argument(
         "--dir",
-        help="Directory to download files into until uploaded",
+        help="Directory to download files into until uploaded (or to store "
+        "upload checkpoints into in stream mode)",
         dest="work_dir",
         default=os.path.join(os.getcwd(), "output"),
     )
@@ -851,6 +1254,9 @@ def entrypoint():
         work_dir=args.work_dir,
         only=args.only,
         runonce=args.runonce,
+        stream=args.stream,
+        part_size=args.part_size,
+        nb_parallel_parts=args.nb_parallel_parts,
         debug=args.debug,
     )
 
@@ -198,6 +198,31 @@ DOCKER_API_RETRY_SECONDS = humanfriendly.parse_timespan(
     getenv("DOCKER_API_RETRY_DURATION", default="5s")
 )
 
+# interval between full listings of containers by the worker manager, which otherwise
+# tracks them through the docker events stream
+CONTAINERS_RECONCILIATION_INTERVAL = humanfriendly.parse_timespan(
+    getenv("CONTAINERS_RECONCILIATION_INTERVAL", default="30m")
+)
+
 REQUESTS_TIMEOUT = int(
     humanfriendly.parse_timespan(getenv("REQUESTS_TIMEOUT", default="30s"))
 )
+
+# pre-pull of scraper images of likely upcoming tasks
+# number of upcoming requested tasks to consider (0 disables pre-pull)
+PREPULL_FORECAST_SIZE = int(getenv("PREPULL_FORECAST_SIZE", default=5))
+PREPULL_INTERVAL = humanfriendly.parse_timespan(
+    getenv("PREPULL_INTERVAL", default="10m")
+)
+# maximum number of images pulled on each forecast, to bound bandwidth usage
+PREPULL_MAX_PULLS = int(getenv("PREPULL_MAX_PULLS", default=2))
+# disk space pre-pulled images can use
+PREPULL_DISK_BUDGET = as_pos_int(
+    humanfriendly.parse_size(
+        getenv("PREPULL_DISK_BUDGET", default="20GiB"), binary=True
+    )
+)
+# pre-pulled images not used for this long are removed
+PREPULL_IMAGES_RETENTION = humanfriendly.parse_timespan(
+    getenv("PREPULL_IMAGES_RETENTION", default="7d")
+)
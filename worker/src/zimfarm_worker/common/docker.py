@@ -96,6 +96,11 @@ def pull_image(client: DockerClient, repository: str, tag: str | None = None):
     return client.images.pull(repository, tag)
 
 
+@retry
+def remove_image(client: DockerClient, name: str):
+    return client.images.remove(name)
+
+
 @retry
 def run_container(client: DockerClient, image: Image, **kwargs: Any) -> Container:
     return client.containers.run(image, **kwargs)  # pyright: ignore[reportGeneralTypeIssues, reportReturnType, reportUnknownVariableType]
@@ -163,6 +168,12 @@ def container_logs(client: DockerClient, **kwargs: Any):
     return client.api.logs(**kwargs)  # pyright: ignore[reportGeneralTypeIssues, reportReturnType, reportUnknownVariableType]
 
 
+@retry
+def docker_events(client: DockerClient, **kwargs: Any):
+    """since=None, until=None, filters=None, decode=None"""
+    return client.events(**kwargs)  # pyright: ignore[reportUnknownMemberType, reportUnknownVariableType]
+
+
 @retry
 def get_or_pull_image(client: DockerClient, name: str):
     """attempt to get locally or pull and return. Name is repo:tag"""
@@ -214,7 +225,11 @@ class HostStats:
 
 def query_host_stats(client: DockerClient):
     # query cpu and ram usage in our containers
-    stats = query_containers_resources(client)
+    return get_host_stats(query_containers_resources(client))
+
+
+def get_host_stats(stats: ContainerResources):
+    """host stats given resources used by our containers"""
     disk_used = stats.disk
     cpu_used = stats.cpu_shares // DEFAULT_CPU_SHARE
     mem_used = stats.memory
@@ -0,0 +1,212 @@
+# vim: ai ts=4 sts=4 et sw=4 nu
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from docker import DockerClient
+from docker.errors import NotFound
+
+from zimfarm_worker.common import logger
+from zimfarm_worker.common.constants import (
+    CONTAINER_SCRAPER_IDENT,
+    CONTAINER_TASK_IDENT,
+    CONTAINERS_RECONCILIATION_INTERVAL,
+    DEFAULT_CPU_SHARE,
+    DOCKER_API_RETRY_SECONDS,
+)
+from zimfarm_worker.common.docker import (
+    RESOURCES_DISK_LABEL,
+    ContainerResources,
+    docker_events,
+    inspect_container,
+    list_containers,
+)
+
+# statuses of containers listed by docker without all=True
+ACTIVE_STATUSES = ("running", "restarting", "paused")
+# container events altering what we know about our containers
+WATCHED_EVENTS = ["create", "start", "die", "oom", "destroy"]
+
+
+@dataclass(kw_only=True)
+class ContainerInfo:
+    id: str
+    name: str
+    # id of the image the container runs
+    image: str
+    labels: dict[str, str]
+    status: str
+    exit_code: int
+    cpu_shares: int
+    memory: int
+
+    @classmethod
+    def from_inspect(cls, data: dict[str, Any]) -> "ContainerInfo":
+        return cls(
+            id=data["Id"],
+            name=data["Name"].lstrip("/"),
+            image=data["Image"],
+            labels=data["Config"]["Labels"] or {},
+            status=data["State"]["Status"],
+            exit_code=data["State"]["ExitCode"],
+            cpu_shares=data["HostConfig"]["CpuShares"] or 0,
+            memory=data["HostConfig"]["Memory"] or 0,
+        )
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in ACTIVE_STATUSES
+
+
+class ContainerRegistry:
+    """In-memory registry of our (zimfarm-labelled) containers
+
+    Kept up to date by a thread following the docker events stream so that
+    the manager doesn't have to list and inspect containers on every loop.
+    A full reconciliation (list + inspect of unknown/changed containers) is done
+    on start and then every CONTAINERS_RECONCILIATION_INTERVAL as a safety net."""
+
+    def __init__(self, client: DockerClient):
+        self.docker = client
+        self.containers: dict[str, ContainerInfo] = {}
+        self.lock = threading.Lock()
+        # containers updated by events during a reconciliation, which are more
+        # recent than what the listing found
+        self.changed_while_reconciling: set[str] | None = None
+        # timestamp (seconds) from which to (re)follow events stream
+        self.events_since: int | None = None
+        self.last_reconciliation = -math.inf
+
+    def start(self):
+        self.reconcile()
+        threading.Thread(
+            target=self.follow_events, name="docker-events", daemon=True
+        ).start()
+
+    @property
+    def should_reconcile(self) -> bool:
+        return (
+            time.monotonic() - self.last_reconciliation
+            > CONTAINERS_RECONCILIATION_INTERVAL
+        )
+
+    def inspect(self, container_id: str) -> ContainerInfo | None:
+        try:
+            return ContainerInfo.from_inspect(
+                inspect_container(self.docker, container_id)
+            )
+        except NotFound:
+            return None
+
+    def reconcile(self):
+        """update registry from a full listing of our containers"""
+        logger.debug("reconciling containers registry")
+        started_on = int(time.time())
+        with self.lock:
+            known = dict(self.containers)
+            self.changed_while_reconciling = set()
+
+        containers: dict[str, ContainerInfo] = {}
+        for container in list_containers(
+            self.docker, all=True, filters={"label": ["zimfarm"]}
+        ):
+            info = known.get(container.id)
+            # only inspect containers we don't know or which changed behind our back
+            if info is None or info.status != container.status:
+                info = self.inspect(container.id)
+            if info is not None:
+                containers[container.id] = info
+
+        with self.lock:
+            for container_id in self.changed_while_reconciling:
+                if container_id in self.containers:
+                    containers[container_id] = self.containers[container_id]
+                else:
+                    containers.pop(container_id, None)
+            self.containers = containers
+            self.changed_while_reconciling = None
+        if self.events_since is None:
+            self.events_since = started_on
+        self.last_reconciliation = time.monotonic()
+
+    def follow_events(self):
+        """update registry from docker events stream, forever"""
+        while True:
+            try:
+                for event in docker_events(
+                    self.docker,
+                    since=self.events_since,
+                    decode=True,
+                    filters={
+                        "type": "container",
+                        "label": ["zimfarm"],
+                        "event": WATCHED_EVENTS,
+                    },
+                ):
+                    self.handle_event(event)
+            except Exception as exc:
+                logger.warning(f"docker events stream interrupted: {exc}")
+            # events missed while disconnected are replayed thanks to `since` but
+            # docker only keeps a limited number of them
+            self.last_reconciliation = -math.inf
+            time.sleep(DOCKER_API_RETRY_SECONDS)
+
+    def handle_event(self, event: dict[str, Any]):
+        container_id: str = event["Actor"]["ID"]
+        action: str = event["Action"]
+        self.events_since = event["time"]
+
+        if action == "oom":
+            name = event["Actor"]["Attributes"].get("name", container_id)
+            logger.warning(f"container {name} ran out of memory")
+            return
+
+        info = None if action == "destroy" else self.inspect(container_id)
+        with self.lock:
+            if info is None:
+                self.containers.pop(container_id, None)
+            else:
+                self.containers[container_id] = info
+            self.mark_changed(container_id)
+
+    def discard(self, container_id: str):
+        """forget about a container we just removed"""
+        with self.lock:
+            self.containers.pop(container_id, None)
+            self.mark_changed(container_id)
+
+    def mark_changed(self, container_id: str):
+        """record a change made during a reconciliation, to be kept (lock held)"""
+        if self.changed_while_reconciling is not None:
+            self.changed_while_reconciling.add(container_id)
+
+    def get_containers(self, *, label: str | None = None) -> list[ContainerInfo]:
+        """our containers, optionally only those with a given label"""
+        with self.lock:
+            containers = list(self.containers.values())
+        return [
+            container
+            for container in containers
+            if label is None or label in container.labels
+        ]
+
+    def query_resources(self) -> ContainerResources:
+        """resources reserved by our active containers"""
+        cpu_shares = 0
+        memory = 0
+        disk = 0
+        for container in self.get_containers():
+            if not container.is_active:
+                continue
+            if CONTAINER_SCRAPER_IDENT in container.name:
+                cpu_shares += container.cpu_shares or DEFAULT_CPU_SHARE
+                memory += container.memory
+            if CONTAINER_TASK_IDENT in container.name:
+                try:
+                    disk += int(container.labels.get(RESOURCES_DISK_LABEL, 0))
+                except Exception:
+                    disk += 0  # improper label
+        return ContainerResources(cpu_shares=cpu_shares, memory=memory, disk=disk)
@@ -0,0 +1,161 @@
+# vim: ai ts=4 sts=4 et sw=4 nu
+
+import math
+import queue
+import threading
+import time
+from dataclasses import dataclass
+
+from docker import DockerClient
+from docker.errors import APIError, ImageNotFound
+
+from zimfarm_worker.common import logger
+from zimfarm_worker.common.constants import (
+    PREPULL_DISK_BUDGET,
+    PREPULL_FORECAST_SIZE,
+    PREPULL_IMAGES_RETENTION,
+    PREPULL_INTERVAL,
+    PREPULL_MAX_PULLS,
+)
+from zimfarm_worker.common.docker import get_image, pull_image, remove_image
+from zimfarm_worker.common.utils import format_size
+from zimfarm_worker.manager.containers import ContainerRegistry
+
+
+@dataclass(kw_only=True)
+class PrepulledImage:
+    id: str
+    size: int
+    # monotonic time at which image was last pulled, forecasted or ran
+    last_used: float
+
+
+class ImagePrefetcher:
+    """Pulls scraper images of likely upcoming tasks before they are assigned
+
+    The manager regularly submits a forecast of images (from the requested tasks
+    this worker could run) which are pulled one after the other by a background
+    thread, so that task-workers find them locally when starting the scraper.
+
+    At most PREPULL_MAX_PULLS images are pulled per forecast and images pulled here
+    are kept within PREPULL_DISK_BUDGET. Those not used for PREPULL_IMAGES_RETENTION
+    are removed, least recently used ones first when the budget is exceeded. Images
+    which were already present are left alone."""
+
+    def __init__(self, client: DockerClient, containers: ContainerRegistry):
+        self.docker = client
+        self.containers = containers
+        self.images: dict[str, PrepulledImage] = {}
+        # only the latest forecast matters, older ones are dropped
+        self.forecasts: queue.Queue[list[str]] = queue.Queue(maxsize=1)
+        self.last_forecast = -math.inf
+
+    @property
+    def enabled(self) -> bool:
+        return PREPULL_FORECAST_SIZE > 0
+
+    @property
+    def should_forecast(self) -> bool:
+        return self.enabled and time.monotonic() - self.last_forecast > PREPULL_INTERVAL
+
+    def start(self):
+        if self.enabled:
+            threading.Thread(
+                target=self.run, name="images-prepull", daemon=True
+            ).start()
+
+    def submit(self, images: list[str]):
+        """replace pending forecast (if any) with this one"""
+        self.last_forecast = time.monotonic()
+        try:
+            self.forecasts.get_nowait()
+        except queue.Empty:
+            pass
+        self.forecasts.put_nowait(images)
+
+    def run(self):
+        """pre-pull forecasted images, forever"""
+        while True:
+            images = self.forecasts.get()
+            try:
+                self.prepull(images)
+                self.collect_garbage(keep=set(images))
+            except Exception as exc:
+                logger.warning(f"failed to pre-pull images: {exc}")
+
+    @property
+    def disk_usage(self) -> int:
+        return sum(image.size for image in self.images.values())
+
+    def prepull(self, images: list[str]):
+        now = time.monotonic()
+        for name in images:
+            if name in self.images:
+                self.images[name].last_used = now
+
+        for name in images[:PREPULL_MAX_PULLS]:
+            if name not in self.images and self.is_present(name):
+                # pulled by a task or by hand: not ours to update nor to remove
+                logger.debug(f"not pre-pulling {name}: already present")
+                continue
+            if self.disk_usage >= PREPULL_DISK_BUDGET:
+                self.collect_garbage(keep=set(images), evict=True)
+            if self.disk_usage >= PREPULL_DISK_BUDGET:
+                logger.info(
+                    f"not pre-pulling {name}: pre-pulled images already use "
+                    f"{format_size(self.disk_usage)}"
+                )
+                return
+            logger.info(f"pre-pulling image {name}")
+            try:
+                image = pull_image(self.docker, name)
+            except (ImageNotFound, APIError) as exc:
+                logger.warning(f"failed to pre-pull image {name}: {exc}")
+                continue
+            self.images[name] = PrepulledImage(
+                id=image.id,
+                size=image.attrs.get("Size", 0),
+                last_used=time.monotonic(),
+            )
+
+    def is_present(self, name: str) -> bool:
+        try:
+            get_image(self.docker, name)
+        except ImageNotFound:
+            return False
+        return True
+
+    def collect_garbage(self, *, keep: set[str], evict: bool = False):
+        """remove pre-pulled images not used recently
+
+        With evict, least recently used images are removed until disk usage is back
+        within budget. Forecasted images (keep) and those of active containers are
+        never removed."""
+        now = time.monotonic()
+        in_use = {
+            container.image
+            for container in self.containers.get_containers()
+            if container.is_active
+        }
+        for image in self.images.values():
+            if image.id in in_use:
+                image.last_used = now
+
+        for name, image in sorted(
+            self.images.items(), key=lambda item: item[1].last_used
+        ):
+            if name in keep or image.id in in_use:
+                continue
+            expired = now - image.last_used > PREPULL_IMAGES_RETENTION
+            if not expired and not (evict and self.disk_usage >= PREPULL_DISK_BUDGET):
+                continue
+            logger.info(f"removing pre-pulled image {name}")
+            try:
+                remove_image(self.docker, name)
+            except ImageNotFound:
+                pass
+            except APIError as exc:
+                # most likely used by a stopped container, will retry later
+                logger.debug(f"could not remove image {name}: {exc}")
+                continue
+            self.images.pop(name, None)
@@ -19,10 +19,16 @@ from zimfarm_worker.common.constants import (
     CANCEL_REQUESTED,
     CANCELED,
     CANCELING,
+    CONTAINERS_RECONCILIATION_INTERVAL,
     CORDONED,
     PHYSICAL_CPU,
     PHYSICAL_MEMORY,
     PLATFORMS_TASKS,
+    PREPULL_DISK_BUDGET,
+    PREPULL_FORECAST_SIZE,
+    PREPULL_IMAGES_RETENTION,
+    PREPULL_INTERVAL,
+    PREPULL_MAX_PULLS,
     SUPPORTED_OFFLINERS,
     ZIMFARM_CPUS,
     ZIMFARM_MEMORY,
@@ -30,12 +36,11 @@ from zimfarm_worker.common.constants import (
     parse_bool,
 )
 from zimfarm_worker.common.docker import (
-    get_label_value,
+    HostStats,
+    get_host_stats,
     get_running_container_name,
     inspect_container,
     inspect_image,
-    list_containers,
-    query_host_stats,
     remove_container,
     start_task_worker,
     stop_container,
@@ -43,6 +48,8 @@ from zimfarm_worker.common.docker import (
 )
 from zimfarm_worker.common.utils import format_size
 from zimfarm_worker.common.worker import BaseWorker
+from zimfarm_worker.manager.containers import ContainerRegistry
+from zimfarm_worker.manager.images import ImagePrefetcher
 
 
 class TaskIdent(NamedTuple):
@@ -95,6 +102,12 @@ class WorkerManager(BaseWorker):
             poll_interval=self.poll_interval,
             sleep_interval=self.sleep_interval,
             selfish=self.selfish,
+            containers_reconciliation_interval=CONTAINERS_RECONCILIATION_INTERVAL,
+            prepull_forecast_size=PREPULL_FORECAST_SIZE,
+            prepull_interval=PREPULL_INTERVAL,
+            prepull_max_pulls=PREPULL_MAX_PULLS,
+            prepull_disk_budget=format_size(PREPULL_DISK_BUDGET),
+            prepull_images_retention=PREPULL_IMAGES_RETENTION,
         )
         if ZIMFARM_MEMORY > PHYSICAL_MEMORY:
             logger.warning(
@@ -112,6 +125,8 @@ class WorkerManager(BaseWorker):
         self.tasks: dict[TaskIdent, dict[str, Any]] = {}
         self.last_poll = datetime.datetime(2020, 1, 1)
         self.should_stop = False
+        # task ids known during last cleanup of workdir folders
+        self.cleaned_task_ids: set[str] | None = None
 
         # check workdir
         self.check_workdir()
@@ -125,9 +140,17 @@ class WorkerManager(BaseWorker):
         # ensure we have access to docker API
         self.check_docker()
 
+        # keep track of our containers from docker events
+        self.containers = ContainerRegistry(self.docker)
+        self.containers.start()
+
+        # pull scraper images of upcoming tasks in the background
+        self.images = ImagePrefetcher(self.docker, self.containers)
+        self.images.start()
+
         # display resources. These aren't the actual "host" statistics but an
         # aggregation of the total stats used by our own containers.
-        host_stats = query_host_stats(self.docker)
+        host_stats = self.query_host_stats()
         disk_free = self.free_disk_space()
         if host_stats.disk.available > disk_free:
             self.should_stop = True
@@ -169,6 +192,10 @@ class WorkerManager(BaseWorker):
     def sleep(self):
         time.sleep(self.sleep_interval)
 
+    def query_host_stats(self) -> HostStats:
+        """host stats from containers registry (no call to docker API)"""
+        return get_host_stats(self.containers.query_resources())
+
     def get_next_webapi_uri(self) -> str:
         """Next endpoint URI in line for polling
 
@@ -201,7 +228,7 @@ class WorkerManager(BaseWorker):
         logger.debug(f"polling {webapi_uri}…")
         self.last_poll = getnow()
 
-        host_stats = query_host_stats(self.docker)
+        host_stats = self.query_host_stats()
         disk_free = self.free_disk_space()
         if host_stats.disk.available > disk_free:
             self.should_stop = True
@@ -255,6 +282,45 @@ class WorkerManager(BaseWorker):
             return True
         return False
 
+    def forecast_images(self):
+        """submit scraper images of tasks we are likely to run soon for pre-pull
+
+        Upcoming tasks are the first requested tasks matching our offliners and total
+        resources (not available ones, as running tasks will eventually complete)"""
+        host_stats = self.query_host_stats()
+        images: list[str] = []
+        for webapi_uri in self.webapi_uris:
+            response = self.query_api(
+                method="GET",
+                path="/requested-tasks",
+                params={
+                    "worker": self.worker_name,
+                    "matching_offliners": SUPPORTED_OFFLINERS,
+                    "matching_cpu": host_stats.cpu.total,
+                    "matching_memory": host_stats.memory.total,
+                    "matching_disk": host_stats.disk.total,
+                    "limit": PREPULL_FORECAST_SIZE,
+                },
+                webapi_uri=webapi_uri,
+            )
+            if not response.success:
+                logger.warning(
+                    f"images forecast failed with HTTP {response.status_code}: "
+                    f"{response.json}"
+                )
+                continue
+            for task in response.json["items"]:
+                if self.selfish and task["worker_name"] != self.worker_name:
+                    continue
+                image = task["config"].get("image")
+                if not image:  # API not providing images
+                    continue
+                name = f"{image['name']}:{image['tag']}"
+                if name not in images:
+                    images.append(name)
+        logger.debug(f"images forecast: {images}")
+        self.images.submit(images)
+
     def check_in(self):
         """check_in_at() to all connections"""
         for uri in self.webapi_uris:
@@ -265,7 +331,7 @@ class WorkerManager(BaseWorker):
         netloc = urllib.parse.urlparse(webapi_uri).netloc
         logger.info(f"checking-in with the API at {netloc}…")
 
-        host_stats = query_host_stats(self.docker)
+        host_stats = self.query_host_stats()
         try:
             container_info = inspect_container(
                 self.docker, get_running_container_name()
@@ -400,29 +466,27 @@ class WorkerManager(BaseWorker):
         return response.success
 
     def sync_tasks_and_containers(self):
-        # list of completed containers (successfully ran)
-        completed_containers = list_containers(
-            self.docker, all=True, filters={"label": ["zimtask=yes"], "exited": 0}
-        )
+        task_containers = self.containers.get_containers(label="zimtask")
 
-        # list of running containers
-        running_containers = list_containers(
-            self.docker, filters={"label": ["zimtask=yes"]}
-        )
+        # list of completed containers (successfully ran)
+        completed_containers = [
+            container
+            for container in task_containers
+            if container.status == "exited" and container.exit_code == 0
+        ]
 
         # list of task_ids for running containers
         running_task_idents = [
-            TaskIdent(
-                get_label_value(self.docker, container.name, "webapi_uri"),
-                get_label_value(self.docker, container.name, "task_id"),
-            )
-            for container in running_containers
+            TaskIdent(container.labels["webapi_uri"], container.labels["task_id"])
+            for container in task_containers
+            if container.is_active
         ]
 
         # remove completed containers
         for container in completed_containers:
             logger.info(f"container {container.name} exited successfully, removing.")
             remove_container(self.docker, container=container.name)
+            self.containers.discard(container.id)
 
         # make sure we are tracking task for all running containers
         for task_ident in running_task_idents:
@@ -436,21 +500,19 @@ class WorkerManager(BaseWorker):
                 logger.info(f"task {task_ident} is not running anymore, unwatching.")
                 self.tasks.pop(task_ident, None)
 
-    def cleanup_leftovers(self):
-        """Clean up leftover containers and workdir folders."""
+    def cleanup_leftovers(self, *, full: bool = False):
+        """Clean up leftover containers and workdir folders.
+
+        Workdir is only scanned if our tasks changed since last cleanup or if full"""
         logger.debug("Running cleanup of leftover containers and workdir folders")
 
         known_task_ids = {task_ident.id for task_ident in self.tasks.keys()}
 
         # Clean up leftover container
         try:
-            all_zimfarm_containers = list_containers(
-                self.docker, all=True, filters={"label": ["zimfarm"]}
-            )
-
-            for container in all_zimfarm_containers:
+            for container in self.containers.get_containers():
                 try:
-                    task_id = get_label_value(self.docker, container.name, "task_id")
+                    task_id = container.labels.get("task_id")
 
                     if not task_id:
                         continue
@@ -471,6 +533,7 @@ class WorkerManager(BaseWorker):
                             remove_container(
                                 self.docker, container=container.name, force=True
                             )
+                            self.containers.discard(container.id)
                             logger.info(f"Removed leftover container {container.name}")
                         except Exception as exc:
                             logger.warning(
@@ -482,6 +545,10 @@ class WorkerManager(BaseWorker):
         except Exception as exc:
             logger.warning(f"Error during container cleanup: {exc}")
 
+        if not full and known_task_ids == self.cleaned_task_ids:
+            return
+        self.cleaned_task_ids = known_task_ids
+
         # Clean up leftover workdir folders
         try:
             if not self.workdir.exists():
@@ -569,8 +636,13 @@ class WorkerManager(BaseWorker):
 
         while not self.should_stop:
             if self.should_poll:
+                full = self.containers.should_reconcile
+                if full:
+                    self.containers.reconcile()
                 self.sync_tasks_and_containers()
-                self.cleanup_leftovers()
+                self.cleanup_leftovers(full=full)
                 self.poll()
+                if self.images.should_forecast:
+                    self.forecast_images()
             else:
                 self.sleep()